@@ -12,3 +12,6 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+
+# Imported here so that `LOR_SNAPSHOT` is removed from the environment as soon as LoR is imported (see `lor._snapshot`)
+import lor._snapshot
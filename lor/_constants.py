@@ -17,7 +17,18 @@ WORKSPACE_EXEC_BINSTUB = "bin/lor"
 WORKSPACE_INSTALL_BINSTUB = "bin/install"
 MAX_TMP_DIR_CREATION_ATTEMPTS = 100
 WORKSPACE_ENV_VARNAME = "LOR_HOME"
+WORKSPACE_HINTS_ENV_VARNAME = "LOR_WORKSPACE_HINTS"
+SERVER_DISABLE_ENV_VARNAME = "LOR_NO_SERVER"
+PROPS_RELOAD_INTERVAL_ENV_VARNAME = "LOR_PROPS_RELOAD_INTERVAL"
+PROPS_ENV_VAR_PREFIX = "LOR_PROP_"
+SNAPSHOT_ENV_VARNAME = "LOR_SNAPSHOT"
+REFLECTION_INDEX_ENV_VARNAME = "LOR_REFLECTION_INDEX"
 WORKSPACE_PROPS = "etc/properties.yml"
 HOME_FOLDER_NAME = '.lor'
 HOME_FOLDER_PROPS_NAME = 'properties.yml'
+HOME_FOLDER_CACHE_NAME = 'cache'
+REFLECTION_INDEX_NAME = 'reflection-index.json'
+COMPILED_YAML_CACHE_SUFFIX = ".cache"
+WORKSPACE_LOR_DIR = ".lor"
+WORKSPACE_PATH_INDEX = ".lor/path-index"
 
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Property and path access instrumentation (`lor run --instrument`).
+
+When enabled, each call to `lor.props.get` and `lor.path.resolve` is counted per key (or path), along with which loader
+(or overlay) served it and how long the lookup took. A summary is written as JSON and the most-accessed keys are
+printed as a table when the run finishes. This makes it easy to find tasks that look up properties in inner loops and
+keys that always fall through to slow, low-priority loaders.
+
+Instrumentation is a no-op unless it was enabled, so the checks in `props` and `path` cost one function call.
+"""
+import json
+import sys
+import time
+
+DEFAULT_JSON_PATH = "lor-instrumentation.json"
+NUM_KEYS_TO_PRINT = 20
+
+__stats = None
+
+
+def enable(json_path=DEFAULT_JSON_PATH):
+    """
+    Enable property and path access instrumentation for the rest of the process's lifetime.
+
+    :param json_path: Path that the machine-readable (JSON) summary is written to by `report`
+    """
+    global __stats
+
+    if __stats is None:
+        __stats = __Stats(json_path)
+
+
+def is_enabled():
+    """Returns True if access instrumentation is enabled"""
+    return __stats is not None
+
+
+def timed_lookup(kind, key, lookup, get_source):
+    """
+    Calls `lookup()`, recording the call against `key` (if instrumentation is enabled).
+
+    :param kind: The kind of lookup (e.g. "props" or "path")
+    :param key: The property name or path being looked up
+    :param lookup: A callable that takes no arguments and performs the lookup
+    :param get_source: A callable that takes the lookup's result and returns the name of whatever served it. Only called
+                       if the lookup succeeded.
+    :return: The result of `lookup()`
+    """
+    if __stats is None:
+        return lookup()
+
+    start = time.perf_counter()
+    try:
+        ret = lookup()
+    except Exception:
+        __stats.record(kind, key, None, time.perf_counter() - start)
+        raise
+
+    seconds = time.perf_counter() - start
+    __stats.record(kind, key, get_source(ret), seconds)
+
+    return ret
+
+
+def report(num_to_print=NUM_KEYS_TO_PRINT):
+    """
+    Print a table of the most-accessed keys to stderr and write the full summary as JSON (if instrumentation is
+    enabled).
+
+    :param num_to_print: Number of keys to print in the table
+    """
+    if __stats is None:
+        return
+
+    summary = __stats.summary()
+    accesses = sorted(summary["props"] + summary["path"], key=lambda a: a["count"], reverse=True)
+
+    print("lor property/path accesses (top {n} by count, of {total}):".format(n=num_to_print, total=len(accesses)), file=sys.stderr)
+    print("  {:>10}  {:>12}  {:<5}  {:<40}  {}".format("count", "total ms", "kind", "key", "served by"), file=sys.stderr)
+    for a in accesses[:num_to_print]:
+        served_by = ", ".join(a["sources"])
+        print("  {count:>10}  {ms:>12.3f}  {kind:<5}  {key:<40}  {served_by}".format(
+            count=a["count"],
+            ms=a["total_seconds"] * 1000,
+            kind=a["kind"],
+            key=a["key"],
+            served_by=served_by), file=sys.stderr)
+
+    try:
+        with open(__stats.json_path, "w") as f:
+            json.dump(summary, f, indent=2)
+        print("access summary written to {json_path}".format(json_path=__stats.json_path), file=sys.stderr)
+    except OSError as ex:
+        print("{json_path}: cannot write access summary: {ex}".format(json_path=__stats.json_path, ex=ex), file=sys.stderr)
+
+
+class __Stats:
+
+    def __init__(self, json_path):
+        self.json_path = json_path
+        self.accesses = {}  # <(kind, key): [count, total seconds, max seconds, <source: count>]>
+
+    def record(self, kind, key, source, seconds):
+        access = self.accesses.get((kind, key))
+
+        if access is None:
+            access = [0, 0.0, 0.0, {}]
+            self.accesses[(kind, key)] = access
+
+        access[0] += 1
+        access[1] += seconds
+        access[2] = max(access[2], seconds)
+        # A source of None means that the lookup failed (e.g. a KeyError)
+        access[3][source] = access[3].get(source, 0) + 1
+
+    def summary(self):
+        ret = {"props": [], "path": []}
+
+        for (kind, key), (count, total_seconds, max_seconds, sources) in self.accesses.items():
+            ret.setdefault(kind, []).append({
+                "kind": kind,
+                "key": key,
+                "count": count,
+                "total_seconds": total_seconds,
+                "mean_seconds": total_seconds / count,
+                "max_seconds": max_seconds,
+                "sources": {("(not found)" if source is None else str(source)): n for source, n in sorted(sources.items(), key=lambda s: s[1], reverse=True)},
+            })
+
+        for accesses in ret.values():
+            accesses.sort(key=lambda a: a["count"], reverse=True)
+
+        return ret
@@ -19,37 +19,46 @@ import os
 import sys
 
 import lor._constants
+import lor._profiling
 from lor import workspace, path, props
 
 
-def bootstrap_globals(prop_overrides):
+def bootstrap_globals(prop_overrides, overlay_paths=None):
     """
     Bootstrap global variables.
 
-    Used by LoR CLI to bootstrap CLI overrides (variable vals etc.)
+    Used by LoR CLI to bootstrap CLI overrides (variable vals, overlay dirs etc.)
 
-    :param prop_overrides:
+    Properties are looked up in `prop_overrides`, then in each overlay's `etc/properties.yml` (if it has one, in
+    overlay order), then in the default loaders (see `lor.props`).
+
+    :param prop_overrides: A dict of property overrides
+    :param overlay_paths: A list of overlay dirs, highest-priority first (see `lor.path`)
     :return:
     :raises RuntimeError: If not in a workspace
-    :raises FileNotFoundError: If workspace properties.yml file is missing
+    :raises FileNotFoundError: If workspace properties.yml file is missing, or an overlay dir does not exist
+    :raises NotADirectoryError: If an overlay path is not a directory
     """
-    workspace_path = workspace.get_path()
+    with lor._profiling.phase("lor._internal.bootstrap_globals"):
+        workspace_path = workspace.get_path()
 
-    if workspace_path is None:
-        raise RuntimeError("Not currently in a workspace (or cannot locate one)")
+        if workspace_path is None:
+            raise RuntimeError("Not currently in a workspace (or cannot locate one)")
 
-    workspace._set_path(workspace_path)
+        workspace._set_path(workspace_path)
 
-    path._set_overlay_paths([])  # Not using overlay paths yet
+        overlay_paths = list(overlay_paths or [])
+        path._set_overlay_paths(overlay_paths)
 
-    prop_file_path = os.path.join(workspace.get_path(), lor._constants.WORKSPACE_PROPS)
+        prop_file_path = os.path.join(workspace.get_path(), lor._constants.WORKSPACE_PROPS)
 
-    if not os.path.exists(prop_file_path):
-        raise FileNotFoundError("{prop_file_path}: No such file: a properties file is *required* in the workspace when running LoR")
+        if not os.path.exists(prop_file_path):
+            raise FileNotFoundError("{prop_file_path}: No such file: a properties file is *required* in the workspace when running LoR")
 
-    loaders = [props.DictPropertyLoader("cli-overrides", prop_overrides)] + props.get_loaders()
-    props._set_loaders(loaders)
+        overlay_loaders = [props.get_optional_yaml_file_loader(os.path.join(p, lor._constants.WORKSPACE_PROPS)) for p in overlay_paths]
+        loaders = [props.DictPropertyLoader("cli-overrides", prop_overrides)] + overlay_loaders + props.get_loaders()
+        props._set_loaders(loaders)
 
-    # This allows workspaces to be loaded dynamically at runtime by LoR and Luigi
-    # (the Luigi docs get clients to set PYTHONPATH explicitly)
-    sys.path.insert(0, workspace.get_path())
+        # This allows workspaces to be loaded dynamically at runtime by LoR and Luigi
+        # (the Luigi docs get clients to set PYTHONPATH explicitly)
+        sys.path.insert(0, workspace.get_path())
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Start-up profiling support (`lor --profile-startup`).
+
+When enabled, this module records how long each module takes to import (via an import hook) and how long each
+instrumented phase of the CLI (locating the workspace, bootstrapping globals, parsing property files, etc.) takes. A
+report, sorted by cost, is printed to stderr when the process exits and is also written to a JSON file, so that
+start-up regressions can be tracked over time.
+
+Instrumentation is a no-op unless profiling was enabled, so `phase` can be used freely in performance-sensitive code.
+"""
+import atexit
+import json
+import sys
+import time
+from contextlib import contextmanager
+
+DEFAULT_JSON_PATH = "lor-startup-profile.json"
+NUM_IMPORTS_TO_PRINT = 25
+
+__profile = None
+
+
+def enable(json_path=DEFAULT_JSON_PATH):
+    """
+    Enable start-up profiling for the rest of the process's lifetime.
+
+    :param json_path: Path that the machine-readable (JSON) report is written to when the process exits
+    """
+    global __profile
+
+    if __profile is not None:
+        return
+
+    __profile = __Profile(json_path)
+    __profile.post_import_hooks["luigi.cmdline_parser"] = __instrument_luigi_cmdline_parser
+    sys.meta_path.insert(0, __TimingFinder(__profile))
+
+    for module_name, hook in __profile.post_import_hooks.items():
+        if module_name in sys.modules:
+            hook(sys.modules[module_name])
+
+    atexit.register(report)
+
+
+def is_enabled():
+    """Returns True if start-up profiling is enabled"""
+    return __profile is not None
+
+
+@contextmanager
+def phase(name):
+    """
+    Context manager that records the time spent inside it as a phase called `name` (if profiling is enabled).
+
+    :param name: Human-readable name of the phase (e.g. `workspace.try_locate`)
+    """
+    if __profile is None:
+        yield
+    else:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            __profile.phases.append((name, time.perf_counter() - start))
+
+
+def report():
+    """
+    Print the profiling report to stderr and write it as JSON (if profiling is enabled). Only reports once.
+    """
+    global __profile
+
+    if __profile is None or __profile.reported:
+        return
+
+    __profile.reported = True
+    summary = __profile.summary()
+
+    print("lor startup profile ({total:.3f} s total)".format(total=summary["total_seconds"]), file=sys.stderr)
+    print("phases (by duration, phases may be nested):", file=sys.stderr)
+    for p in summary["phases"]:
+        print("  {seconds:8.4f} s  {name}".format(seconds=p["seconds"], name=p["name"]), file=sys.stderr)
+
+    print("imports (top {n} by self time, of {total}):".format(n=NUM_IMPORTS_TO_PRINT, total=len(summary["imports"])), file=sys.stderr)
+    for i in summary["imports"][:NUM_IMPORTS_TO_PRINT]:
+        print("  {self_seconds:8.4f} s  (cumulative {cumulative_seconds:8.4f} s)  {module}".format(**i), file=sys.stderr)
+
+    try:
+        with open(__profile.json_path, "w") as f:
+            json.dump(summary, f, indent=2)
+        print("profile written to {json_path}".format(json_path=__profile.json_path), file=sys.stderr)
+    except OSError as ex:
+        print("{json_path}: cannot write profile: {ex}".format(json_path=__profile.json_path, ex=ex), file=sys.stderr)
+
+
+class __Profile:
+
+    def __init__(self, json_path):
+        self.json_path = json_path
+        self.start = time.perf_counter()
+        self.phases = []
+        self.imports = {}
+        self.import_stack = []
+        self.post_import_hooks = {}
+        self.reported = False
+
+    def summary(self):
+        imports = [
+            {"module": name, "self_seconds": self_seconds, "cumulative_seconds": cumulative_seconds}
+            for name, (self_seconds, cumulative_seconds) in self.imports.items()
+        ]
+        phases = [{"name": name, "seconds": seconds} for name, seconds in self.phases]
+
+        return {
+            "total_seconds": time.perf_counter() - self.start,
+            "phases": sorted(phases, key=lambda p: p["seconds"], reverse=True),
+            "imports": sorted(imports, key=lambda i: i["self_seconds"], reverse=True),
+        }
+
+
+class __TimingFinder:
+    """A `sys.meta_path` finder that delegates to the other finders and times the execution of the modules they find.
+    """
+
+    def __init__(self, profile):
+        self.profile = profile
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+
+            spec = finder.find_spec(fullname, path, target)
+
+            if spec is not None:
+                self.__wrap_loader(spec)
+                return spec
+
+        return None
+
+    def __wrap_loader(self, spec):
+        loader = spec.loader
+
+        # Builtin/frozen importers are classes shared by all of their modules: don't patch them
+        if loader is None or isinstance(loader, type) or not hasattr(loader, "exec_module"):
+            return
+
+        profile = self.profile
+        exec_module = loader.exec_module
+
+        def timed_exec_module(module):
+            profile.import_stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                exec_module(module)
+            finally:
+                elapsed = time.perf_counter() - start
+                child_seconds = profile.import_stack.pop()
+                if len(profile.import_stack) > 0:
+                    profile.import_stack[-1] += elapsed
+                profile.imports[spec.name] = (elapsed - child_seconds, elapsed)
+
+            if spec.name in profile.post_import_hooks:
+                profile.post_import_hooks[spec.name](module)
+
+        try:
+            loader.exec_module = timed_exec_module
+        except AttributeError:
+            pass
+
+
+def __instrument_luigi_cmdline_parser(module):
+    cmdline_parser_class = module.CmdlineParser
+    init = cmdline_parser_class.__init__
+
+    def timed_init(self, *args, **kwargs):
+        with phase("luigi.CmdlineParser"):
+            init(self, *args, **kwargs)
+
+    cmdline_parser_class.__init__ = timed_init
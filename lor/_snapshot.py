@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Bootstrapped-state snapshots, for passing LoR's globals to subprocesses.
+
+A LoR process that launches another python process (e.g. `lor.util.subprocess.run_luigi_task`) can write its
+bootstrapped state (workspace path, overlay paths, and property loaders, including any CLI overrides) to a snapshot file
+and pass the file's path to the child via the `LOR_SNAPSHOT` environment variable. When the child's `workspace`,
+`path`, and `props` globals are first used, they are restored from the snapshot instead of being located, validated, and
+parsed again.
+
+Snapshots can contain secrets (e.g. from `~/.lor/properties.yml`), so they are only readable by their owner and the
+writer deletes them once the child has exited. Only the direct child uses a snapshot: the variable is not passed on to
+processes that the child launches, and a snapshot whose file is gone, or that is for a different workspace, is ignored.
+
+Snapshots are pickled, so they can contain any value that can be loaded from a property file.
+"""
+import os
+import pickle
+import sys
+import tempfile
+
+import lor._constants
+
+__FORMAT_VERSION = 2
+
+# A snapshot is only meant for the direct child of the process that wrote it, so the variable is removed from the
+# environment as soon as LoR is imported. Otherwise, processes launched by the child (e.g. a nested `lor` command in a
+# different workspace) would inherit it, and might outlive the file.
+__snapshot_path = os.environ.pop(lor._constants.SNAPSHOT_ENV_VARNAME, None) or None
+__loaded = None  # (snapshot dict, or None if the snapshot cannot be used), once `try_load` has been called
+
+
+def write(ws_path, overlay_paths, property_loaders):
+    """
+    Write a snapshot to a new temporary file. The caller should `remove` it once the child process has exited.
+
+    :param ws_path: The workspace's path
+    :param overlay_paths: A list of overlay paths
+    :param property_loaders: A list of property loaders, ordered by highest- to lowest-priority. Each loader's
+                             properties are written (which loads it), so that lookups in the child fall through the
+                             loaders in the same way as in the parent.
+    :return: Path to the snapshot file
+    """
+    snapshot = {
+        "version": __FORMAT_VERSION,
+        "workspace": ws_path,
+        "cwd": os.getcwd(),
+        "overlay_paths": list(overlay_paths),
+        "property_loaders": [(loader.get_name(), loader.get_all() or {}) for loader in property_loaders],
+    }
+
+    # mkstemp creates the file readable by this user only, because properties may contain secrets
+    fd, snapshot_path = tempfile.mkstemp(prefix="lor-snapshot-", suffix=".pickle")
+    with os.fdopen(fd, "wb") as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    return snapshot_path
+
+
+def remove(snapshot_path):
+    """
+    Remove a snapshot file written by `write`, if it still exists.
+
+    :param snapshot_path: Path to the snapshot file
+    """
+    try:
+        os.remove(snapshot_path)
+    except OSError:
+        pass
+
+
+def _set_snapshot_path(snapshot_path):
+    """
+    Set the path of the snapshot that `try_load` loads (e.g. None to not use a snapshot).
+
+    :param snapshot_path: Path to a snapshot file, or None
+    """
+    global __snapshot_path, __loaded
+
+    __snapshot_path = snapshot_path
+    __loaded = None
+
+
+def try_load():
+    """
+    Returns the snapshot named by the `LOR_SNAPSHOT` environment variable (when LoR was imported), or None if the
+    variable was not set or the snapshot cannot be used.
+
+    A snapshot cannot be used if its file no longer exists, or if it is for a different workspace than this process
+    would otherwise use: `LOR_HOME` (if set) must be the snapshot's workspace and, otherwise, the working directory must
+    be inside the snapshot's workspace or be the working directory of the process that wrote it. In those cases, the
+    workspace, overlays, and properties are bootstrapped as normal.
+
+    The snapshot file is only read once per process.
+
+    :return: A dict containing `workspace`, `overlay_paths`, and `property_loaders` (a list of (name, dict) tuples), or
+             None
+    :raises RuntimeError: If the snapshot file exists but cannot be read
+    """
+    global __loaded
+
+    if __snapshot_path is None:
+        return None
+
+    if __loaded is None:
+        __loaded = (__try_read(__snapshot_path),)
+
+    return __loaded[0]
+
+
+def __try_read(snapshot_path):
+    try:
+        with open(snapshot_path, "rb") as f:
+            snapshot = pickle.load(f)
+    except FileNotFoundError:
+        print("{snapshot_path}: LoR snapshot no longer exists: ignoring it".format(snapshot_path=snapshot_path), file=sys.stderr)
+        return None
+    except Exception as ex:
+        raise RuntimeError("{snapshot_path}: cannot read LoR snapshot (from ${varname})".format(snapshot_path=snapshot_path, varname=lor._constants.SNAPSHOT_ENV_VARNAME)) from ex
+
+    if not isinstance(snapshot, dict) or snapshot.get("version") != __FORMAT_VERSION:
+        raise RuntimeError("{snapshot_path}: unsupported LoR snapshot version: the snapshot was written by a different LoR version".format(snapshot_path=snapshot_path))
+
+    return snapshot if __is_for_this_process(snapshot) else None
+
+
+def __is_for_this_process(snapshot):
+    ws_path = os.path.realpath(snapshot["workspace"])
+    lor_home = os.environ.get(lor._constants.WORKSPACE_ENV_VARNAME)
+
+    if lor_home is not None and lor_home != "":
+        return os.path.realpath(lor_home) == ws_path
+
+    cwd = os.path.realpath(os.getcwd())
+
+    return cwd == os.path.realpath(snapshot["cwd"]) or cwd == ws_path or cwd.startswith(ws_path + os.sep)
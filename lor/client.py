@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Thin client for a warm LoR server
+
+A workspace's `bin/lor` binstub uses this module to forward commands to a `lor server` process, if one is running for
+the workspace. The server has already imported Luigi, located the workspace, and parsed its properties, so forwarded
+commands start much faster than they would in a fresh interpreter.
+
+This module is imported on every `bin/lor` invocation, so it must only import lightweight (standard library) modules.
+"""
+import array
+import hashlib
+import json
+import os
+import signal
+import socket
+import struct
+import sys
+
+import lor._constants
+
+FORWARDED_COMMANDS = {"dot", "explain", "ls", "properties", "run"}
+
+__HEADER = struct.Struct(">I")
+
+
+def socket_path(ws_path):
+    """
+    Returns the path of the unix socket that a `lor server` for `ws_path` listens on.
+
+    The socket is placed in a per-user temporary directory (rather than the workspace) because unix socket paths have
+    a short maximum length.
+
+    :param ws_path: Path to the workspace
+    :return: Path to the socket as a string
+    """
+    tmp_dir = os.environ.get("TMPDIR", "/tmp")
+    ws_hash = hashlib.sha1(os.path.realpath(ws_path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(tmp_dir, "lor-{uid}".format(uid=os.getuid()), ws_hash + ".sock")
+
+
+def try_forward(ws_path, argv):
+    """
+    Forward a LoR command to the workspace's `lor server`, if one is running, and return the command's exit code.
+
+    The command runs with this process's stdio, working directory, and environment.
+
+    :param ws_path: Path to the workspace
+    :param argv: LoR command-line arguments (e.g. `["run", "--module", "foo", "FooTask"]`)
+    :return: The exit code of the command, or None if the command could not be forwarded (e.g. because no server is running)
+    """
+    if len(argv) == 0 or argv[0] not in FORWARDED_COMMANDS or lor._constants.SERVER_DISABLE_ENV_VARNAME in os.environ:
+        return None
+
+    stdio_fds = __try_get_stdio_fds()
+
+    if stdio_fds is None:
+        return None
+
+    sock = __try_connect(ws_path)
+
+    if sock is None:
+        return None
+
+    with sock:
+        request = {
+            "argv": argv,
+            "cwd": os.getcwd(),
+            "env": dict(os.environ),
+        }
+        send_message(sock, request)
+        send_fds(sock, stdio_fds)
+
+        return __wait_for_exit_code(sock)
+
+
+def stop_server(ws_path):
+    """
+    Stop the workspace's `lor server`.
+
+    :param ws_path: Path to the workspace
+    :return: True if a server was stopped; otherwise, False
+    """
+    sock = __try_connect(ws_path)
+
+    if sock is None:
+        return False
+
+    with sock:
+        send_message(sock, {"stop": True})
+        return recv_message(sock) is not None
+
+
+def __try_get_stdio_fds():
+    # e.g. daemons and some cron setups run with stdin closed (None); those commands just run in-process instead
+    try:
+        return [stream.fileno() for stream in (sys.stdin, sys.stdout, sys.stderr)]
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def __try_connect(ws_path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path(ws_path))
+        return sock
+    except OSError:
+        sock.close()
+        return None
+
+
+def __wait_for_exit_code(sock):
+    pid = None
+
+    while True:
+        try:
+            msg = recv_message(sock)
+        except KeyboardInterrupt:
+            if pid is not None:
+                os.kill(pid, signal.SIGINT)
+            continue
+
+        if msg is None:
+            print("lor server: connection closed before the command finished", file=sys.stderr)
+            return 1
+        elif "pid" in msg:
+            pid = msg["pid"]
+        elif "exit_code" in msg:
+            return msg["exit_code"]
+
+
+def send_message(sock, msg):
+    """
+    Send `msg` (a JSON-serializable object) as a length-prefixed frame.
+    """
+    payload = json.dumps(msg).encode("utf-8")
+    sock.sendall(__HEADER.pack(len(payload)) + payload)
+
+
+def recv_message(sock):
+    """
+    Returns the next length-prefixed JSON frame from `sock`, or None if the connection was closed.
+
+    Exactly one frame is read, so that any file descriptors sent after the frame are not discarded.
+    """
+    header = __recv_exactly(sock, __HEADER.size)
+
+    if header is None:
+        return None
+
+    payload = __recv_exactly(sock, __HEADER.unpack(header)[0])
+
+    if payload is None:
+        return None
+    else:
+        return json.loads(payload.decode("utf-8"))
+
+
+def __recv_exactly(sock, n):
+    buf = b""
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if len(chunk) == 0:
+            return None
+        buf += chunk
+    return buf
+
+
+def send_fds(sock, fds):
+    """
+    Send file descriptors over a unix socket.
+    """
+    sock.sendmsg([b"F"], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array("i", fds))])
+
+
+def recv_fds(sock, max_fds):
+    """
+    Returns a list of file descriptors received from a unix socket.
+    """
+    fds = array.array("i")
+    msg, ancdata, flags, addr = sock.recvmsg(1, socket.CMSG_LEN(max_fds * fds.itemsize))
+
+    for cmsg_level, cmsg_type, cmsg_data in ancdata:
+        if cmsg_level == socket.SOL_SOCKET and cmsg_type == socket.SCM_RIGHTS:
+            fds.frombytes(cmsg_data[:len(cmsg_data) - (len(cmsg_data) % fds.itemsize)])
+
+    return list(fds)
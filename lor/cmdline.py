@@ -17,15 +17,14 @@
 import argparse
 import sys
 
-import lor._constants
+import lor._profiling
 import lor.commands
 import lor.util.cli
 from lor import workspace, util
-from lor.commands.new import NewCommand
-from lor.util import reflection
-from lor.util.cli import CliCommand
+from lor.util.cli import LazyCliCommand
 
 CLI_DESCRIPTION = "Perform Luigi on Rails tasks"
+PROFILE_STARTUP_FLAG = "--profile-startup"
 
 
 def launch(out_of_workspace_subcommands=None, workspace_subcommands=None):
@@ -34,13 +33,18 @@ def launch(out_of_workspace_subcommands=None, workspace_subcommands=None):
     :param out_of_workspace_subcommands: A dict of <name: `CliCommand`>s to use when outside a workspace
     :param workspace_subcommands: A dict of <name: `CliCommand`>s to use when inside a workspace
     """
+    __enable_profiling_if_requested()
+
     if out_of_workspace_subcommands is None:
         out_of_workspace_subcommands = get_default_out_of_workspace_subcommands()
 
     if workspace_subcommands is None:
         workspace_subcommands = get_default_workspace_subcommands()
 
-    if workspace.try_locate() is not None:
+    with lor._profiling.phase("workspace.try_locate"):
+        ws_path = workspace.try_locate()
+
+    if ws_path is not None:
         commands = workspace_subcommands
     else:
         commands = out_of_workspace_subcommands
@@ -51,10 +55,11 @@ def launch(out_of_workspace_subcommands=None, workspace_subcommands=None):
 def get_default_workspace_subcommands():
     """Returns a dict of default in-workspace subcommands as <name: `CliCommand`>s
 
+    The returned commands are lazy: a command's module is only imported when the command is ran.
+
     :return A dict of <name: `CliCommand`>
     """
-    subcommand_classes = reflection.subclasses_in_pkg(package=lor.commands, superclass=CliCommand)
-    return {klass().name(): klass() for klass in subcommand_classes}
+    return __lazy_commands(lor.commands.WORKSPACE_COMMANDS)
 
 
 def get_default_out_of_workspace_subcommands():
@@ -62,13 +67,36 @@ def get_default_out_of_workspace_subcommands():
 
     :return: A dict of <name: `CliCommand`>
     """
-    new_cmd = NewCommand()
-    return {new_cmd.name(): new_cmd}
+    return __lazy_commands(lor.commands.OUT_OF_WORKSPACE_COMMANDS)
+
+
+def __lazy_commands(manifest):
+    return {name: LazyCliCommand(name, description, class_name) for name, description, class_name in manifest}
+
+
+def __enable_profiling_if_requested():
+    # Only top-level flags (i.e. before the subcommand's name) are considered
+    for i, arg in enumerate(sys.argv[1:], start=1):
+        if not arg.startswith("-"):
+            return
+        elif arg == PROFILE_STARTUP_FLAG or arg.startswith(PROFILE_STARTUP_FLAG + "="):
+            del sys.argv[i]
+            json_path = arg.partition("=")[2] or lor._profiling.DEFAULT_JSON_PATH
+            lor._profiling.enable(json_path)
+            return
 
 
 def __launch_cli(subcommands):
     parser = argparse.ArgumentParser(description=CLI_DESCRIPTION)
-    lor.util.cli.add_commands_as_subcommands(parser, subcommands.values())
+    parser.add_argument(
+        PROFILE_STARTUP_FLAG,
+        metavar="=JSON_PATH",
+        nargs="?",
+        help="Print a breakdown of where start-up time (imports, workspace location, property loading, etc.) is "
+             "spent and write it to JSON_PATH (default: {path})".format(path=lor._profiling.DEFAULT_JSON_PATH))
+
+    with lor._profiling.phase("cli.add_commands_as_subcommands"):
+        lor.util.cli.add_commands_as_subcommands(parser, subcommands.values())
 
     if len(sys.argv) > 1:
         __handle_top_level_args(subcommands, parser)
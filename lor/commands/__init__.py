@@ -12,3 +12,28 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+"""Built-in LoR CLI commands
+
+The LoR CLI is launched many times (e.g. once per task on batch nodes), so it should not import every command
+implementation (and, transitively, Luigi, etc.) just to build its argument parser. Instead, built-in commands
+are listed here as (name, description, fully-qualified class name) entries. Only the command that is actually ran gets
+imported.
+
+If you add a command to this package, add it to the appropriate list below.
+"""
+
+WORKSPACE_COMMANDS = [
+    ("dot", "Convert a task into DOT graph format. DOT files can be visualized with external tools such as graphviz", "lor.commands.dot.DotCommand"),
+    ("explain", "explain a task", "lor.commands.explain.ExplainCommand"),
+    ("generate", "generate code in workspace", "lor.commands.generate.GenerateCommand"),
+    ("ls", "list Luigi `Tasks` in a python module or package", "lor.commands.ls.LsCommand"),
+    ("new", "create a new LoR workspace", "lor.commands.new.NewCommand"),
+    ("path", "manage the index used to resolve paths in the workspace and overlays", "lor.commands.path.PathCommand"),
+    ("properties", "list all properties, as used by LoR at runtime", "lor.commands.properties.PropertiesCommand"),
+    ("run", "Run a task", "lor.commands.run.RunCommand"),
+    ("server", "run a warm LoR server that the workspace's bin/lor forwards commands to", "lor.commands.server.ServerCommand"),
+]
+
+OUT_OF_WORKSPACE_COMMANDS = [
+    ("new", "create a new LoR workspace", "lor.commands.new.NewCommand"),
+]
@@ -15,21 +15,33 @@
 """Module for visualizing Luigi task graphs
 """
 import argparse
-import types
+import re
+import sys
 
-import luigi
-import networkx
 from luigi.cmdline_parser import CmdlineParser
-from networkx.drawing.nx_pydot import to_pydot
 
 import lor._internal
-from lor import util
-from lor.util import cli
+from lor import taskgraph
+from lor.util import cli, graph_writers
 from lor.util.cli import CliCommand
 
 
 class DotCommand(CliCommand):
 
+    epilog = """
+    Large graphs can be queried rather than written in full. The queries are applied while the graph is walked, so
+    tasks that are pruned never have their requires() evaluated:
+
+    --root-depth N          Only walk N levels of requirements below the task
+    --only-class REGEX      Only include (and walk) required tasks whose class names match REGEX
+    --collapse-class REGEX  Collapse all tasks whose class names match REGEX into one node per class, with a count
+    --between FROM TO       Only include tasks on a path from a task whose id matches FROM to one whose id matches TO
+
+    With `--status`, each node is given a status (complete, incomplete, or external) and coloured accordingly. The
+    completeness checks are batched (see `lor.taskgraph.get_statuses`), so the whole graph is walked before it is
+    written.
+    """
+
     def name(self):
         return "dot"
 
@@ -38,56 +50,113 @@ class DotCommand(CliCommand):
 
     def run(self, argv):
         parser = argparse.ArgumentParser(description=self.description())
+        parser.formatter_class = argparse.RawDescriptionHelpFormatter
+        parser.epilog = self.epilog
 
         # TODO: Replace the workspace CLI bootstrapping a func
         cli.add_properties_override_arg(parser)
+        cli.add_overlay_arg(parser)
+        parser.add_argument(
+            "--format",
+            choices=graph_writers.FORMATS,
+            default="dot",
+            help="Output format (default: %(default)s). Nodes and edges are written as the graph is traversed")
+        parser.add_argument(
+            "--concurrency",
+            metavar="N",
+            type=int,
+            default=1,
+            help="Evaluate up to N tasks' requires() methods at once, on a thread pool (default: %(default)s). The "
+                 "output does not depend on N")
+        parser.add_argument(
+            "--output",
+            metavar="PATH",
+            help="Write the graph to PATH instead of stdout")
+        parser.add_argument(
+            "--root-depth",
+            metavar="N",
+            type=int,
+            help="Only walk N levels of requirements below the task")
+        parser.add_argument(
+            "--only-class",
+            metavar="REGEX",
+            help="Only include required tasks whose class names match REGEX")
+        parser.add_argument(
+            "--collapse-class",
+            metavar="REGEX",
+            help="Collapse tasks whose class names match REGEX into a single node per class")
+        parser.add_argument(
+            "--between",
+            metavar=("FROM", "TO"),
+            nargs=2,
+            help="Only include tasks on a path from a task whose id matches the FROM regex to one that matches TO")
+        parser.add_argument(
+            "--status",
+            action="store_true",
+            help="Check whether each task is complete and colour its node by its status")
         lor_args, luigi_args = parser.parse_known_args(argv)
 
+        if lor_args.between is not None and lor_args.root_depth is not None:
+            parser.error("--root-depth cannot be used with --between")
+
+        query = {
+            "max_depth": lor_args.root_depth,
+            "only_class": lor_args.only_class,
+            "collapse_class": lor_args.collapse_class,
+            "between": lor_args.between,
+            "status": lor_args.status,
+        }
+
         property_overrides = cli.extract_property_overrides(lor_args)
-        lor._internal.bootstrap_globals(property_overrides)
+        overlay_paths = cli.extract_overlay_paths(lor_args)
+        lor._internal.bootstrap_globals(property_overrides, overlay_paths)
 
         with CmdlineParser.global_instance(luigi_args) as cp:
             task_obj = cp.get_task_obj()
-            print_as_dot(task_obj)
+            if lor_args.output is None:
+                write_graph(task_obj, lor_args.format, sys.stdout, lor_args.concurrency, **query)
+            else:
+                with open(lor_args.output, "w") as f:
+                    write_graph(task_obj, lor_args.format, f, lor_args.concurrency, **query)
 
 
 def print_as_dot(task):
-    g = networkx.DiGraph()
-    recursively_traverse_task(g, task)
-    print(to_pydot(g))
-
-
-def recursively_traverse_task(graph, task, parent_task_name=None, previously_traversed_task_names=None):
-    if previously_traversed_task_names is None:
-        previously_traversed_task_names = {}
-
-    if task in previously_traversed_task_names:
-        name = previously_traversed_task_names[task]
+    write_graph(task, "dot", sys.stdout)
+
+
+def write_graph(task, fmt, out, concurrency=1, max_depth=None, only_class=None, collapse_class=None, between=None, status=False):
+    """
+    Writes the graph of `task` and the tasks it (transitively) requires to `out`, as the tasks are visited.
+
+    :param task: The root `luigi.Task`
+    :param fmt: One of `lor.util.graph_writers.FORMATS`
+    :param out: A text file object
+    :param concurrency: Maximum number of `requires` methods to evaluate at once (see `lor.taskgraph.walk`)
+    :param max_depth: Maximum number of levels of requirements to walk (None for unlimited)
+    :param only_class: A regex: only include required tasks whose class names match it (None to include all)
+    :param collapse_class: A regex: collapse tasks whose class names match it into one node per class (see
+                           `lor.taskgraph.to_nodes`)
+    :param between: A (from regex, to regex) pair: only include tasks on paths between tasks whose ids match them (see
+                    `lor.taskgraph.walk_between`)
+    :param status: If True, check whether each task is complete and include its status (see
+                   `lor.taskgraph.get_statuses`)
+    :raises re.error: If a regex is invalid
+    """
+    include = None
+    if only_class is not None:
+        only_class_regex = re.compile(only_class)
+
+        def include(t):
+            return only_class_regex.search(type(t).__name__) is not None
+
+    if between is None:
+        visits = taskgraph.walk(task, concurrency, max_depth, include)
     else:
-        name = type(task).__name__ + "_" + util.base36_str(3)
-        previously_traversed_task_names[task] = name
+        visits = taskgraph.walk_between(task, between[0], between[1], concurrency, include)
 
-    if parent_task_name is not None:
-        graph.add_edge(parent_task_name, name)
-    else:
-        graph.add_node(name)
-
-    top_lvl_labels = {name: name}
-
-    requirements = task.requires()
-    if isinstance(requirements, luigi.Task):
-        labels = recursively_traverse_task(graph, requirements, name, previously_traversed_task_names)
-        return util.merge(top_lvl_labels, labels)
-    elif isinstance(requirements, dict):
-        labels = top_lvl_labels
-        for k, v in requirements.items():
-            sub_labels = recursively_traverse_task(graph, v, name, previously_traversed_task_names)
-            labels = util.merge(labels, sub_labels)
-        return labels
-    elif isinstance(requirements, types.GeneratorType):
-        labels = top_lvl_labels
-        for task in requirements:
-            sub_labels = recursively_traverse_task(graph, task, name, previously_traversed_task_names)
-            labels = util.merge(labels, sub_labels)
-    else:
-        return top_lvl_labels
+    statuses = None
+    if status:
+        visits = list(visits)
+        statuses = taskgraph.get_statuses([t for t, _ in visits], concurrency)
+
+    graph_writers.write(taskgraph.to_nodes(visits, collapse_class, statuses), fmt, out)
@@ -18,6 +18,7 @@ import luigi
 from luigi.cmdline_parser import CmdlineParser
 
 import lor._internal
+from lor import taskgraph
 from lor.util import cli
 from lor.util.cli import CliCommand
 
@@ -34,20 +35,29 @@ class ExplainCommand(CliCommand):
         parser = argparse.ArgumentParser(description=self.description())
 
         cli.add_properties_override_arg(parser)
+        cli.add_overlay_arg(parser)
+        parser.add_argument(
+            "--status",
+            action="store_true",
+            help="Also show whether the task, and each task it requires, is complete")
         lor_args, luigi_args = parser.parse_known_args(argv)
 
         property_overrides = cli.extract_property_overrides(lor_args)
-        lor._internal.bootstrap_globals(property_overrides)
+        overlay_paths = cli.extract_overlay_paths(lor_args)
+        lor._internal.bootstrap_globals(property_overrides, overlay_paths)
 
         with CmdlineParser.global_instance(luigi_args) as cp:
             task_obj = cp.get_task_obj()
-            explain(task_obj)
+            explain(task_obj, lor_args.status)
 
 
-def explain(task_obj):
+def explain(task_obj, show_status=False):
     explanation = generate_task_explanation(task_obj)
     print(explanation)
 
+    if show_status:
+        print(generate_status(task_obj))
+
 
 def generate_task_explanation(task_obj):
     return "\n".join([
@@ -88,5 +98,17 @@ def generate_outputs(task_obj):
     return ret
 
 
+def generate_status(task_obj):
+    required_tasks = taskgraph.get_requirements(task_obj)
+    statuses = taskgraph.get_statuses([task_obj] + required_tasks)
+
+    ret = "Status: {status}\n".format(status=statuses[task_obj.task_id])
+    ret += "Depends On (status):\n"
+    for required_task in required_tasks:
+        ret += "  {task_id}: {status}\n".format(task_id=required_task.task_id, status=statuses[required_task.task_id])
+
+    return ret
+
+
 def generate_depends(task_obj):
     return "Depends On:\n  {reqs}".format(reqs=task_obj.requires())
@@ -19,7 +19,7 @@ import sys
 
 from luigi import Task
 
-from lor.util import reflection
+from lor.util import reflection, static_reflection
 from lor.util.cli import CliCommand
 
 
@@ -38,24 +38,61 @@ class LsCommand(CliCommand):
             type=str,
             nargs="+",
             help="Name of the module(s). Example: 'lor.tasks.tar'")
+        parser.add_argument(
+            "--static",
+            action="store_true",
+            help="Find tasks (and their parameters) by parsing source code rather than importing it. Does not run any "
+                 "module-level code, but cannot see tasks that are created dynamically")
         parsed_args = parser.parse_args(argv)
 
         sys.path.insert(0, os.getcwd())
 
         for mod_or_pkg_name in parsed_args.module_or_package:
-            self.__print_tasks_in_mod_or_pkg(mod_or_pkg_name)
+            if parsed_args.static:
+                self.__print_tasks_in_mod_or_pkg_statically(mod_or_pkg_name)
+            else:
+                self.__print_tasks_in_mod_or_pkg(mod_or_pkg_name)
 
     def __print_tasks_in_mod_or_pkg(self, module_name):
         mod_or_pkg = importlib.import_module(module_name)
         if reflection.is_pkg(mod_or_pkg):
-            all_classes = reflection.classes_in_pkg(mod_or_pkg)
+            # Task names are read from the reflection index, so only modules that changed since `ls` last ran are imported
+            task_class_names = reflection.subclass_names_in_pkg(mod_or_pkg, Task)
+        else:
+            task_classes = reflection.filter_subclasses(Task, reflection.classes_in_module(mod_or_pkg))
+            task_class_names = [task_class.__module__ + "." + task_class.__name__ for task_class in task_classes]
+
+        for task_class_name in task_class_names:
+            print(task_class_name)
+
+    def __print_tasks_in_mod_or_pkg_statically(self, module_name):
+        maybe_source = static_reflection.find_source(module_name)
+
+        if maybe_source is None:
+            raise ImportError("{module_name}: cannot find the source code of this module or package".format(module_name=module_name))
+
+        source_path, is_pkg = maybe_source
+
+        if is_pkg:
+            sources = static_reflection.find_sources_in_pkg(module_name, source_path)
+            # Consistent with `reflection.classes_in_pkg`, which does not look in packages' __init__.py files
+            modules_to_list = [name for name, _, source_is_pkg in sources if not source_is_pkg]
         else:
-            all_classes = reflection.classes_in_module(mod_or_pkg)
+            sources = [(module_name, source_path, False)]
+            modules_to_list = [module_name]
+
+        parsed_modules = static_reflection.parse_module_sources(sources)
+        index = static_reflection.SourceIndex(parsed_modules)
 
-        task_classes = reflection.filter_subclasses(Task, all_classes)
+        def is_parameter(type_name):
+            return index.is_subclass(type_name, set(), static_reflection.is_luigi_parameter_class_name)
 
-        for task_class in task_classes:
-            self.__print_task(task_class)
+        for name in modules_to_list:
+            if "error" in parsed_modules[name]:
+                print(name + ": cannot reflect: {err}".format(err=parsed_modules[name]["error"]), file=sys.stderr)
+                continue
 
-    def __print_task(self, task_class):
-        print(task_class.__module__ + "." + task_class.__name__)
+            for class_name in index.classes(name):
+                if index.is_subclass(class_name, static_reflection.LUIGI_TASK_CLASS_NAMES, static_reflection.is_luigi_task_class_name):
+                    param_names = [param_name for param_name, _ in index.parameters(class_name, is_parameter)]
+                    print("{class_name}({params})".format(class_name=class_name, params=", ".join(param_names)))
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Module for a command that manages the workspace's path index.
+"""
+import argparse
+
+import lor._internal
+from lor import path, workspace
+from lor.util import cli
+from lor.util.cli import CliCommand
+
+
+class PathCommand(CliCommand):
+
+    epilog = """
+    `index` walks the overlay dirs and the workspace once and writes an index of every path in them to the workspace's
+    `.lor/` dir. `lor.path.resolve`, `resolve_all`, and `listdir` then use the index instead of listing directories.
+    Directories that changed since the index was built are detected and resolved from the filesystem, but the index
+    should be rebuilt after large changes.
+    """
+
+    def name(self):
+        return "path"
+
+    def description(self):
+        return "manage the index used to resolve paths in the workspace and overlays"
+
+    def run(self, argv):
+        parser = argparse.ArgumentParser(description=self.description())
+        parser.formatter_class = argparse.RawDescriptionHelpFormatter
+        parser.epilog = self.epilog
+        cli.add_properties_override_arg(parser)
+        cli.add_overlay_arg(parser)
+        parser.add_argument(
+            "action",
+            choices=["index"],
+            help="The action to perform")
+        parsed_args = parser.parse_args(argv)
+
+        property_overrides = cli.extract_property_overrides(parsed_args)
+        overlay_paths = cli.extract_overlay_paths(parsed_args)
+        lor._internal.bootstrap_globals(property_overrides, overlay_paths)
+
+        if parsed_args.action == "index":
+            index_path, num_entries = path.build_index()
+            print("{index_path}: indexed {n} paths in {dirs}".format(index_path=index_path, n=num_entries, dirs=", ".join(path.get_overlay_paths() + [workspace.get_path()])))
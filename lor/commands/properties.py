@@ -33,10 +33,12 @@ class PropertiesCommand(CliCommand):
     def run(self, argv):
         parser = argparse.ArgumentParser(description=self.description())
         cli.add_properties_override_arg(parser)
+        cli.add_overlay_arg(parser)
         lor_args, ignored_args = parser.parse_known_args(argv)
 
         property_overrides = cli.extract_property_overrides(lor_args)
-        lor._internal.bootstrap_globals(property_overrides)
+        overlay_paths = cli.extract_overlay_paths(lor_args)
+        lor._internal.bootstrap_globals(property_overrides, overlay_paths)
 
         for k, v in props.get_all().items():
             print("{k}={v}".format(k=k, v=v))
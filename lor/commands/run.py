@@ -13,11 +13,16 @@
 # limitations under the License.
 #
 import argparse
+import functools
+import json
 
 import luigi
+from luigi.cmdline_parser import CmdlineParser
 
+import lor._instrumentation
 import lor._internal
-from lor.util import cli
+from lor import props
+from lor.util import cli, reflection
 from lor.util.cli import CliCommand
 
 
@@ -26,6 +31,15 @@ class RunCommand(CliCommand):
     epilog = """
     This command is effectively an alias for the base `luigi` command. The only addition is that this command *also* 
     allows overrides that are specific to LoR (e.g. overriding a property value).
+
+    With `--batch`, task specs are read from a JSONL file rather than from the command-line. Each line is a JSON object
+    such as:
+
+        {"module": "foo.tasks", "task": "BarTask", "params": {"output_path": "out.txt"}, "properties": {"k": "v"}}
+
+    All of the tasks are scheduled with a single build, so upstream tasks that are shared between them only run once.
+    `properties` overrides apply whenever that line's task's `requires`, `output`, `complete`, or `run` is called. A
+    JSON summary containing each line's status is written to stdout.
     """
 
     def name(self):
@@ -40,9 +54,230 @@ class RunCommand(CliCommand):
         parser.epilog = self.epilog
 
         cli.add_properties_override_arg(parser)
+        cli.add_overlay_arg(parser)
+        parser.add_argument(
+            "--batch",
+            metavar="TASKS_JSONL",
+            help="Run all of the tasks listed in TASKS_JSONL (one JSON task spec per line) in one build")
+        parser.add_argument(
+            "--instrument",
+            action="store_true",
+            help="Count and time each lor.props.get and lor.path.resolve call (per key) made by this process. A summary "
+                 "is written to --instrument-output and the most-accessed keys are printed when the run finishes")
+        parser.add_argument(
+            "--instrument-output",
+            metavar="JSON_PATH",
+            default=lor._instrumentation.DEFAULT_JSON_PATH,
+            help="Path that --instrument writes its summary to (default: %(default)s)")
+        parser.add_argument(
+            "--instrument-top",
+            metavar="N",
+            type=int,
+            default=lor._instrumentation.NUM_KEYS_TO_PRINT,
+            help="Number of keys to print with --instrument (default: %(default)s)")
         lor_args, luigi_args = parser.parse_known_args(argv)
 
+        if lor_args.instrument:
+            lor._instrumentation.enable(lor_args.instrument_output)
+
         property_overrides = cli.extract_property_overrides(lor_args)
-        lor._internal.bootstrap_globals(property_overrides)
+        overlay_paths = cli.extract_overlay_paths(lor_args)
+        lor._internal.bootstrap_globals(property_overrides, overlay_paths)
+
+        try:
+            if lor_args.batch is None:
+                luigi.run(luigi_args)
+            else:
+                summary = run_batch(load_batch_specs(lor_args.batch), luigi_args)
+                print(json.dumps(summary, indent=2))
+                if not summary["success"]:
+                    exit(1)
+        finally:
+            lor._instrumentation.report(lor_args.instrument_top)
+
+
+class LorRunBatch(luigi.WrapperTask):
+    """
+    Placeholder root task used when parsing Luigi's args for `lor run --batch`
+    """
+
+    description = "Placeholder root task for `lor run --batch`"
+
+
+def load_batch_specs(jsonl_path):
+    """
+    Returns a list of task spec dicts loaded from a JSONL file.
+
+    Blank lines are skipped. Each spec is annotated with its (1-indexed) line number as `line`. Lines that cannot be
+    parsed are returned as specs containing an `error`, so that one bad line does not prevent the other tasks from
+    running.
+
+    :param jsonl_path: Path to a JSONL file containing one task spec per line
+    :return: A list of task spec dicts
+    :raises FileNotFoundError: If `jsonl_path` does not exist
+    """
+    specs = []
+
+    with open(jsonl_path) as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                spec = json.loads(line)
+            except ValueError as ex:
+                spec = {"error": "{jsonl_path}:{line}: invalid JSON: {ex}".format(jsonl_path=jsonl_path, line=line_number, ex=ex)}
+            if not isinstance(spec, dict):
+                spec = {"error": "{jsonl_path}:{line}: not a JSON object".format(jsonl_path=jsonl_path, line=line_number)}
+            spec["line"] = line_number
+            specs.append(spec)
+
+    return specs
+
+
+def run_batch(specs, luigi_args):
+    """
+    Instantiate all tasks in `specs` and schedule them with a single `luigi.build`.
+
+    :param specs: A list of task spec dicts (see `load_batch_specs`)
+    :param luigi_args: Luigi command-line args (e.g. `--local-scheduler`, `--workers 4`) to apply to the build
+    :return: A summary dict containing `success` and a `tasks` list with the status of each spec
+    """
+    # Luigi's command-line parser requires a root task, even though the batch's tasks are instantiated from `specs`
+    with CmdlineParser.global_instance([LorRunBatch.get_task_family()] + luigi_args):
+        results = []
+        tasks = []
+        overrides_by_task_id = {}
+
+        for spec in specs:
+            result = {"line": spec.get("line")}
+            results.append(result)
+            try:
+                task = __instantiate_task(spec)
+                overrides = spec.get("properties") or {}
+                if overrides_by_task_id.get(task.task_id, overrides) != overrides:
+                    raise ValueError("{task_id}: already in the batch with different properties".format(task_id=task.task_id))
+            except Exception as ex:
+                result["status"] = "invalid"
+                result["error"] = str(spec["error"] if "error" in spec else ex)
+                continue
+
+            result["task_id"] = task.task_id
+            overrides_by_task_id[task.task_id] = overrides
+            tasks.append((result, task))
+
+        base_snapshot = props.get_snapshot()
+        unique_tasks = {task.task_id: task for _, task in tasks}.values()
+        try:
+            for task in unique_tasks:
+                __apply_overrides(task, overrides_by_task_id[task.task_id], base_snapshot)
+
+            failures = __BatchBuild().build(task for _, task in tasks)
+
+            for result, task in tasks:
+                if task.complete():
+                    result["status"] = "complete"
+                else:
+                    result["status"] = "incomplete"
+                    if task.task_id in failures:
+                        result["error"] = failures[task.task_id]
+        finally:
+            for task in unique_tasks:
+                __remove_overrides(task)
+            props._set_snapshot(base_snapshot)
+
+    return {
+        "success": all(result["status"] == "complete" for result in results),
+        "tasks": results,
+    }
+
+
+def __instantiate_task(spec):
+    if "error" in spec:
+        raise ValueError(spec["error"])
+
+    for key in ["module", "task"]:
+        if key not in spec:
+            raise ValueError("{key}: missing from task spec".format(key=key))
+
+    task_class = reflection.load_class_by_name(spec["module"] + "." + spec["task"])
+
+    if not (isinstance(task_class, type) and issubclass(task_class, luigi.Task)):
+        raise ValueError("{module}.{task}: not a luigi Task".format(module=spec["module"], task=spec["task"]))
+
+    # Params are parsed the same way as CLI params are, so non-string JSON values (ints, lists, etc.) are dumped back
+    # into their string form first
+    params = {k: v if isinstance(v, str) else json.dumps(v) for k, v in (spec.get("params") or {}).items()}
+
+    return task_class.from_str_params(params)
+
+
+# Luigi calls these during scheduling and the summary as well as while running the task, and they may all depend on
+# property values (e.g. an output path)
+__OVERRIDDEN_METHODS = ["requires", "output", "complete", "run"]
+
+
+def __apply_overrides(task, overrides, base_snapshot):
+    if not overrides:
+        return
+
+    # One snapshot per task, so that properties that are looked up by one of the task's methods are memoized for the
+    # others
+    loader_name = "batch-overrides:{task_id}".format(task_id=task.task_id)
+    snapshot = props.PropertySnapshot([props.DictPropertyLoader(loader_name, overrides)] + base_snapshot.get_loaders())
+
+    for method_name in __OVERRIDDEN_METHODS:
+        method = getattr(task, method_name)
+        # Luigi treats tasks whose `run` is None as external, so that is left as-is
+        if method is not None:
+            setattr(task, method_name, __with_snapshot(method, snapshot))
+
+
+def __with_snapshot(method, snapshot):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        # The previous snapshot is restored (rather than the base one) because the methods call each other (e.g.
+        # `complete` calls `output`)
+        previous_snapshot = props.get_snapshot()
+        props._set_snapshot(snapshot)
+        try:
+            return method(*args, **kwargs)
+        finally:
+            props._set_snapshot(previous_snapshot)
+
+    return wrapper
+
+
+def __remove_overrides(task):
+    # Luigi caches task instances, so the wrappers are removed to stop them leaking into later builds
+    for method_name in __OVERRIDDEN_METHODS:
+        task.__dict__.pop(method_name, None)
+
+
+class __BatchBuild:
+    """A `luigi.build` of a batch's tasks that records why tasks failed.
+
+    Luigi has no public way to unregister an event handler, so one FAILURE handler is registered (when this module is
+    imported) and it records failures against whichever build is running.
+    """
+
+    running = None
+
+    def build(self, tasks):
+        """
+        Build `tasks` and return a dict of <task id: error message> for the tasks that failed.
+        """
+        self.failures = {}
+        previous = type(self).running
+        type(self).running = self
+        try:
+            luigi.build(list(tasks))
+        finally:
+            type(self).running = previous
+
+        return self.failures
+
 
-        luigi.run(luigi_args)
+@luigi.Task.event_handler(luigi.Event.FAILURE)
+def __record_failure(task, exception):
+    if __BatchBuild.running is not None:
+        __BatchBuild.running.failures[task.task_id] = str(exception)
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Module for a command that runs a warm LoR server for the current workspace.
+"""
+import argparse
+
+import lor._constants
+import lor.server
+from lor import client, workspace
+from lor.util.cli import CliCommand
+
+
+class ServerCommand(CliCommand):
+
+    epilog = """
+    While a server is running, the workspace's `bin/lor` forwards the following commands to it: {commands}. The server
+    forks a process for each command, so commands do not need to re-import Luigi, re-locate the workspace, or re-parse
+    properties. Set {env_var} to run a command without the server.
+    """.format(commands=", ".join(sorted(client.FORWARDED_COMMANDS)), env_var=lor._constants.SERVER_DISABLE_ENV_VARNAME)
+
+    def name(self):
+        return "server"
+
+    def description(self):
+        return "run a warm LoR server that the workspace's bin/lor forwards commands to"
+
+    def run(self, argv):
+        parser = argparse.ArgumentParser(description=self.description())
+        parser.formatter_class = argparse.RawDescriptionHelpFormatter
+        parser.epilog = self.epilog
+        parser.add_argument(
+            "--stop",
+            action="store_true",
+            help="Stop the workspace's running server")
+        parsed_args = parser.parse_args(argv)
+
+        ws_path = workspace.get_path()
+
+        if ws_path is None:
+            raise RuntimeError("Not currently in a workspace (or cannot locate one)")
+
+        if parsed_args.stop:
+            if not client.stop_server(ws_path):
+                print("{ws_path}: no LoR server is running for this workspace".format(ws_path=ws_path))
+                exit(1)
+        else:
+            lor.server.serve(ws_path)
@@ -14,6 +14,7 @@
 #
 import os
 
+from lor import workspace
 from lor.generator import Generator
 
 
@@ -41,6 +42,7 @@ class WorkspaceGenerator(Generator):
         self.copy_file("requirements.txt", os.path.join(workspace_name, "requirements.txt"))
         self.render_template("setup.py.jinja2", os.path.join(workspace_name, "setup.py"), template_env)
         self.create_file("", os.path.join(workspace_name, "requirements_dev.txt"))
+        self.copy_file("gitignore", os.path.join(workspace_name, ".gitignore"))
 
         python_src_dir = os.path.join(workspace_name, workspace_name)
         self.mkdir(python_src_dir)
@@ -81,5 +83,6 @@ def create(output_path):
     output_dir, workspace_name = os.path.split(output_path)
     ws_generator = WorkspaceGenerator(output_dir)
     ws_generator.run([workspace_name])
+    workspace._clear_location_cache()
 
     return output_path
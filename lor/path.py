@@ -35,18 +35,44 @@ For example, if workspace code requests a config file:
 
 And the LoR CLI was used:
 
-    $ lor run --module workspace.tasks.foo FooTask --other-workspaces somedir/
+    $ lor run --overlay somedir/ --module workspace.tasks.foo FooTask
 
 Then this module will attempt to resolve "etc/foo.yml" against the `somedir/` overlay, followed by attempting to resolve
-it against the current workspace.
+it against the current workspace. `--overlay` can be given more than once; earlier overlays take precedence. An
+overlay's `etc/properties.yml` (if it has one) also overrides the workspace's properties (see
+`lor._internal.bootstrap_globals`).
+
+Resolution is memoized. The first time a path is resolved, each directory that is needed to check it is listed once
+(with `os.listdir`) and the listing is cached, so resolving many paths in the same directories costs one listing per
+directory rather than one stat per path per overlay, and resolving the same path again does no filesystem calls at all.
+A path that cannot be found is always re-checked against the filesystem, so files that are created later are found.
+Files that are deleted (or created in a higher-priority overlay) after being resolved are *not* noticed until
+`invalidate` is called.
+
+For large overlays, `lor path index` can build a persisted index of every path in the overlays and the workspace (see
+`lor.util.path_index`), which is memory-mapped and used instead of listing directories. Directories whose mtimes
+changed since the index was built are detected (lazily, per directory) and resolved from the filesystem instead.
+
+Path components may reference properties as `${PROP}` (e.g. `lor.path.resolve("${DATA_DIR}", "input.csv")`). The
+references are interpolated with `lor.props.interpolate`, which memoizes the referenced properties' values.
 """
+import fnmatch
+import glob as _glob
 import os
+import stat
 
 import multipath
 
-from lor import workspace
+import lor._constants
+import lor._instrumentation
+import lor._snapshot
+from lor import workspace, props
+from lor.util import interpolation, path_index
 
-__overlay_paths = []
+__overlay_paths = None
+__dir_entries = {}  # <dir path: frozenset of entry names (empty if the dir cannot be listed)>
+__resolved = {}  # <(dirs, paths): list of existent paths>
+__loaded_index = None  # (dirs the index was loaded for, `PathIndex` or None)
 
 
 def get_overlay_paths():
@@ -55,6 +81,13 @@ def get_overlay_paths():
 
     :return: A list of overlay path strings used application-wide.
     """
+    global __overlay_paths
+
+    if __overlay_paths is None:
+        # Launched by a LoR process that passed its overlays via a snapshot (see `lor._snapshot`)
+        snapshot = lor._snapshot.try_load()
+        __overlay_paths = snapshot["overlay_paths"] if snapshot is not None else []
+
     return __overlay_paths
 
 
@@ -73,15 +106,76 @@ def _set_overlay_paths(new_overlay_paths):
         if not isinstance(overlay_path, str):
             raise ValueError("{overlay_path}: is not a string: expecting an overlay path as a string".format(overlay_path=str(overlay_path)))
     for overlay_path in new_overlay_paths:
-        if not os.path.exists(overlay_path):
-            raise FileNotFoundError("{overlay_path}: no such directory: an overlay path argument must exist".format(overlay_path=overlay_path))
-    for overlay_path in new_overlay_paths:
-        if not os.path.isdir(overlay_path):
-            raise NotADirectoryError("{overlay_path}: is not a directory: overlay paths must be directories".format(overlay_path=overlay_path))
+        __validate_overlay_dir(overlay_path)
 
     global __overlay_paths
 
     __overlay_paths = new_overlay_paths
+    invalidate()
+
+
+def __validate_overlay_dir(overlay_path):
+    # One stat per path establishes both existence and type
+    try:
+        mode = os.stat(overlay_path).st_mode
+    except FileNotFoundError:
+        raise FileNotFoundError("{overlay_path}: no such directory: an overlay path argument must exist".format(overlay_path=overlay_path)) from None
+    if not stat.S_ISDIR(mode):
+        raise NotADirectoryError("{overlay_path}: is not a directory: overlay paths must be directories".format(overlay_path=overlay_path))
+
+
+def invalidate():
+    """
+    Forget all memoized path resolutions and directory listings.
+
+    Call this after deleting (or moving) files that might have already been resolved, so that later calls to `resolve`
+    and `resolve_all` see the change.
+    """
+    global __loaded_index
+
+    __dir_entries.clear()
+    __resolved.clear()
+    __loaded_index = None
+
+
+def get_index_path():
+    """
+    Returns the path of the workspace's path index (see `lor path index`), or None if not in a workspace.
+    """
+    ws_path = workspace.get_path()
+    return os.path.join(ws_path, lor._constants.WORKSPACE_PATH_INDEX) if ws_path is not None else None
+
+
+def build_index():
+    """
+    Build (or rebuild) the workspace's path index, which covers every path in the overlays and the workspace.
+
+    :return: A tuple of (index path, number of indexed entries)
+    :raises RuntimeError: If not in a workspace
+    """
+    index_path = get_index_path()
+
+    if index_path is None:
+        raise RuntimeError("Not currently in a workspace (or cannot locate one)")
+
+    # Create the index's dir before walking, so that creating it doesn't make the index stale
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    num_entries = path_index.build(__get_dirs(), index_path, exclude=[lor._constants.WORKSPACE_LOR_DIR])
+    invalidate()
+
+    return index_path, num_entries
+
+
+def __get_index(dirs):
+    global __loaded_index
+
+    if __loaded_index is None or __loaded_index[0] != dirs:
+        index_path = get_index_path()
+        index = path_index.try_load(index_path) if index_path is not None else None
+        # An index built for other overlays can't be used
+        __loaded_index = (dirs, index if index is not None and index.roots == dirs else None)
+
+    return __loaded_index[1]
 
 
 def join(*paths):
@@ -92,16 +186,24 @@ def join(*paths):
     :return: A path resolved relative to the top dir
     :raises ValueError: If no overlay dirs are set *and* the workspace dir cannot be established
     """
-    return multipath.join(__get_dirs(), *paths)
+    return multipath.join(__get_dirs(), *__interpolate(paths))
 
 
 def __get_dirs():
+    overlay_paths = get_overlay_paths()
     ws_path = workspace.get_path()
 
     if ws_path is None:
-        return __overlay_paths
+        return overlay_paths
+    else:
+        return overlay_paths + [ws_path]
+
+
+def __interpolate(paths):
+    if any(interpolation.needs_interpolation(p) for p in paths):
+        return [str(props.interpolate(p)) for p in paths]
     else:
-        return __overlay_paths + [ws_path]
+        return paths
 
 
 def join_all(*paths):
@@ -111,7 +213,7 @@ def join_all(*paths):
     :param paths: Path components to join
     :return: A list of path strings
     """
-    return multipath.join_all(__get_dirs(), *paths)
+    return multipath.join_all(__get_dirs(), *__interpolate(paths))
 
 
 def resolve(*paths):
@@ -124,7 +226,267 @@ def resolve(*paths):
     :raises ValueError: If no overlay dirs are set *and* the workspace dir cannot be established
     :raises FileNotFoundError: If no path could be resolved
     """
-    return multipath.resolve(__get_dirs(), *paths)
+    dirs = __get_dirs()
+    paths = __interpolate(paths)
+
+    if lor._instrumentation.is_enabled():
+        return lor._instrumentation.timed_lookup(
+            "path",
+            os.path.join(*paths) if len(paths) > 0 else "",
+            lambda: __resolve_first(dirs, paths),
+            lambda resolved: next((d for d in dirs if resolved.startswith(os.path.join(d, ""))), None))
+
+    return __resolve_first(dirs, paths)
+
+
+def __resolve_first(dirs, paths):
+    if len(dirs) == 0:
+        raise ValueError("dirs empty: cannot resolve paths against *no* dirs: dirs must contain at least one element")
+
+    resolved = __resolve_all_memoized(dirs, paths)
+
+    if len(resolved) == 0:
+        raise FileNotFoundError("{path}: could not be resolved against {dirs}".format(path=os.path.join(*paths) if len(paths) > 0 else "", dirs=", ".join(dirs)))
+
+    return resolved[0]
+
+
+def __resolve_all_memoized(dirs, paths):
+    key = (tuple(dirs), tuple(paths))
+
+    try:
+        return __resolved[key]
+    except KeyError:
+        pass
+
+    rel_path = os.path.normpath(os.path.join(*paths)) if len(paths) > 0 else "."
+    rel_parts = rel_path.split(os.sep)
+
+    if os.path.isabs(rel_path) or rel_parts[0] in (os.curdir, os.pardir):
+        # Not (cleanly) relative to the dirs, so the listings can't be used
+        resolved = multipath.resolve_all(dirs, *paths)
+    else:
+        index = __get_index(dirs)
+        if index is not None and index.is_fresh(os.path.dirname(rel_path)):
+            resolved = [os.path.join(dirs[i], *paths) for i in index.lookup(rel_path)]
+        else:
+            resolved = [os.path.join(d, *paths) for d in dirs if __exists_in_listings(d, rel_parts)]
+
+        if len(resolved) == 0:
+            # The listings might be stale (e.g. the file was created by a task after its dir was listed)
+            resolved = multipath.resolve_all(dirs, *paths)
+            if len(resolved) > 0:
+                __forget_listings(dirs, rel_parts)
+
+    if len(resolved) > 0:
+        __resolved[key] = resolved
+
+    return resolved
+
+
+def listdir(*paths):
+    """
+    Returns the sorted names of the entries in a directory, merged across the overlay dirs and the workspace.
+
+    :param paths: Path components of the directory, relative to the overlay dirs and workspace (none for the top dir)
+    :return: A sorted list of entry names
+    :raises FileNotFoundError: If the directory does not exist in any overlay dir or the workspace
+    """
+    dirs = __get_dirs()
+    paths = __interpolate(paths)
+    rel_path = os.path.normpath(os.path.join(*paths)) if len(paths) > 0 else os.curdir
+    rel_dir = "" if rel_path == os.curdir else rel_path
+
+    if os.path.isabs(rel_path) or rel_path.split(os.sep)[0] == os.pardir:
+        names = set()
+        dir_paths = [p for p in multipath.join_all(dirs, *paths) if os.path.isdir(p)]
+        for dir_path in dir_paths:
+            names.update(os.listdir(dir_path))
+    else:
+        index = __get_index(dirs)
+        if index is not None and index.is_fresh(rel_dir) and (rel_dir == "" or len(index.lookup(rel_dir)) > 0):
+            return index.listdir(rel_dir)
+
+        dir_paths = [os.path.join(d, rel_dir) for d in dirs if os.path.isdir(os.path.join(d, rel_dir))]
+        names = set()
+        for dir_path in dir_paths:
+            names.update(__list_dir(dir_path))
+
+    if len(dir_paths) == 0:
+        raise FileNotFoundError("{rel_path}: no such directory in {dirs}".format(rel_path=rel_path, dirs=", ".join(dirs)))
+
+    return sorted(names)
+
+
+def glob(pattern):
+    """
+    Yields paths that match `pattern` in the union of the overlay dirs and the workspace.
+
+    `pattern` is relative to the overlay dirs and workspace and may contain shell-style wildcards (see `fnmatch`) in any
+    component, as well as `**`, which matches any number of (nested) directories. As with `glob.glob`, wildcards do not
+    match names that start with a '.' unless the pattern component does too.
+
+    When the same relative path exists in several dirs, only the highest-priority one (the first overlay that contains
+    it, or the workspace) is yielded, so overlays win on name clashes. Paths are yielded lazily, in no particular
+    order, while directories are being scanned, so memory use does not grow with the number of matches.
+
+    :param pattern: A relative path pattern (e.g. "data/*.csv")
+    :return: A generator of (winning) path strings
+    :raises ValueError: If no overlay dirs are set *and* the workspace dir cannot be established
+    """
+    dirs = __get_dirs()
+
+    if len(dirs) == 0:
+        raise ValueError("dirs empty: cannot glob against *no* dirs: dirs must contain at least one element")
+
+    parts = [p for p in str(__interpolate([pattern])[0]).split("/") if p not in ("", os.curdir)]
+
+    if len(parts) == 0:
+        return iter([])
+
+    return __glob_in(dirs, "", parts)
+
+
+def __glob_in(dirs, rel_dir, parts):
+    part, rest = parts[0], parts[1:]
+
+    if part == "**":
+        if len(rest) > 0:
+            yield from __glob_in(dirs, rel_dir, rest)
+        for name, winning_path, is_dir in __merged_listdir(dirs, rel_dir):
+            if not name.startswith("."):
+                if len(rest) == 0:
+                    yield winning_path
+                if is_dir:
+                    yield from __glob_in(dirs, os.path.join(rel_dir, name), parts)
+    elif not _glob.has_magic(part):
+        rel_path = os.path.join(rel_dir, part)
+        if len(rest) > 0:
+            yield from __glob_in(dirs, rel_path, rest)
+        else:
+            winning_dir = __first_containing(dirs, rel_path)
+            if winning_dir is not None:
+                yield os.path.join(winning_dir, rel_path)
+    else:
+        for name, winning_path, is_dir in __merged_listdir(dirs, rel_dir):
+            if fnmatch.fnmatch(name, part) and (not name.startswith(".") or part.startswith(".")):
+                if len(rest) == 0:
+                    yield winning_path
+                elif is_dir:
+                    yield from __glob_in(dirs, os.path.join(rel_dir, name), rest)
+
+
+def walk(*paths, topdown=True):
+    """
+    Yields (rel_dir_path, dir_names, file_names) tuples for each directory in the union of the overlay dirs and the
+    workspace, like `os.walk`.
+
+    `rel_dir_path` is relative to the overlay dirs and workspace, so that files can be resolved with
+    `lor.path.resolve(rel_dir_path, file_name)`. Each directory's entries are merged across all dirs that contain it,
+    with the highest-priority dir deciding whether a name is a file or a directory. As with `os.walk`, when `topdown`
+    is True, `dir_names` can be modified in-place to prune the walk.
+
+    :param paths: Path components of the directory to walk, relative to the overlay dirs and workspace (none for the
+                  top dir)
+    :param topdown: If True, yield each directory before its subdirectories; otherwise, after them
+    :return: A generator of (rel_dir_path, dir_names, file_names) tuples
+    :raises ValueError: If no overlay dirs are set *and* the workspace dir cannot be established
+    """
+    dirs = __get_dirs()
+
+    if len(dirs) == 0:
+        raise ValueError("dirs empty: cannot walk *no* dirs: dirs must contain at least one element")
+
+    paths = __interpolate(paths)
+    top = os.path.normpath(os.path.join(*paths)) if len(paths) > 0 else ""
+
+    return __walk(dirs, "" if top == os.curdir else top, topdown)
+
+
+def __walk(dirs, top, topdown):
+    # Each stack entry is either a dir to scan or, for bottom-up walks, a (finished) result to yield
+    stack = [(False, top)]
+
+    while len(stack) > 0:
+        is_result, item = stack.pop()
+
+        if is_result:
+            yield item
+            continue
+
+        dir_names = []
+        file_names = []
+        for name, _, is_dir in __merged_listdir(dirs, item):
+            (dir_names if is_dir else file_names).append(name)
+
+        if topdown:
+            yield item, dir_names, file_names
+        else:
+            stack.append((True, (item, dir_names, file_names)))
+
+        for name in reversed(dir_names):
+            stack.append((False, os.path.join(item, name)))
+
+
+def __merged_listdir(dirs, rel_dir):
+    # Yields (name, winning path, is_dir) once per name in `rel_dir` across `dirs`. Each dir is listed once, and names
+    # from lower-priority dirs are skipped if they were in a higher-priority dir's listing. Only the listings of this
+    # one directory are held, so memory use does not grow with the size of the tree.
+    higher_names = set()
+    for i, d in enumerate(dirs):
+        dir_path = os.path.join(d, rel_dir)
+        try:
+            names = os.listdir(dir_path)
+        except OSError:
+            continue
+
+        for name in names:
+            if name not in higher_names:
+                path = os.path.join(dir_path, name)
+                yield name, path, os.path.isdir(path)
+
+        if i < len(dirs) - 1:
+            higher_names.update(names)
+
+
+def __first_containing(dirs, rel_path):
+    for d in dirs:
+        if os.path.lexists(os.path.join(d, rel_path)):
+            return d
+    return None
+
+
+def __exists_in_listings(root, rel_parts):
+    d = root
+    for part in rel_parts:
+        if part not in __list_dir(d):
+            return False
+        d = os.path.join(d, part)
+    return True
+
+
+def __list_dir(d):
+    try:
+        return __dir_entries[d]
+    except KeyError:
+        pass
+
+    try:
+        entries = frozenset(os.listdir(d))
+    except OSError:
+        entries = frozenset()
+
+    __dir_entries[d] = entries
+    return entries
+
+
+def __forget_listings(dirs, rel_parts):
+    for root in dirs:
+        d = root
+        __dir_entries.pop(d, None)
+        for part in rel_parts[:-1]:
+            d = os.path.join(d, part)
+            __dir_entries.pop(d, None)
 
 
 def resolve_all(*paths):
@@ -135,4 +497,4 @@ def resolve_all(*paths):
     :param paths: Path components to join
     :return: A list of paths created by joining paths onto each dir in overlay_dirs + the workspace using os.path.join
     """
-    return multipath.resolve_all(__get_dirs(), *paths)
+    return list(__resolve_all_memoized(__get_dirs(), __interpolate(paths)))
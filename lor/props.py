@@ -23,26 +23,129 @@ This module contains basic abstractions for loading properties from various sour
 workspace code to get a property without having to worry about *where* it came from. This module also contains global
 property getters. Those globals can be used at any time without initialization; however, the LoR CLI commands will
 also initialize them with CLI overrides etc.
+
+The global getters do not walk the loaders on each call. Instead, lookups go through a `PropertySnapshot`, which memoizes
+each property the first time it is resolved and is rebuilt whenever the loaders are changed (with `_set_loaders`). The
+default loaders are, in priority order, an `EnvPropertyLoader` (`LOR_PROP_FOO=bar` sets the property `FOO`) and
+`LazyPropertyLoader`s for `~/.lor/properties.yml` and the workspace's properties file, so a properties file is only
+parsed once a lookup actually reaches it.
+
+Long-lived processes (e.g. luigi workers) can pick up edits to the properties files without restarting by setting the
+`LOR_PROPS_RELOAD_INTERVAL` environment variable (seconds), which makes the default loaders
+`ReloadingYAMLFilePropertyLoader`s. `generation` changes whenever properties are reloaded, so caches that are derived
+from properties can check it to invalidate themselves.
+
+Property values can reference other properties, e.g. `OUTPUT_DIR: ${DATA_DIR}/output`. References are resolved (with
+cycle detection) the first time a property is looked up, and the result is memoized with the rest of the snapshot.
 """
+import bisect
 import os
-
-import yaml
+import sys
+import time
 
 import lor._constants
+import lor._instrumentation
+import lor._profiling
+import lor._snapshot
 from lor import util, workspace
+from lor.util import compiled_yaml
+from lor.util.interpolation import Interpolator
 
 __property_loaders = None
+__property_snapshot = None
+__static_snapshot = None  # `__property_snapshot`, if none of its loaders can reload
+__generation = 0
 
 
 def get(prop_name):
     """
     Returns the value of a property.
 
+    `prop_name` can be a dotted name (e.g. "db.pool.size"), which looks up a value in nested property dicts (see
+    `try_get_hierarchical`).
+
     :param prop_name: Name of the property to get
     :return: The property's value
     :raises KeyError if `prop_name` cannot be loaded
     """
-    return get_property_from_list_of_loaders(get_loaders(), prop_name)
+    if __static_snapshot is not None and not lor._instrumentation.is_enabled():
+        # Fast path: no loader can reload, so the snapshot never needs refreshing
+        return __static_snapshot.get(prop_name)
+
+    snapshot = get_snapshot()
+
+    if lor._instrumentation.is_enabled():
+        return lor._instrumentation.timed_lookup("props", prop_name, lambda: snapshot.get(prop_name), lambda _: snapshot.get_source(prop_name))
+
+    return snapshot.get(prop_name)
+
+
+def get_prefix(prefix):
+    """
+    Returns all (leaf) properties whose dotted names start with `prefix`.
+
+    Nested dicts are flattened into dotted names, so a properties file containing `db: {host: h, pool: {size: 4}}`
+    results in `get_prefix("db.")` returning `{"db.host": "h", "db.pool.size": 4}`. Like `get`, properties in
+    higher-priority loaders take precedence (per leaf).
+
+    :param prefix: A dotted-name prefix (e.g. "db.")
+    :return: A dict of <dotted name: value> for each property with the prefix
+    """
+    return get_snapshot().get_prefix(prefix)
+
+
+def interpolate(value):
+    """
+    Returns `value` with any `${PROP}` references replaced by the values of the referenced properties.
+
+    `$${` can be used to write a literal `${`. References to properties that do not exist are left as they are.
+
+    :param value: A value (usually a string) to interpolate
+    :return: The interpolated value
+    :raises ValueError if the references are cyclic
+    """
+    return get_snapshot().interpolate(value)
+
+
+def get_source(prop_name):
+    """
+    Returns the name of the property loader that supplies a property's value.
+
+    :param prop_name: Name of the property
+    :return: The name (see `PropertyLoader.get_name`) of the loader that supplies the property's value
+    :raises KeyError if `prop_name` cannot be loaded
+    """
+    return get_snapshot().get_source(prop_name)
+
+
+def get_snapshot():
+    """
+    Returns a `PropertySnapshot` of the application-wide property loaders.
+
+    :return: A `PropertySnapshot`
+    """
+    global __property_snapshot, __static_snapshot, __generation
+
+    if __property_snapshot is None:
+        __property_snapshot = PropertySnapshot(get_loaders())
+        __static_snapshot = __property_snapshot if not __property_snapshot.can_reload() else None
+    elif __property_snapshot.can_reload() and __property_snapshot.refresh():
+        __generation += 1
+
+    return __property_snapshot
+
+
+def generation():
+    """
+    Returns a counter that is incremented whenever the application-wide properties change.
+
+    Properties change when `_set_loaders` is called or when a (reloading) loader reloads its source. Caches that are
+    built from properties can store the generation they were built at and invalidate themselves once it changes.
+
+    :return: An int
+    """
+    get_snapshot()
+    return __generation
 
 
 def get_loaders():
@@ -58,6 +161,13 @@ def get_loaders():
 def __bootstrap_property_loaders_global():
     global __property_loaders
 
+    snapshot = lor._snapshot.try_load()
+
+    if snapshot is not None:
+        # Launched by a LoR process that passed its (already loaded) properties via a snapshot
+        __property_loaders = [DictPropertyLoader(name, property_dict) for name, property_dict in snapshot["property_loaders"]]
+        return
+
     maybe_ws = workspace.get_path()
 
     if maybe_ws is None:
@@ -67,12 +177,48 @@ def __bootstrap_property_loaders_global():
 
 
 def __get_default_loaders_for_workspace(ws):
+    env_loader = EnvPropertyLoader()
+
     paths_to_load = [
         os.path.join(os.path.expanduser('~'), lor._constants.HOME_FOLDER_NAME, lor._constants.HOME_FOLDER_PROPS_NAME),
         os.path.join(ws, lor._constants.WORKSPACE_PROPS),
     ]
 
-    return [YAMLFilePropertyLoader(p) for p in paths_to_load if os.path.exists(p)]
+    return [env_loader] + [get_optional_yaml_file_loader(p) for p in paths_to_load]
+
+
+def get_optional_yaml_file_loader(path_to_yaml_file):
+    """
+    Returns a lazy loader for a properties YAML file that might not exist.
+
+    The file is not read until a property is first needed from it. A missing file supplies no properties. If
+    `LOR_PROPS_RELOAD_INTERVAL` is set, the file is reloaded when it changes (see `ReloadingYAMLFilePropertyLoader`).
+
+    :param path_to_yaml_file: Path to the YAML file
+    :return: A `LazyPropertyLoader`
+    :raises ValueError: If `LOR_PROPS_RELOAD_INTERVAL` is set but is not a number
+    """
+    reload_interval = os.environ.get(lor._constants.PROPS_RELOAD_INTERVAL_ENV_VARNAME)
+
+    if reload_interval is not None:
+        try:
+            reload_interval = float(reload_interval)
+        except ValueError:
+            raise ValueError("{varname}={val}: not a number: must be the minimum number of seconds between checks for changed property files".format(varname=lor._constants.PROPS_RELOAD_INTERVAL_ENV_VARNAME, val=reload_interval)) from None
+
+    return LazyPropertyLoader(path_to_yaml_file, __optional_yaml_file_loader_factory(path_to_yaml_file, reload_interval), can_reload=reload_interval is not None)
+
+
+def __optional_yaml_file_loader_factory(path_to_yaml_file, reload_interval):
+    def factory():
+        if reload_interval is not None:
+            # Reloading loaders must exist even if the file doesn't (yet), so that creating the file is picked up
+            return ReloadingYAMLFilePropertyLoader(path_to_yaml_file, reload_interval, required=False)
+        elif os.path.exists(path_to_yaml_file):
+            return YAMLFilePropertyLoader(path_to_yaml_file)
+        else:
+            return DictPropertyLoader(path_to_yaml_file, {})
+    return factory
 
 
 def get_all():
@@ -81,7 +227,7 @@ def get_all():
 
     :return a dict containing all available workspace properties and their values.
     """
-    return merge_list_of_property_loaders(get_loaders())
+    return get_snapshot().get_all()
 
 
 def _set_loaders(property_loaders):
@@ -94,10 +240,14 @@ def _set_loaders(property_loaders):
     :param property_loaders: A list of property loaders, ordered by highest- to lowest-priority
     :raises ValueError if property_loaders is not a list of property loaders
     """
-    global __property_loaders
+    global __property_loaders, __property_snapshot, __static_snapshot, __generation
+
+    __generation += 1
 
     if property_loaders is None:
         __property_loaders = None
+        __property_snapshot = None
+        __static_snapshot = None
         return
 
     if not isinstance(property_loaders, list):
@@ -108,6 +258,26 @@ def _set_loaders(property_loaders):
             raise ValueError("{property_loader}: not a PropertyLoader: must be a property loader".format(property_loader=str(property_loader)))
 
     __property_loaders = property_loaders
+    __property_snapshot = None
+    __static_snapshot = None
+
+
+def _set_snapshot(snapshot):
+    """
+    Set the application-wide property loaders to those of `snapshot`, and use `snapshot` (rather than a new snapshot)
+    for lookups.
+
+    Unlike `_set_loaders`, the properties that are already memoized in `snapshot` are kept, so code that switches
+    between a few sets of loaders (e.g. `lor run --batch`'s per-task overrides) can reuse one snapshot per set.
+
+    :param snapshot: A `PropertySnapshot`
+    """
+    global __property_loaders, __property_snapshot, __static_snapshot, __generation
+
+    __generation += 1
+    __property_loaders = snapshot.get_loaders()
+    __property_snapshot = snapshot
+    __static_snapshot = snapshot if not snapshot.can_reload() else None
 
 
 def get_property_from_list_of_loaders(property_loaders, prop_name):
@@ -121,7 +291,7 @@ def get_property_from_list_of_loaders(property_loaders, prop_name):
     :return The property's value
     """
     for property_loader in property_loaders:
-        maybe_ret = property_loader.try_get(prop_name)
+        maybe_ret = try_get_hierarchical(property_loader, prop_name)
         if maybe_ret is not None:
             return maybe_ret
 
@@ -131,19 +301,199 @@ def get_property_from_list_of_loaders(property_loaders, prop_name):
     raise KeyError(err_msg)
 
 
+def try_get_hierarchical(property_loader, prop_name):
+    """
+    Returns the value of a (possibly dotted) property from a `PropertyLoader`, if it has one. Otherwise, returns None.
+
+    A property that is literally named `prop_name` takes precedence. Otherwise, a dotted name such as "db.pool.size" is
+    looked up as `["db"]["pool"]["size"]` in the loader's nested dicts.
+
+    :param property_loader: A `PropertyLoader`
+    :param prop_name: Name of the property
+    :return: The value of the property if it was found; otherwise, None
+    """
+    prop_val = property_loader.try_get(prop_name)
+
+    if prop_val is None and "." in prop_name:
+        segments = prop_name.split(".")
+        prop_val = property_loader.try_get(segments[0])
+        for segment in segments[1:]:
+            if not isinstance(prop_val, dict):
+                return None
+            prop_val = prop_val.get(segment)
+
+    return prop_val
+
+
 def merge_list_of_property_loaders(property_loaders):
     """Returns a dict containing the merge product of all property loaders.
 
     Earlier elements in `property_loaders` take higher priority over lower elements
     """
+    return PropertySnapshot(property_loaders).get_all()
+
+
+class PropertySnapshot:
+    """An immutable, memoized view of a list of property loaders.
+
+    Each property is resolved (by walking the loaders, in priority order) the first time it is looked up; after that,
+    lookups are plain dict lookups. Loaders are only consulted once a lookup reaches them, so lower-priority
+    `LazyPropertyLoader`s are not loaded unless they are needed. The snapshot also records which loader supplied each
+    property. Because loaders are read-only once initialized, a snapshot does not need to be updated unless the *list*
+    of loaders changes.
+
+    String values may reference other properties as `${OTHER_PROP}` (see `lor.util.interpolation`). References are
+    resolved against the snapshot when a value is first looked up and the interpolated value is memoized.
+    """
+
+    def __init__(self, property_loaders):
+        """
+        :param property_loaders: A list of property loaders, ordered by highest- to lowest-priority
+        """
+        self.__loaders = list(property_loaders)
+        self.__reloading_loaders = [loader for loader in self.__loaders if loader.can_reload()]
+        self.__reset()
+        self.__loader_generations = self.__get_loader_generations()
+
+    def __reset(self):
+        self.__resolved = {}  # <prop_name: (raw value, source loader name), or None if no loader has the property>
+        self.__values = {}  # <prop_name: interpolated value>
+        self.__interpolator = Interpolator(lambda prop_name: self.__resolve_or_key_error(prop_name)[0])
+        self.__all = None
+        self.__prefix_index = None  # (sorted dotted names, <dotted name: value>)
+
+    def get_loaders(self):
+        """Returns the snapshot's property loaders, ordered by highest- to lowest-priority.
+        """
+        return list(self.__loaders)
+
+    def can_reload(self):
+        """Returns True if any of the snapshot's loaders can reload (i.e. if `refresh` can ever refresh the snapshot).
+        """
+        return len(self.__reloading_loaders) > 0
+
+    def refresh(self):
+        """Forget memoized properties if any of the loaders' generations changed (i.e. a loader reloaded its source).
+
+        Only loaders that can reload (see `PropertyLoader.can_reload`) are checked.
+
+        :return: True if the snapshot was refreshed
+        """
+        if len(self.__reloading_loaders) == 0:
+            return False
+
+        loader_generations = self.__get_loader_generations()
+
+        if loader_generations == self.__loader_generations:
+            return False
+        else:
+            self.__reset()
+            self.__loader_generations = loader_generations
+            return True
+
+    def try_get(self, prop_name):
+        """Returns the value of a property if it is in the snapshot. Otherwise, returns None.
+        """
+        return self.get(prop_name) if self.__resolve(prop_name) is not None else None
+
+    def get(self, prop_name):
+        """Returns the (interpolated) value of a property.
+
+        :raises KeyError if `prop_name` is not in the snapshot
+        :raises ValueError if `prop_name` references itself (possibly indirectly)
+        """
+        try:
+            return self.__values[prop_name]
+        except KeyError:
+            value = self.__interpolator.get(prop_name)
+            self.__values[prop_name] = value
+            return value
+
+    def interpolate(self, value):
+        """Returns `value` with any `${PROP}` references replaced by the values of those properties.
+
+        """
+        return self.__interpolator.interpolate(value)
+
+    def get_source(self, prop_name):
+        """Returns the name of the loader that supplied a property's value.
+
+        :raises KeyError if `prop_name` is not in the snapshot
+        """
+        return self.__resolve_or_key_error(prop_name)[1]
+
+    def get_all(self):
+        """Returns a new dict containing all properties in the snapshot.
+
+        This loads every loader in the snapshot.
+        """
+        if self.__all is None:
+            merged = {}
+            for loader in self.__loaders:
+                for prop_name, prop_val in (loader.get_all() or {}).items():
+                    merged.setdefault(prop_name, prop_val)
+            self.__all = {k: self.__interpolator.interpolate(v) for k, v in merged.items()}
+
+        return self.__all.copy()
+
+    def get_prefix(self, prefix):
+        """Returns all (leaf) properties whose dotted names start with `prefix` as a dict of <dotted name: value>.
+
+        The first call builds a sorted index of the dotted names of every leaf property (which loads every loader), so
+        that each query is a binary search plus a scan of the matching names.
+        """
+        if self.__prefix_index is None:
+            self.__prefix_index = self.__build_prefix_index()
+
+        names, values = self.__prefix_index
+        ret = {}
+
+        for i in range(bisect.bisect_left(names, prefix), len(names)):
+            if not names[i].startswith(prefix):
+                break
+            ret[names[i]] = values[names[i]]
+
+        return ret
+
+    def __build_prefix_index(self):
+        values = {}
+
+        for loader in self.__loaders:
+            for name, val in util.flatten(loader.get_all() or {}):
+                if val is not None and name not in values:
+                    values[name] = self.__interpolator.interpolate(val)
+
+        return sorted(values), values
 
-    ret = {}
+    def __resolve(self, prop_name):
+        try:
+            return self.__resolved[prop_name]
+        except KeyError:
+            pass
+
+        resolved = None
+        for loader in self.__loaders:
+            # Like `get_property_from_list_of_loaders`, a None value falls through to lower-priority loaders
+            prop_val = try_get_hierarchical(loader, prop_name)
+            if prop_val is not None:
+                resolved = (prop_val, loader.get_name())
+                break
+
+        self.__resolved[prop_name] = resolved
+        return resolved
+
+    def __get_loader_generations(self):
+        return [loader.generation() for loader in self.__reloading_loaders]
 
-    for property_loader in reversed(property_loaders):
-        loader_props = property_loader.get_all()
-        ret = util.merge(ret, loader_props)
+    def __resolve_or_key_error(self, prop_name):
+        resolved = self.__resolve(prop_name)
 
-    return ret
+        if resolved is None:
+            loader_names = util.or_join([loader.get_name() for loader in self.__loaders])
+            err_msg = "{prop_name}: No such property found in {loaders}".format(prop_name=prop_name, loaders=loader_names)
+            raise KeyError(err_msg)
+
+        return resolved
 
 
 class PropertyLoader:
@@ -189,6 +539,26 @@ class PropertyLoader:
         """
         raise NotImplementedError()
 
+    def generation(self):
+        """Returns a counter that changes whenever the loader's properties change.
+
+        Most loaders never change once initialized, so the default implementation always returns 0. Loaders that can
+        change must also override `can_reload`.
+
+        :return: An int
+        """
+        return 0
+
+    def can_reload(self):
+        """Returns True if the loader's properties can change (i.e. if `generation` can change).
+
+        `PropertySnapshot`s only poll the generations of loaders that can reload, so lookups through loaders that never
+        change cost nothing once memoized.
+
+        :return: A bool
+        """
+        return False
+
 
 class DictPropertyLoader(PropertyLoader):
     """A `PropertyLoader` loader that is backed by an in-memory python dict.
@@ -224,8 +594,8 @@ class YAMLFilePropertyLoader(PropertyLoader):
         self.path_to_yaml_file = path_to_yaml_file
 
         try:
-            with open(path_to_yaml_file, "r") as f:
-                self.property_dict = yaml.load(f)
+            with lor._profiling.phase("props.YAMLFilePropertyLoader: " + path_to_yaml_file):
+                self.property_dict = compiled_yaml.load(path_to_yaml_file)
         except Exception as ex:
             raise RuntimeError("{path_to_yaml_file}: Error loading as a standard YAML file: required as a properties file".format(path_to_yaml_file=path_to_yaml_file)) from ex
 
@@ -240,3 +610,175 @@ class YAMLFilePropertyLoader(PropertyLoader):
 
     def get_all(self):
         return self.property_dict
+
+
+class EnvPropertyLoader(PropertyLoader):
+    """A `PropertyLoader` that loads properties from prefixed environment variables.
+
+    For example, with the default prefix (`LOR_PROP_`), the environment variable `LOR_PROP_FOO=bar` is loaded as the
+    property `FOO` with the value "bar". The environment is read once, when the loader is created, so later changes to
+    `os.environ` are not seen by the loader.
+    """
+
+    def __init__(self, prefix=lor._constants.PROPS_ENV_VAR_PREFIX, environ=None):
+        """
+        :param prefix: Prefix of the environment variables to load. The prefix is removed from property names.
+        :param environ: A dict of environment variables to load from (default: `os.environ`)
+        """
+        if environ is None:
+            environ = os.environ
+
+        self.prefix = prefix
+        self.property_dict = {k[len(prefix):]: v for k, v in environ.items() if k.startswith(prefix) and len(k) > len(prefix)}
+
+    def get_name(self):
+        return "environment variables ({prefix}*)".format(prefix=self.prefix)
+
+    def try_get(self, prop_name):
+        return self.property_dict.get(prop_name)
+
+    def get(self, prop_name):
+        return util.try_get_val_or_key_error(self.property_dict, prop_name)
+
+    def get_all(self):
+        return self.property_dict.copy()
+
+
+class LazyPropertyLoader(PropertyLoader):
+    """A `PropertyLoader` that defers creating the loader it wraps until a property is requested from it.
+
+    Useful for loaders that are expensive to create (e.g. because they parse a file in a slow home directory) but that
+    are low-priority, so might never be reached by a lookup. Any errors raised while creating the wrapped loader are
+    raised from the lookup that caused it to be created.
+    """
+
+    def __init__(self, name, loader_factory, can_reload=False):
+        """
+        :param name: A human-readable name for the loader (e.g. the path of the file it loads)
+        :param loader_factory: A callable that takes no arguments and returns the wrapped `PropertyLoader`
+        :param can_reload: True if the loader returned by `loader_factory` can reload (see `PropertyLoader.can_reload`)
+        """
+        self.name = name
+        self.loader_factory = loader_factory
+        self.__can_reload = can_reload
+        self.__loader = None
+
+    def get_name(self):
+        return self.name
+
+    def is_loaded(self):
+        """Returns True if the wrapped loader has been created.
+        """
+        return self.__loader is not None
+
+    def try_get(self, prop_name):
+        return self.__get_loader().try_get(prop_name)
+
+    def get(self, prop_name):
+        return self.__get_loader().get(prop_name)
+
+    def get_all(self):
+        return self.__get_loader().get_all()
+
+    def generation(self):
+        # Not loaded yet, so nothing can have been memoized from it
+        return self.__loader.generation() if self.__loader is not None else 0
+
+    def can_reload(self):
+        return self.__can_reload
+
+    def __get_loader(self):
+        if self.__loader is None:
+            loader = self.loader_factory()
+            if not isinstance(loader, PropertyLoader):
+                raise RuntimeError("{name}: loader factory returned {loader}: must return a PropertyLoader".format(name=self.name, loader=str(loader)))
+            self.__loader = loader
+        return self.__loader
+
+
+class ReloadingYAMLFilePropertyLoader(PropertyLoader):
+    """A `PropertyLoader` that loads property values from a YAML file and reloads them when the file changes.
+
+    Unlike `YAMLFilePropertyLoader`, this is intended for long-lived processes. The file is stat-ed at most once every
+    `min_check_interval` seconds (during a lookup). If its mtime or size changed, it is re-parsed and the new properties
+    replace the old ones in one step, so a lookup never sees a half-loaded file. If the changed file cannot be parsed
+    (e.g. because it's mid-edit), a warning is printed and the previously loaded properties are kept.
+
+    Each reload increments `generation`.
+    """
+
+    def __init__(self, path_to_yaml_file, min_check_interval=1.0, required=True):
+        """
+        :param path_to_yaml_file: Path to the YAML file
+        :param min_check_interval: Minimum number of seconds between checks for changes to the file
+        :param required: If True, the file must exist (and be valid) when the loader is created. Otherwise, a missing
+                         file is treated as an empty one.
+        :raises FileNotFoundError: If `required` and the file does not exist
+        :raises RuntimeError: If `required` and the file cannot be loaded as YAML
+        """
+        if required and not os.path.exists(path_to_yaml_file):
+            raise FileNotFoundError("{path_to_yaml_file}: No such file: required as a YAML file containing properties".format(path_to_yaml_file=path_to_yaml_file))
+
+        self.path_to_yaml_file = path_to_yaml_file
+        self.min_check_interval = min_check_interval
+        self.property_dict = {}
+        self.__generation = 0
+        self.__stat = None
+        self.__next_check = 0.0
+
+        try:
+            self.__check_for_changes()
+        except Exception as ex:
+            if required:
+                raise RuntimeError("{path_to_yaml_file}: Error loading as a standard YAML file: required as a properties file".format(path_to_yaml_file=path_to_yaml_file)) from ex
+            print("{path_to_yaml_file}: cannot load properties: {ex}".format(path_to_yaml_file=path_to_yaml_file, ex=ex), file=sys.stderr)
+
+    def get_name(self):
+        return self.path_to_yaml_file
+
+    def try_get(self, prop_name):
+        self.__maybe_check_for_changes()
+        return self.property_dict.get(prop_name)
+
+    def get(self, prop_name):
+        self.__maybe_check_for_changes()
+        return util.try_get_val_or_key_error(self.property_dict, prop_name)
+
+    def get_all(self):
+        self.__maybe_check_for_changes()
+        return self.property_dict
+
+    def generation(self):
+        self.__maybe_check_for_changes()
+        return self.__generation
+
+    def can_reload(self):
+        return True
+
+    def __maybe_check_for_changes(self):
+        if time.monotonic() >= self.__next_check:
+            try:
+                self.__check_for_changes()
+            except Exception as ex:
+                print("{path_to_yaml_file}: cannot reload properties: keeping previously loaded properties: {ex}".format(path_to_yaml_file=self.path_to_yaml_file, ex=ex), file=sys.stderr)
+
+    def __check_for_changes(self):
+        self.__next_check = time.monotonic() + self.min_check_interval
+
+        try:
+            st = os.stat(self.path_to_yaml_file)
+            stat = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            stat = None
+
+        if stat == self.__stat:
+            return
+
+        if stat is None:
+            property_dict = {}
+        else:
+            property_dict = compiled_yaml.load(self.path_to_yaml_file) or {}
+
+        self.property_dict = property_dict
+        self.__stat = stat
+        self.__generation += 1
@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Warm LoR server
+
+Starting a fresh interpreter for each LoR command means re-importing Luigi, re-locating the workspace, and re-parsing
+property files every time. A `lor server` does that work once and then, for each command forwarded to it by a
+workspace's `bin/lor` (see `lor.client`), forks a child process that runs the command with the client's stdio,
+working directory, environment, and arguments.
+"""
+import os
+import signal
+import socket
+import stat
+import sys
+import traceback
+
+import luigi.configuration
+
+import lor._constants
+import lor._profiling
+import lor.cmdline
+from lor import client, props, workspace
+
+
+def serve(ws_path):
+    """
+    Serve LoR commands for the workspace at `ws_path` until stopped (e.g. with `lor server --stop` or SIGTERM).
+
+    :param ws_path: Path to the workspace
+    :raises RuntimeError: If a server is already running for the workspace
+    """
+    ws_path = os.path.realpath(ws_path)
+    sock_path = client.socket_path(ws_path)
+
+    __prepare_socket_dir(os.path.dirname(sock_path))
+
+    if __is_server_running(sock_path):
+        raise RuntimeError("{ws_path}: a LoR server is already running for this workspace".format(ws_path=ws_path))
+    elif os.path.exists(sock_path):
+        os.remove(sock_path)  # stale socket from a server that did not shut down cleanly
+
+    warm_state = __WarmState(ws_path)
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(sock_path)
+    os.chmod(sock_path, stat.S_IRUSR | stat.S_IWUSR)
+    sock.listen(128)
+
+    previous_sigchld = signal.signal(signal.SIGCHLD, signal.SIG_IGN)  # children are reaped automatically
+    previous_sigterm = signal.signal(signal.SIGTERM, __exit_on_signal)
+
+    print("lor server: serving {ws_path} on {sock_path}".format(ws_path=ws_path, sock_path=sock_path), file=sys.stderr)
+
+    try:
+        while True:
+            conn, _ = sock.accept()
+            with conn:
+                warm_state.refresh()
+
+                # The request is received by the child, so that a client that connects but never sends anything (or
+                # sends slowly) cannot block the server from accepting other connections
+                if os.fork() == 0:
+                    sock.close()
+                    signal.signal(signal.SIGCHLD, previous_sigchld)
+                    signal.signal(signal.SIGTERM, previous_sigterm)
+                    __handle_connection(conn, warm_state)
+    except SystemExit:
+        pass  # stopped with SIGTERM (e.g. by `lor server --stop`)
+    finally:
+        sock.close()
+        if os.path.exists(sock_path):
+            os.remove(sock_path)
+        signal.signal(signal.SIGCHLD, previous_sigchld)
+        signal.signal(signal.SIGTERM, previous_sigterm)
+
+
+def __prepare_socket_dir(sock_dir):
+    os.makedirs(sock_dir, mode=stat.S_IRWXU, exist_ok=True)
+    st = os.stat(sock_dir)
+
+    if st.st_uid != os.getuid() or stat.S_IMODE(st.st_mode) & (stat.S_IRWXG | stat.S_IRWXO):
+        raise PermissionError("{sock_dir}: must be owned by, and only accessible to, the current user".format(sock_dir=sock_dir))
+
+
+def __is_server_running(sock_path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(sock_path)
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def __exit_on_signal(signum, frame):
+    sys.exit(0)
+
+
+class __WarmState:
+    """State that is loaded once by the server and then shared (via fork) with each forwarded command.
+    """
+
+    def __init__(self, ws_path):
+        self.ws_path = ws_path
+        self.props_stats = None
+
+        # Luigi adds $LUIGI_CONFIG_PATH to its config paths when it is imported. The server's is removed again, because
+        # each forwarded command reads its client's (see `__reload_luigi_config`)
+        server_config_path = os.environ.get("LUIGI_CONFIG_PATH")
+        self.luigi_config_paths = {}
+        for parser_class in luigi.configuration.core.PARSERS.values():
+            config_paths = list(parser_class._config_paths)
+            if server_config_path in config_paths:
+                config_paths.remove(server_config_path)
+            self.luigi_config_paths[parser_class] = config_paths
+
+        for name in sorted(client.FORWARDED_COMMANDS):
+            lor.cmdline.get_default_workspace_subcommands()[name].load()
+
+        workspace._set_path(ws_path)
+        self.refresh()
+
+    def refresh(self):
+        """Reload the workspace's properties if any of the files they are loaded from changed.
+        """
+        props_stats = self.__stat_props_files()
+
+        if props_stats != self.props_stats:
+            props._set_loaders(None)
+            try:
+                props.get_all()
+            except Exception as ex:
+                # Not fatal: the error is raised again (and reported to the client) when a command uses the properties
+                props._set_loaders(None)
+                print("lor server: cannot pre-load properties: {ex}".format(ex=ex), file=sys.stderr)
+            self.props_stats = props_stats
+
+    def __stat_props_files(self):
+        paths = [
+            os.path.join(os.path.expanduser('~'), lor._constants.HOME_FOLDER_NAME, lor._constants.HOME_FOLDER_PROPS_NAME),
+            os.path.join(self.ws_path, lor._constants.WORKSPACE_PROPS),
+        ]
+        ret = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+                ret.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                ret.append(None)
+        return ret
+
+
+def __handle_connection(conn, warm_state):
+    exit_code = 1
+
+    try:
+        request = client.recv_message(conn)
+
+        if request is None:
+            return
+        elif request.get("stop", False):
+            os.kill(os.getppid(), signal.SIGTERM)
+            client.send_message(conn, {"stopped": True})
+            return
+
+        stdio_fds = client.recv_fds(conn, 3)
+        for target_fd, fd in enumerate(stdio_fds):
+            os.dup2(fd, target_fd)
+            os.close(fd)
+
+        __apply_client_environment(request, warm_state)
+
+        client.send_message(conn, {"pid": os.getpid()})
+
+        try:
+            lor.cmdline.launch()
+            exit_code = 0
+        except SystemExit as ex:
+            exit_code = __exit_code_of(ex)
+        except BaseException:
+            traceback.print_exc()
+            exit_code = 1
+
+        lor._profiling.report()  # os._exit (below) skips atexit handlers
+        sys.stdout.flush()
+        sys.stderr.flush()
+        client.send_message(conn, {"exit_code": exit_code})
+    finally:
+        os._exit(0)
+
+
+def __apply_client_environment(request, warm_state):
+    os.chdir(request["cwd"])
+    os.environ.clear()
+    os.environ.update(request["env"])
+    sys.argv = ["lor"] + request["argv"]
+
+    # The server's interpreter started with the server's PYTHONPATH, not the client's
+    for entry in reversed(request["env"].get("PYTHONPATH", "").split(os.pathsep)):
+        if entry != "" and entry not in sys.path:
+            sys.path.insert(0, entry)
+
+    __reload_luigi_config(warm_state)
+
+    # The client might be running in a different workspace (e.g. because of LOR_HOME)
+    located_ws_path = workspace.try_locate()
+    if located_ws_path is None or os.path.realpath(located_ws_path) != warm_state.ws_path:
+        workspace._set_path(None)
+        props._set_loaders(None)
+    else:
+        # Environment-variable properties were read from the server's environment, not the client's
+        loaders = props.get_loaders()
+        props._set_loaders([props.EnvPropertyLoader() if isinstance(loader, props.EnvPropertyLoader) else loader for loader in loaders])
+
+
+def __reload_luigi_config(warm_state):
+    # Luigi reads its config once per process, so the server's copy (read from the server's cwd and environment) is
+    # dropped. It is re-read, from the client's cwd (e.g. its luigi.cfg) and $LUIGI_CONFIG_PATH, when it is next used.
+    for parser_class, config_paths in warm_state.luigi_config_paths.items():
+        parser_class._config_paths = list(config_paths)
+        parser_class._instance = None
+
+    if "LUIGI_CONFIG_PATH" in os.environ:
+        luigi.configuration.add_config_path(os.environ["LUIGI_CONFIG_PATH"])
+
+
+def __exit_code_of(system_exit):
+    if system_exit.code is None:
+        return 0
+    elif isinstance(system_exit.code, int):
+        return system_exit.code
+    else:
+        print(system_exit.code, file=sys.stderr)
+        return 1
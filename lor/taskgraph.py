@@ -0,0 +1,431 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Task graph traversal.
+
+Commands such as `lor dot` need the full graph of tasks that a (root) task requires. Luigi tasks can declare their
+requirements as a single task, a list, a dict, or a generator, and large graphs (e.g. backfills) can contain hundreds
+of thousands of tasks in deep chains, so the graph is built with an explicit queue rather than recursion, and each task
+is visited (i.e. has `requires` called) exactly once. `walk` streams the visited tasks, and `build` collects them into a
+`TaskGraph`.
+
+`requires` methods often do I/O (e.g. listing partitions), so both can expand tasks on a bounded thread pool: each task's
+`requires` is evaluated as soon as the task is discovered, rather than when it is visited, so independent tasks (i.e.
+the frontier of the walk) are expanded concurrently. Tasks are still visited (and yielded) in the same order as a
+sequential walk.
+
+Large graphs are usually queried rather than viewed in full, so walks can be limited by depth and filtered while they
+run (see `walk`), `walk_between` finds the tasks on paths between two sets of tasks, and `to_nodes` can collapse tasks
+of the same class into a single node.
+
+`get_statuses` checks whether many tasks are complete at once. Calling each task's `complete` in turn stats each output
+separately (and, for remote targets, makes a round trip per task), so the checks are batched instead: tasks with
+`LocalTarget` outputs are checked by listing each output directory once, classes that implement `bulk_complete` are
+checked with one call per combination of their other parameters (as `luigi.tools.range` calls it), and only the
+remaining tasks (including any whose `bulk_complete` fails) have `complete` called (on a thread pool).
+
+Tasks are identified by their `task_id`, which Luigi derives from the task's family and parameters, so ids are
+deterministic and unique within a graph.
+"""
+import collections
+import functools
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import luigi
+import luigi.task
+
+COMPLETE = "complete"
+INCOMPLETE = "incomplete"
+EXTERNAL = "external"
+STATUS_COLORS = {COMPLETE: "green", INCOMPLETE: "red", EXTERNAL: "gray"}
+
+
+class TaskGraph:
+    """
+    A graph of tasks, rooted at one task.
+
+    `tasks` maps each task id to its task, in the order that the tasks were visited (breadth-first, root first).
+    `requirements` maps each task id to the ids of the tasks it requires, in the order they were declared.
+    """
+
+    def __init__(self, root_id):
+        self.root_id = root_id
+        self.tasks = collections.OrderedDict()
+        self.requirements = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def edges(self):
+        """
+        Yields a (task id, required task id) pair for each dependency in the graph.
+        """
+        for task_id, required_ids in self.requirements.items():
+            for required_id in required_ids:
+                yield task_id, required_id
+
+
+def get_requirements(task):
+    """
+    Returns a list of the tasks that `task` requires, however `task.requires()` structures them.
+
+    :param task: A `luigi.Task`
+    :return: A list of `luigi.Task`s (duplicates removed, in declaration order)
+    """
+    ret = []
+    seen_ids = set()
+
+    for required_task in luigi.task.flatten(task.requires()):
+        if required_task.task_id not in seen_ids:
+            seen_ids.add(required_task.task_id)
+            ret.append(required_task)
+
+    return ret
+
+
+def build(root_task, concurrency=1, max_depth=None, include=None):
+    """
+    Returns the `TaskGraph` of `root_task` and all of the tasks it (transitively) requires.
+
+    :param root_task: A `luigi.Task`
+    :param concurrency: Maximum number of `requires` methods to evaluate at once (see `walk`)
+    :param max_depth: See `walk`
+    :param include: See `walk`
+    :return: A `TaskGraph`
+    :raises ValueError: If `concurrency` is less than 1
+    """
+    graph = TaskGraph(root_task.task_id)
+
+    for task, required_tasks in walk(root_task, concurrency, max_depth, include):
+        graph.tasks[task.task_id] = task
+        graph.requirements[task.task_id] = [t.task_id for t in required_tasks]
+
+    return graph
+
+
+def walk(root_tasks, concurrency=1, max_depth=None, include=None, expand=None):
+    """
+    Yields a (task, required tasks) pair for each root task and each task it (transitively) requires.
+
+    Tasks are yielded as soon as their requirements are known (breadth-first, roots first), so large graphs can be
+    streamed (e.g. written out) without being held in memory. Only the ids of the tasks that were discovered are
+    retained.
+
+    The walk can be restricted while it runs, so that pruned tasks are never expanded (i.e. never have `requires`
+    called):
+
+    - Tasks that are `max_depth` requirements away from a root are yielded, but not expanded
+    - Required tasks for which `include(task)` is False are dropped (along with anything only they require)
+    - Tasks for which `expand(task)` is False are yielded, but not expanded
+
+    If `concurrency` is greater than 1, `requires` methods are evaluated on a pool of that many threads (so they must be
+    thread-safe). The order in which tasks are yielded does not depend on `concurrency`.
+
+    :param root_tasks: A `luigi.Task`, or a list of them
+    :param concurrency: Maximum number of `requires` methods to evaluate at once
+    :param max_depth: Maximum depth to expand tasks to (None for unlimited)
+    :param include: A predicate that returns whether a required task is part of the graph (None to include all)
+    :param expand: A predicate that returns whether a task's requirements should be walked (None to expand all)
+    :return: A generator of (`luigi.Task`, list of required `luigi.Task`s) pairs
+    :raises ValueError: If `concurrency` is less than 1
+    """
+    if concurrency < 1:
+        raise ValueError("{concurrency}: invalid concurrency: must be at least 1".format(concurrency=concurrency))
+
+    roots = root_tasks if isinstance(root_tasks, list) else [root_tasks]
+
+    return __walk(roots, concurrency, max_depth, include or __always, expand or __always)
+
+
+def __always(task):
+    return True
+
+
+def __walk(roots, concurrency, max_depth, include, expand):
+    # Every discovered task's requirements are requested as soon as it is discovered (submitted to the pool, if there
+    # is one), so the queue holds (task, depth, pending requirements) tuples
+    pool = ThreadPoolExecutor(max_workers=concurrency) if concurrency > 1 else None
+
+    def request_requirements(task, depth):
+        if (max_depth is not None and depth >= max_depth) or not expand(task):
+            return None
+        elif pool is None:
+            return __Deferred(get_requirements, task)
+        else:
+            return pool.submit(get_requirements, task)
+
+    discovered_ids = set()
+    queue = collections.deque()
+    for root in roots:
+        if root.task_id not in discovered_ids:
+            discovered_ids.add(root.task_id)
+            queue.append((root, 0, request_requirements(root, 0)))
+
+    try:
+        while len(queue) > 0:
+            task, depth, pending_requirements = queue.popleft()
+            required_tasks = [] if pending_requirements is None else [t for t in pending_requirements.result() if include(t)]
+
+            yield task, required_tasks
+
+            for required_task in required_tasks:
+                if required_task.task_id not in discovered_ids:
+                    discovered_ids.add(required_task.task_id)
+                    queue.append((required_task, depth + 1, request_requirements(required_task, depth + 1)))
+    finally:
+        # e.g. if a `requires` raised or the caller stopped early
+        for _, _, pending_requirements in queue:
+            if pending_requirements is not None:
+                pending_requirements.cancel()
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+
+class __Deferred:
+    # Quacks like a `Future`, but only evaluates when `result` is called (used when walking sequentially)
+
+    def __init__(self, f, *args):
+        self.f = f
+        self.args = args
+
+    def result(self):
+        return self.f(*self.args)
+
+    def cancel(self):
+        return True
+
+
+def walk_between(root_task, from_pattern, to_pattern, concurrency=1, include=None):
+    """
+    Yields a (task, required tasks) pair for each task that is on a path from a "from" task to a "to" task, where both
+    are (transitively) required by `root_task`.
+
+    "from" tasks are tasks whose ids match the `from_pattern` regex, and "to" tasks are tasks whose ids match the
+    `to_pattern` regex (ids start with the task's class name, so either can be a class name). Tasks are only expanded
+    until a "from" task is found and, below it, until a "to" task is found. Because whether a task is on a path is only
+    known once the tasks below it are walked, the tasks below the "from" tasks are held in memory and yielded at the
+    end.
+
+    :param root_task: A `luigi.Task`
+    :param from_pattern: A regex string
+    :param to_pattern: A regex string
+    :param concurrency: See `walk`
+    :param include: See `walk`
+    :return: A generator of (`luigi.Task`, list of required `luigi.Task`s) pairs, where only tasks on a path are
+             required
+    :raises ValueError: If `concurrency` is less than 1
+    :raises re.error: If a pattern is not a valid regex
+    """
+    from_regex = re.compile(from_pattern)
+    to_regex = re.compile(to_pattern)
+
+    def is_from_task(task):
+        return from_regex.search(task.task_id) is not None
+
+    def is_to_task(task):
+        return to_regex.search(task.task_id) is not None
+
+    from_tasks = [t for t, _ in walk(root_task, concurrency, include=include, expand=lambda t: not is_from_task(t)) if is_from_task(t)]
+    visits = list(walk(from_tasks, concurrency, include=include, expand=lambda t: not is_to_task(t)))
+
+    # Walk the (reversed) edges back from the "to" tasks to find every task that leads to one
+    required_by = collections.defaultdict(list)
+    for task, required_tasks in visits:
+        for required_task in required_tasks:
+            required_by[required_task.task_id].append(task.task_id)
+
+    on_path_ids = {task.task_id for task, _ in visits if is_to_task(task)}
+    queue = collections.deque(on_path_ids)
+    while len(queue) > 0:
+        for task_id in required_by[queue.popleft()]:
+            if task_id not in on_path_ids:
+                on_path_ids.add(task_id)
+                queue.append(task_id)
+
+    for task, required_tasks in visits:
+        if task.task_id in on_path_ids:
+            yield task, [t for t in required_tasks if t.task_id in on_path_ids]
+
+
+def to_nodes(visits, collapse_pattern=None, statuses=None):
+    """
+    Yields a graph node (see `lor.util.graph_writers`) for each (task, required tasks) pair in `visits`.
+
+    Each node is labelled with its task's class name. If `collapse_pattern` is supplied, tasks whose class names match
+    it are collapsed into a single node per class, which is labelled with the number of tasks it represents and
+    requires everything they require. Every node then has a "count" attribute. Collapsed nodes are yielded last, once
+    their counts are known.
+
+    If `statuses` is supplied, every node also has "status" and "color" (see `STATUS_COLORS`) attributes. A collapsed
+    node is complete (or external) if all of its tasks are, and is otherwise incomplete.
+
+    :param visits: An iterable of (`luigi.Task`, list of required `luigi.Task`s) pairs, as yielded by `walk`
+    :param collapse_pattern: A regex string (None to not collapse any tasks)
+    :param statuses: A dict of task ids to statuses, as returned by `get_statuses` (None to not include statuses)
+    :return: A generator of (node id, attributes, required node ids) tuples
+    :raises re.error: If `collapse_pattern` is not a valid regex
+    """
+    def attrs(label, status, count=None):
+        ret = {"label": label}
+        if count is not None:
+            ret["count"] = str(count)
+        if statuses is not None:
+            ret["status"] = status
+            ret["color"] = STATUS_COLORS[status]
+        return ret
+
+    def status_of(task):
+        return statuses[task.task_id] if statuses is not None else None
+
+    if collapse_pattern is None:
+        for task, required_tasks in visits:
+            yield task.task_id, attrs(type(task).__name__, status_of(task)), [t.task_id for t in required_tasks]
+        return
+
+    collapse_regex = re.compile(collapse_pattern)
+
+    def node_id(task):
+        class_name = type(task).__name__
+        return "collapsed:" + class_name if collapse_regex.search(class_name) is not None else task.task_id
+
+    # <collapsed node id: [class name, count, OrderedDict of required node ids, set of statuses]>
+    collapsed = collections.OrderedDict()
+    for task, required_tasks in visits:
+        task_node_id = node_id(task)
+        required_node_ids = collections.OrderedDict((node_id(t), None) for t in required_tasks)
+        required_node_ids.pop(task_node_id, None)  # e.g. a collapsed class that requires itself
+
+        if task_node_id == task.task_id:
+            yield task_node_id, attrs(type(task).__name__, status_of(task), 1), list(required_node_ids)
+        else:
+            entry = collapsed.setdefault(task_node_id, [type(task).__name__, 0, collections.OrderedDict(), set()])
+            entry[1] += 1
+            entry[2].update(required_node_ids)
+            entry[3].add(status_of(task))
+
+    for collapsed_node_id, (class_name, count, required_node_ids, task_statuses) in collapsed.items():
+        label = "{class_name} (x{count})".format(class_name=class_name, count=count)
+        status = task_statuses.pop() if len(task_statuses) == 1 else INCOMPLETE
+        yield collapsed_node_id, attrs(label, status, count), list(required_node_ids)
+
+
+def get_statuses(tasks, concurrency=1):
+    """
+    Returns the status of each task in `tasks`: `COMPLETE`, `INCOMPLETE`, or `EXTERNAL` (for tasks that are not ran by
+    Luigi, such as `luigi.ExternalTask`s, which are not checked).
+
+    Checks are batched (see the module docs), so this is much faster than calling `complete` on each task, but relies
+    on tasks' `complete`, `exists`, and `bulk_complete` methods being consistent with each other (as Luigi requires).
+
+    :param tasks: An iterable of `luigi.Task`s
+    :param concurrency: Maximum number of directories to list, or `complete` methods to call, at once
+    :return: A dict of task ids to statuses
+    :raises ValueError: If `concurrency` is less than 1
+    """
+    if concurrency < 1:
+        raise ValueError("{concurrency}: invalid concurrency: must be at least 1".format(concurrency=concurrency))
+
+    ret = {}
+    local_outputs = {}  # <task id: list of (dir, name) pairs>
+    bulk_tasks = collections.OrderedDict()  # <class: list of tasks>
+    other_tasks = []
+
+    for task in tasks:
+        if task.run is None or task.run == NotImplemented:
+            # Same test as Luigi's scheduler uses for external tasks
+            ret[task.task_id] = EXTERNAL
+        elif __has_bulk_complete(type(task)):
+            bulk_tasks.setdefault(type(task), []).append(task)
+        elif type(task).complete is luigi.Task.complete:
+            outputs = luigi.task.flatten(task.output())
+            if len(outputs) == 0:
+                ret[task.task_id] = INCOMPLETE  # Luigi's `complete` is False for tasks without outputs
+            elif all(type(output).exists is luigi.LocalTarget.exists for output in outputs):
+                local_outputs[task.task_id] = [os.path.split(os.path.abspath(output.path)) for output in outputs]
+            else:
+                other_tasks.append(task)
+        else:
+            other_tasks.append(task)
+
+    for cls, cls_tasks in bulk_tasks.items():
+        for group_tasks, complete_ids in __bulk_complete(cls, cls_tasks):
+            if complete_ids is None:
+                other_tasks.extend(group_tasks)
+            else:
+                for task in group_tasks:
+                    ret[task.task_id] = COMPLETE if task.task_id in complete_ids else INCOMPLETE
+
+    pool = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        dirs = list({d for pairs in local_outputs.values() for d, _ in pairs})
+        dir_entries = dict(zip(dirs, pool.map(__list_dir, dirs)))
+        for task_id, pairs in local_outputs.items():
+            ret[task_id] = COMPLETE if all(name in dir_entries[d] for d, name in pairs) else INCOMPLETE
+
+        for task, is_complete in zip(other_tasks, pool.map(lambda t: t.complete(), other_tasks)):
+            ret[task.task_id] = COMPLETE if is_complete else INCOMPLETE
+    finally:
+        pool.shutdown(wait=True)
+
+    return ret
+
+
+def __has_bulk_complete(cls):
+    return getattr(cls.bulk_complete, "__func__", None) is not luigi.Task.bulk_complete.__func__
+
+
+def __bulk_complete(cls, cls_tasks):
+    # Yields (tasks, ids of the complete tasks, or None if they must be checked with `complete`) pairs.
+    #
+    # Calls `bulk_complete` the way `luigi.tools.range` does: with a `functools.partial` of the class that fixes every
+    # parameter except the first positional one, and the (scalar) values of that parameter. So tasks are grouped by the
+    # values of their other parameters.
+    positional_params = [(name, param) for name, param in cls.get_params() if param.positional]
+
+    if len(positional_params) == 0:
+        yield cls_tasks, None
+        return
+
+    varying_name, varying_param = positional_params[0]
+    groups = collections.OrderedDict()  # <serialized fixed params: list of tasks>
+    for task in cls_tasks:
+        fixed_params = tuple((name, param.serialize(task.param_kwargs[name])) for name, param in cls.get_params() if name != varying_name)
+        groups.setdefault(fixed_params, []).append(task)
+
+    for group_tasks in groups.values():
+        fixed_kwargs = {k: v for k, v in group_tasks[0].param_kwargs.items() if k != varying_name}
+        tasks_by_value = collections.OrderedDict()  # <serialized varying value: list of tasks>
+        for task in group_tasks:
+            tasks_by_value.setdefault(varying_param.serialize(task.param_kwargs[varying_name]), []).append(task)
+
+        try:
+            values = [value_tasks[0].param_kwargs[varying_name] for value_tasks in tasks_by_value.values()]
+            complete_values = cls.bulk_complete.__func__(functools.partial(cls, **fixed_kwargs), values)
+            complete_ids = {t.task_id for v in complete_values for t in tasks_by_value.get(varying_param.serialize(v), [])}
+        except Exception:
+            # e.g. `BulkCompleteNotImplementedError`, or an implementation that expects different parameters
+            yield group_tasks, None
+            continue
+
+        yield group_tasks, complete_ids
+
+
+def __list_dir(d):
+    try:
+        return frozenset(os.listdir(d))
+    except OSError:
+        return frozenset()
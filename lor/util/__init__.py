@@ -82,6 +82,32 @@ def merge(h1, h2):
     return ret
 
 
+def flatten(dic, separator="."):
+    """
+    Returns a list of (name, value) pairs for each leaf in a nested dict, where names are the keys joined by ``separator``.
+
+    For example, ``{"a": {"b": 1, "c": 2}, "d": 3}`` is flattened to ``("a.b", 1)``, ``("a.c", 2)``, and ``("d", 3)`` (in
+    no particular order). Values that are not dicts (including lists) are leaves.
+
+    :param dic: A (possibly nested) python dict
+    :param separator: The string used to join keys
+    :return: A list of (name, value) tuples
+    """
+    ret = []
+    stack = [("", dic)]
+
+    while len(stack) > 0:
+        prefix, d = stack.pop()
+        for k, v in d.items():
+            name = prefix + str(k)
+            if isinstance(v, dict):
+                stack.append((name + separator, v))
+            else:
+                ret.append((name, v))
+
+    return ret
+
+
 def uri_subfolder(base, subfolder):
     """
     Returns a URI created by addin ``subfolder`` (a path) to the end of ``base`` (a URI).
@@ -14,6 +14,9 @@
 #
 """Utilities for command-line interfaces
 """
+import os
+
+from lor.util import reflection
 
 
 class CliCommand:
@@ -44,6 +47,42 @@ class CliCommand:
         raise NotImplementedError()
 
 
+class LazyCliCommand(CliCommand):
+    """
+    A `CliCommand` that only imports its implementation when it is ran.
+
+    The name and description are supplied up-front, so the command can be listed (e.g. in `--help`) without importing
+    the implementing class's module, which might be expensive to import.
+    """
+
+    def __init__(self, name, description, class_name):
+        """
+        :param name: The command's name (e.g. `run`)
+        :param description: A human-readable description of the command
+        :param class_name: Fully-qualified name of the `CliCommand` class that implements the command
+        """
+        self.__name = name
+        self.__description = description
+        self.class_name = class_name
+
+    def name(self):
+        return self.__name
+
+    def description(self):
+        return self.__description
+
+    def load(self):
+        """
+        Returns an instance of the implementing `CliCommand`, importing its module if necessary.
+
+        :return: An instance of the implementing `CliCommand`
+        """
+        return reflection.load_class_by_name(self.class_name)()
+
+    def run(self, argv):
+        self.load().run(argv)
+
+
 def add_commands_as_subcommands(arg_parser, subcommands):
     subparsers = arg_parser.add_subparsers(
         help="subcommands",
@@ -68,8 +107,28 @@ def add_properties_override_arg(subparser):
         nargs='*')
 
 
+def add_overlay_arg(subparser):
+    subparser.add_argument(
+        "--overlay",
+        type=str,
+        metavar="DIR",
+        dest="overlays",
+        action="append",
+        help="Resolve workspace paths (and etc/properties.yml) against DIR before the workspace. Can be given more than "
+             "once: earlier overlays take precedence over later ones")
+
+
+def extract_overlay_paths(namespace):
+    return [os.path.abspath(os.path.expanduser(p)) for p in namespace.overlays or []]
+
+
 def extract_property_overrides(namespace):
-    if namespace.properties is not None:
-        return {e.split("=")[0]: e.split("=")[1] for e in namespace.properties}
-    else:
-        return {}
+    ret = {}
+
+    for entry in namespace.properties or []:
+        k, sep, v = entry.partition("=")
+        if sep == "":
+            raise ValueError("{entry}: not a KEY=VALUE pair: property overrides must be KEY=VALUE pairs".format(entry=entry))
+        ret[k] = v
+
+    return ret
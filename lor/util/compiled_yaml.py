@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Loading YAML files via a compiled (marshalled) cache
+
+Parsing a large YAML file with the pure-python parser is slow, and the same files (e.g. a workspace's
+`etc/properties.yml`) are parsed every time LoR starts. `load` keeps a compiled copy of the parsed document beside the
+YAML file, which is used instead of parsing the file if it is still valid.
+
+A cache is a one-line JSON header (containing the YAML file's path, mtime, size, and content hash), followed by the
+document serialized with `marshal`. A cache is valid if its path, mtime, and size match the YAML file's. If the mtime or
+size differ (e.g. because the file was touched), the file's content hash is compared before re-parsing it. The document
+is only decoded once the header has been validated, and `marshal` (unlike `pickle`) cannot run code while decoding.
+Documents that `marshal` cannot serialize (e.g. ones containing timestamps), and caches that cannot be written (e.g.
+because the folder is read-only), are silently not cached.
+
+YAML is parsed with the safe loader, using the libyaml-backed `CSafeLoader` if it is available.
+"""
+import hashlib
+import json
+import marshal
+import os
+import tempfile
+
+import yaml
+
+import lor._constants
+
+__CACHE_FORMAT_VERSION = 2
+__yaml_loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def load(yaml_path):
+    """
+    Returns the parsed content of a YAML file, using (and updating) its compiled cache.
+
+    :param yaml_path: Path to a YAML file
+    :return: The parsed document (e.g. a dict)
+    :raises FileNotFoundError: If `yaml_path` does not exist
+    :raises yaml.YAMLError: If `yaml_path` cannot be parsed as YAML
+    """
+    yaml_path = os.path.abspath(yaml_path)
+    st = os.stat(yaml_path)
+    cache_path = get_cache_path(yaml_path)
+    header, payload = __try_read_cache(cache_path, yaml_path)
+
+    if header is not None and header["mtime_ns"] == st.st_mtime_ns and header["size"] == st.st_size:
+        cached = __try_decode(payload)
+        if cached is not None:
+            return cached[0]
+
+    with open(yaml_path, "rb") as f:
+        content = f.read()
+
+    sha1 = hashlib.sha1(content).hexdigest()
+    cached = __try_decode(payload) if header is not None and header["sha1"] == sha1 else None
+
+    if cached is not None:
+        data = cached[0]
+    else:
+        data = yaml.load(content, Loader=__yaml_loader)
+
+    __try_write_cache(cache_path, {
+        "version": __CACHE_FORMAT_VERSION,
+        "path": yaml_path,
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "sha1": sha1,
+    }, data)
+
+    return data
+
+
+def get_cache_path(yaml_path):
+    """
+    Returns the path of the compiled cache for a YAML file.
+
+    The cache is a hidden file in the same folder as the YAML file (e.g. `etc/.properties.yml.cache`).
+
+    :param yaml_path: Path to a YAML file
+    :return: Path to the YAML file's compiled cache
+    """
+    parent, name = os.path.split(os.path.abspath(yaml_path))
+    return os.path.join(parent, "." + name + lor._constants.COMPILED_YAML_CACHE_SUFFIX)
+
+
+def __try_read_cache(cache_path, yaml_path):
+    # Returns (header, undecoded payload), or (None, None) if there is no cache for `yaml_path`
+    try:
+        with open(cache_path, "rb") as f:
+            header = json.loads(f.readline().decode("utf-8"))
+            payload = f.read()
+    except (OSError, ValueError):
+        return None, None
+
+    if isinstance(header, dict) and header.get("version") == __CACHE_FORMAT_VERSION and header.get("path") == yaml_path:
+        return header, payload
+    else:
+        return None, None
+
+
+def __try_decode(payload):
+    # Returns a 1-tuple containing the document (which may itself be None), or None if `payload` is invalid
+    try:
+        return (marshal.loads(payload),)
+    except (EOFError, ValueError, TypeError):
+        return None
+
+
+def __try_write_cache(cache_path, header, data):
+    try:
+        payload = marshal.dumps(data)
+    except ValueError:
+        return  # e.g. the document contains timestamps
+
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path), prefix=os.path.basename(cache_path))
+    except OSError:
+        return
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            f.write(payload)
+        os.replace(tmp_path, cache_path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
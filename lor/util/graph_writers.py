@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Streaming writers for directed graphs
+
+Each writer takes an iterable of nodes and writes them to a text file object as they arrive, so graphs never need to be
+held in memory. A node is a (node id, attributes, required node ids) tuple, where the attributes are a dict of strings
+(e.g. `{"label": "FooTask"}`) that has the same keys for every node, and there is an edge from the node to each required
+node. An edge can refer to a node that has not been written yet.
+
+Formats:
+
+- dot: Graphviz DOT
+- json: A single JSON object, `{"nodes": [{"id": ..., <attributes>, "requires": [...]}, ...]}`
+- jsonl: One JSON object per line, one line per node (with the same fields as `json`)
+- graphml: GraphML XML, with each attribute declared as a node `key`
+- edgelist: One "<node id> <required node id>" line per edge
+"""
+import json
+from xml.sax.saxutils import escape, quoteattr
+
+FORMATS = ["dot", "json", "jsonl", "graphml", "edgelist"]
+
+
+def write(nodes, fmt, out):
+    """
+    Writes `nodes` to `out` in format `fmt`.
+
+    :param nodes: An iterable of (node id, attributes dict, list of required node ids) tuples
+    :param fmt: One of `FORMATS`
+    :param out: A text file object
+    :raises ValueError: If `fmt` is not a supported format
+    """
+    writers = {
+        "dot": write_dot,
+        "json": write_json,
+        "jsonl": write_jsonl,
+        "graphml": write_graphml,
+        "edgelist": write_edgelist,
+    }
+
+    if fmt not in writers:
+        raise ValueError("{fmt}: unsupported graph format: must be one of: {formats}".format(fmt=fmt, formats=", ".join(FORMATS)))
+
+    writers[fmt](nodes, out)
+
+
+def write_dot(nodes, out):
+    out.write("strict digraph {\n")
+    for node_id, attrs, required_ids in nodes:
+        attr_list = ", ".join("{k}={v}".format(k=k, v=__dot_id(v)) for k, v in attrs.items())
+        out.write("{node} [{attrs}];\n".format(node=__dot_id(node_id), attrs=attr_list))
+        for required_id in required_ids:
+            out.write("{node} -> {required};\n".format(node=__dot_id(node_id), required=__dot_id(required_id)))
+    out.write("}\n")
+
+
+def __dot_id(s):
+    # Always quoted, so ids never clash with DOT keywords or need to be checked for special characters
+    return '"' + str(s).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def write_json(nodes, out):
+    out.write('{"nodes": [')
+    for i, node in enumerate(nodes):
+        out.write(",\n" if i > 0 else "\n")
+        out.write(json.dumps(__to_json_obj(node)))
+    out.write("\n]}\n")
+
+
+def write_jsonl(nodes, out):
+    for node in nodes:
+        out.write(json.dumps(__to_json_obj(node)))
+        out.write("\n")
+
+
+def __to_json_obj(node):
+    node_id, attrs, required_ids = node
+    ret = {"id": node_id}
+    ret.update(attrs)
+    ret["requires"] = required_ids
+    return ret
+
+
+def write_graphml(nodes, out):
+    out.write('<?xml version="1.0" encoding="utf-8"?>\n')
+    out.write('<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n')
+
+    # Keys must be declared before the graph, so they are taken from the first node
+    graph_started = False
+    for node_id, attrs, required_ids in nodes:
+        if not graph_started:
+            for k in attrs:
+                out.write('<key id={k} for="node" attr.name={k} attr.type="string"/>\n'.format(k=quoteattr(k)))
+            out.write('<graph edgedefault="directed">\n')
+            graph_started = True
+
+        out.write("<node id={node}>".format(node=quoteattr(node_id)))
+        for k, v in attrs.items():
+            out.write("<data key={k}>{v}</data>".format(k=quoteattr(k), v=escape(str(v))))
+        out.write("</node>\n")
+        for required_id in required_ids:
+            out.write("<edge source={node} target={required}/>\n".format(node=quoteattr(node_id), required=quoteattr(required_id)))
+
+    if not graph_started:
+        out.write('<graph edgedefault="directed">\n')
+    out.write("</graph>\n</graphml>\n")
+
+
+def write_edgelist(nodes, out):
+    for node_id, _, required_ids in nodes:
+        for required_id in required_ids:
+            out.write("{node} {required}\n".format(node=node_id, required=required_id))
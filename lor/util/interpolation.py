@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""`${NAME}`-style string interpolation
+
+Strings such as "${DATA_DIR}/input.csv" are compiled once (see `compile_template`) into a list of literal parts and
+references, which can then be rendered quickly. An `Interpolator` resolves named values that may reference each other,
+memoizing each resolved value and detecting reference cycles. References to unknown names are left exactly as they
+are written (e.g. a shell command such as "echo ${ HOME }" is not an error), as are malformed references (`${}`, or a
+`${` without a closing `}`), so that one such value cannot break lookups of other values.
+
+`$${` is an escape for a literal `${`.
+"""
+import functools
+import re
+
+# A reference's name cannot contain "$", "{", or "}", so that e.g. the "${" in "s/${/x/ ${a}" is not taken to be the start
+# of a reference that ends at "${a}"'s "}"
+__TOKEN_PATTERN = re.compile(r"\$\$\{|\$\{([^${}]*)\}")
+
+
+class Template:
+    """A compiled `${NAME}` template.
+    """
+
+    def __init__(self, parts):
+        """
+        :param parts: A list of (is_reference, str, source) tuples, where the str is literal text or a reference's name
+                      and the source is the part's text as it was written in the template (e.g. "${ NAME }")
+        """
+        self.parts = parts
+        self.references = [s for is_reference, s, _ in parts if is_reference]
+
+    def render(self, lookup, keep_unknown=False):
+        """
+        Returns the template with each reference replaced by `lookup(name)`.
+
+        If the template is *only* one reference (e.g. "${foo}"), the looked-up value is returned as-is, so that
+        non-string values (numbers, lists, etc.) can be referenced without being converted to strings.
+
+        :param lookup: A callable that takes a reference's name and returns its value
+        :param keep_unknown: If True, references that `lookup` raises KeyError for are rendered as they were written
+        :return: The rendered value
+        """
+        if len(self.parts) == 1 and self.parts[0][0]:
+            return self.__lookup(lookup, keep_unknown, self.parts[0])
+
+        return "".join(str(self.__lookup(lookup, keep_unknown, part)) if part[0] else part[1] for part in self.parts)
+
+    @staticmethod
+    def __lookup(lookup, keep_unknown, part):
+        _, name, source = part
+        try:
+            return lookup(name)
+        except KeyError:
+            if keep_unknown:
+                return source
+            raise
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_template(s):
+    """
+    Returns a compiled `Template` for `s`.
+
+    Compiled templates are memoized, so repeatedly compiling the same string is cheap.
+
+    :param s: A string that may contain `${NAME}` references
+    :return: A `Template`
+    """
+    parts = []
+    literal = []
+    pos = 0
+
+    for match in __TOKEN_PATTERN.finditer(s):
+        literal.append(s[pos:match.start()])
+        name = match.group(1).strip() if match.group(1) is not None else ""
+        if match.group(0) == "$${":
+            literal.append("${")
+        elif name == "":
+            literal.append(match.group(0))  # an empty reference (e.g. "${}") is not a reference
+        else:
+            if len("".join(literal)) > 0:
+                parts.append((False, "".join(literal), "".join(literal)))
+            literal = []
+            parts.append((True, name, match.group(0)))
+        pos = match.end()
+
+    # An unterminated "${" does not match the token pattern, so it stays in the literal text
+    literal.append(s[pos:])
+
+    if len("".join(literal)) > 0 or len(parts) == 0:
+        parts.append((False, "".join(literal), "".join(literal)))
+
+    return Template(parts)
+
+
+def needs_interpolation(value):
+    """
+    Returns True if `value` is a string containing a reference or escape (i.e. might be changed by interpolation)
+
+    :param value: Any value
+    :return: True if `value` might need to be interpolated
+    """
+    return isinstance(value, str) and "${" in value
+
+
+class Interpolator:
+    """Resolves named values, interpolating `${NAME}` references to other named values.
+
+    Each name is resolved once: the interpolated value is memoized, so later lookups do not re-render it. Strings in
+    nested dicts and lists are also interpolated. References to names that `lookup_raw` does not know are left verbatim.
+    """
+
+    def __init__(self, lookup_raw):
+        """
+        :param lookup_raw: A callable that takes a name and returns its raw (uninterpolated) value. Raises KeyError for
+                           unknown names.
+        """
+        self.lookup_raw = lookup_raw
+        self.__resolved = {}
+        self.__resolving = []
+
+    def get(self, name):
+        """
+        Returns the interpolated value of `name`.
+
+        :param name: Name of the value
+        :return: The interpolated value
+        :raises KeyError: If `name` cannot be found
+        :raises ValueError: If `name` references itself (possibly indirectly)
+        """
+        try:
+            return self.__resolved[name]
+        except KeyError:
+            pass
+
+        return self.__resolve(name, self.lookup_raw(name))
+
+    def __resolve(self, name, raw_value):
+        if name in self.__resolving:
+            cycle = " -> ".join(self.__resolving[self.__resolving.index(name):] + [name])
+            raise ValueError("{cycle}: cyclic reference".format(cycle=cycle))
+
+        self.__resolving.append(name)
+        try:
+            value = self.interpolate(raw_value)
+        finally:
+            self.__resolving.pop()
+
+        self.__resolved[name] = value
+        return value
+
+    def interpolate(self, value):
+        """
+        Returns `value` with all `${NAME}` references (in strings, or strings nested in dicts and lists) resolved with
+        `get`.
+
+        :param value: A value to interpolate
+        :return: The interpolated value
+        """
+        if needs_interpolation(value):
+            return compile_template(value).render(self.__get_reference, keep_unknown=True)
+        elif isinstance(value, dict):
+            return {k: self.interpolate(v) for k, v in value.items()}
+        elif isinstance(value, list):
+            return [self.interpolate(v) for v in value]
+        else:
+            return value
+
+    def __get_reference(self, name):
+        try:
+            return self.__resolved[name]
+        except KeyError:
+            pass
+
+        return self.__resolve(name, self.lookup_raw(name))
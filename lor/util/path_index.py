@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""A persisted index of the files in a list of (overlay) directories
+
+Resolving paths against large, read-only overlays (e.g. reference data containing hundreds of thousands of files) by
+listing or stat-ing directories is slow. `build` walks each root dir once and writes a compact, sorted manifest of
+every entry (file or directory) in the union of the roots, recording which roots contain each entry. `PathIndex`
+memory-maps the manifest and answers "which roots contain this path?" and "what is in this directory?" with a binary
+search, without touching the indexed directories.
+
+Entries are keyed by "<parent dir>\\0<name>", so the entries of each directory are contiguous in the manifest (and
+sorted by name), which makes listing a directory a range query.
+
+The manifest also records the mtime of every indexed directory in every root. Adding, removing, or renaming an entry
+changes its parent directory's mtime, so a directory's part of the index is stale if any root's copy of the directory
+has a different mtime (or has appeared/disappeared). The mtimes are kept in a second sorted section, so that they are
+looked up (with a binary search) only for the directories that are checked. `PathIndex` checks this lazily, at most
+once per directory, and reports stale directories so that callers can fall back to the filesystem.
+
+Manifest layout (integers are little-endian):
+
+- 8 byte magic (`MAGIC`)
+- uint32 header length, followed by a JSON header: `{"roots": [...]}`
+- uint64 number of entries (N), followed by N uint64 absolute offsets of the entries, in key order
+- uint64 number of indexed directories (D), followed by D uint64 absolute offsets of the directories, in rel dir order
+- N entries, each: uint64 bitmask of roots containing the entry, uint8 1 if it is a directory (in any root), uint16 key
+  length, and the UTF-8 key
+- D directories, each: uint64 bitmask of roots containing the directory, uint16 rel dir length, the UTF-8 rel dir, and
+  an int64 mtime_ns per root (0 for roots that do not contain the directory)
+"""
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+MAGIC = b"LORPIDX\x02"
+MAX_ROOTS = 64
+
+
+def build(roots, index_path, exclude=()):
+    """
+    Walk `roots` and write an index of every entry in them to `index_path`.
+
+    :param roots: A list of directories, ordered by highest- to lowest-priority (e.g. overlays, then the workspace)
+    :param index_path: Path to write the index to. Written atomically.
+    :param exclude: A collection of paths, relative to the roots, that should not be indexed (or walked)
+    :return: The number of entries in the index
+    :raises ValueError: If there are more than `MAX_ROOTS` roots
+    :raises NotADirectoryError: If a root is not a directory
+    """
+    if len(roots) > MAX_ROOTS:
+        raise ValueError("{n}: too many roots: at most {max} dirs can be indexed together".format(n=len(roots), max=MAX_ROOTS))
+
+    for root in roots:
+        if not os.path.isdir(root):
+            raise NotADirectoryError("{root}: is not a directory: only directories can be indexed".format(root=root))
+
+    exclude = {os.path.normpath(e) for e in exclude}
+    entries = {}  # <key: [mask, is_dir]>
+    dirs = {}  # <rel dir: [mtime_ns or None per root]>
+
+    for root_idx, root in enumerate(roots):
+        stack = [""]
+        while len(stack) > 0:
+            rel_dir = stack.pop()
+            abs_dir = os.path.join(root, rel_dir)
+            try:
+                mtime_ns = os.stat(abs_dir).st_mtime_ns
+                names = os.listdir(abs_dir)
+            except OSError:
+                continue
+
+            dirs.setdefault(rel_dir, [None] * len(roots))[root_idx] = mtime_ns
+
+            for name in names:
+                rel_path = os.path.join(rel_dir, name)
+                if rel_path in exclude:
+                    continue
+                is_dir = os.path.isdir(os.path.join(abs_dir, name))
+                entry = entries.setdefault(entry_key(rel_dir, name), [0, False])
+                entry[0] |= 1 << root_idx
+                entry[1] = entry[1] or is_dir
+                if is_dir:
+                    stack.append(rel_path)
+
+    __write(index_path, roots, dirs, entries)
+
+    return len(entries)
+
+
+def entry_key(rel_dir, name):
+    """
+    Returns the index key of the entry `name` in `rel_dir` (a dir relative to the roots, "" for the roots themselves).
+    """
+    return rel_dir + "\0" + name
+
+
+def __write(index_path, roots, dirs, entries):
+    header = json.dumps({"roots": list(roots)}).encode("utf-8")
+    keys = sorted(k.encode("utf-8") for k in entries)
+    dir_keys = sorted(d.encode("utf-8") for d in dirs)
+    mtimes_struct = PathIndex.mtimes_struct(len(roots))
+
+    index_dir = os.path.dirname(os.path.abspath(index_path))
+    os.makedirs(index_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=index_dir, prefix=os.path.basename(index_path))
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            f.write(PathIndex.HEADER_LEN.pack(len(header)))
+            f.write(header)
+            offset = f.tell() + 2 * PathIndex.COUNT.size + PathIndex.OFFSET.size * (len(keys) + len(dir_keys))
+
+            f.write(PathIndex.COUNT.pack(len(keys)))
+            for key in keys:
+                f.write(PathIndex.OFFSET.pack(offset))
+                offset += PathIndex.ENTRY.size + len(key)
+
+            f.write(PathIndex.COUNT.pack(len(dir_keys)))
+            for dir_key in dir_keys:
+                f.write(PathIndex.OFFSET.pack(offset))
+                offset += PathIndex.DIR.size + len(dir_key) + mtimes_struct.size
+
+            for key in keys:
+                mask, is_dir = entries[key.decode("utf-8")]
+                f.write(PathIndex.ENTRY.pack(mask, 1 if is_dir else 0, len(key)))
+                f.write(key)
+
+            for dir_key in dir_keys:
+                mtimes = dirs[dir_key.decode("utf-8")]
+                mask = sum(1 << root_idx for root_idx, mtime in enumerate(mtimes) if mtime is not None)
+                f.write(PathIndex.DIR.pack(mask, len(dir_key)))
+                f.write(dir_key)
+                f.write(mtimes_struct.pack(*[mtime or 0 for mtime in mtimes]))
+
+        # mkstemp creates files that only the owner can read, but indexes (e.g. of shared overlays) are not secret
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, index_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def try_load(index_path):
+    """
+    Returns a `PathIndex` for the index at `index_path`, or None if there is no index there.
+
+    :raises RuntimeError: If the file at `index_path` is not a valid index
+    """
+    try:
+        f = open(index_path, "rb")
+    except FileNotFoundError:
+        return None
+
+    with f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as ex:
+            raise RuntimeError("{index_path}: is not a valid path index: it is empty".format(index_path=index_path)) from ex
+
+    return PathIndex(index_path, mm)
+
+
+class PathIndex:
+    """A memory-mapped, read-only view of an index written by `build`.
+    """
+
+    HEADER_LEN = struct.Struct("<I")
+    COUNT = struct.Struct("<Q")
+    OFFSET = struct.Struct("<Q")
+    ENTRY = struct.Struct("<QBH")
+    DIR = struct.Struct("<QH")
+
+    @staticmethod
+    def mtimes_struct(num_roots):
+        """Returns the struct of a directory's per-root mtimes in an index of `num_roots` roots"""
+        return struct.Struct("<{n}q".format(n=num_roots))
+
+    def __init__(self, index_path, mm):
+        """
+        :param index_path: Path of the index (used in error messages)
+        :param mm: A `mmap` of the index
+        """
+        if mm[:len(MAGIC)] != MAGIC:
+            raise RuntimeError("{index_path}: is not a valid path index: it might have been written by a different LoR version".format(index_path=index_path))
+
+        pos = len(MAGIC)
+        header_len, = self.HEADER_LEN.unpack_from(mm, pos)
+        pos += self.HEADER_LEN.size
+        header = json.loads(mm[pos:pos + header_len].decode("utf-8"))
+        pos += header_len
+        count, = self.COUNT.unpack_from(mm, pos)
+        pos += self.COUNT.size
+        offsets_pos = pos
+        pos += self.OFFSET.size * count
+        dir_count, = self.COUNT.unpack_from(mm, pos)
+        pos += self.COUNT.size
+
+        self.index_path = index_path
+        self.roots = header["roots"]
+        self.__mm = mm
+        self.__count = count
+        self.__offsets_pos = offsets_pos
+        self.__dir_count = dir_count
+        self.__dir_offsets_pos = pos
+        self.__mtimes = self.mtimes_struct(len(self.roots))
+        self.__fresh_dirs = {}  # <rel dir: True if the dir's part of the index is up to date>
+
+    def __len__(self):
+        return self.__count
+
+    def is_fresh(self, rel_dir):
+        """
+        Returns True if the index's entries for `rel_dir` (a dir relative to the roots, "" for the roots) are up to date.
+
+        The roots' copies of `rel_dir` are stat-ed the first time a dir is checked; the result is then memoized.
+        """
+        try:
+            return self.__fresh_dirs[rel_dir]
+        except KeyError:
+            pass
+
+        indexed_mtimes = self.__indexed_mtimes(rel_dir)
+        fresh = True
+
+        for root, indexed_mtime in zip(self.roots, indexed_mtimes):
+            try:
+                mtime = os.stat(os.path.join(root, rel_dir)).st_mtime_ns
+            except OSError:
+                mtime = None
+            if mtime != indexed_mtime:
+                fresh = False
+                break
+
+        self.__fresh_dirs[rel_dir] = fresh
+        return fresh
+
+    def lookup(self, rel_path):
+        """
+        Returns the indices (into `roots`) of the roots that contain `rel_path`, in priority order.
+
+        Does not check whether the index is fresh (see `is_fresh`).
+
+        :param rel_path: A normalized path relative to the roots
+        :return: A list of root indices (empty if no root contains `rel_path`)
+        """
+        rel_dir, name = os.path.split(rel_path)
+        key = entry_key(rel_dir, name).encode("utf-8")
+        i = self.__bisect_left(key, self.__count, self.__entry_key)
+
+        if i < self.__count:
+            mask, _, entry_key_bytes = self.__entry(i)
+            if entry_key_bytes == key:
+                return [root_idx for root_idx in range(len(self.roots)) if mask & (1 << root_idx)]
+
+        return []
+
+    def listdir(self, rel_dir):
+        """
+        Returns the sorted names of the entries in `rel_dir` in the union of the roots.
+
+        Does not check whether the index is fresh (see `is_fresh`).
+
+        :param rel_dir: A normalized dir relative to the roots ("" for the roots themselves)
+        :return: A list of names
+        """
+        prefix = (rel_dir + "\0").encode("utf-8")
+        ret = []
+
+        for i in range(self.__bisect_left(prefix, self.__count, self.__entry_key), self.__count):
+            _, _, key = self.__entry(i)
+            if not key.startswith(prefix):
+                break
+            ret.append(key[len(prefix):].decode("utf-8"))
+
+        return ret
+
+    def __indexed_mtimes(self, rel_dir):
+        key = rel_dir.encode("utf-8")
+        i = self.__bisect_left(key, self.__dir_count, lambda j: self.__dir(j)[1])
+
+        if i < self.__dir_count:
+            mask, dir_key, mtimes_pos = self.__dir(i)
+            if dir_key == key:
+                mtimes = self.__mtimes.unpack_from(self.__mm, mtimes_pos)
+                return [mtime if mask & (1 << root_idx) else None for root_idx, mtime in enumerate(mtimes)]
+
+        return [None] * len(self.roots)
+
+    def __bisect_left(self, key, count, key_at):
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def __entry(self, i):
+        offset, = self.OFFSET.unpack_from(self.__mm, self.__offsets_pos + i * self.OFFSET.size)
+        mask, is_dir, key_len = self.ENTRY.unpack_from(self.__mm, offset)
+        key_pos = offset + self.ENTRY.size
+        return mask, is_dir, self.__mm[key_pos:key_pos + key_len]
+
+    def __entry_key(self, i):
+        return self.__entry(i)[2]
+
+    def __dir(self, i):
+        offset, = self.OFFSET.unpack_from(self.__mm, self.__dir_offsets_pos + i * self.OFFSET.size)
+        mask, key_len = self.DIR.unpack_from(self.__mm, offset)
+        key_pos = offset + self.DIR.size
+        return mask, self.__mm[key_pos:key_pos + key_len], key_pos + key_len
+
@@ -13,22 +13,87 @@
 # limitations under the License.
 #
 """Utilities for reflecting over python
+
+Reflecting over a package usually requires importing every module in it, which can be slow for large packages (e.g. a
+workspace containing hundreds of task modules). To avoid that, `classes_in_pkg`, `subclasses_in_pkg`, and
+`subclass_names_in_pkg` maintain a persistent index of the classes each module defines (and the names of those
+classes' bases). The index is keyed by each module's path, mtime, and size, so only modules that have changed since
+they were last indexed (or modules whose classes are needed) are imported. `subclass_names_in_pkg` (used by `lor ls`)
+reads up-to-date modules' classes from the index, so it does not import them at all.
+
+The index is held at `~/.lor/cache/reflection-index.json`, unless the `LOR_REFLECTION_INDEX` environment variable is set
+to another path.
 """
 import importlib
 import inspect
+import json
+import os
 import pkgutil
 import sys
+import tempfile
 from inspect import isclass
 
+import lor._constants
+
+__index_path = os.environ.get(lor._constants.REFLECTION_INDEX_ENV_VARNAME) or os.path.join(
+    os.path.expanduser("~"),
+    lor._constants.HOME_FOLDER_NAME,
+    lor._constants.HOME_FOLDER_CACHE_NAME,
+    lor._constants.REFLECTION_INDEX_NAME)
+
+
+def get_index_path():
+    """
+    Returns the path of the (application-wide) persistent reflection index, or None if the index is disabled.
+    """
+    return __index_path
+
+
+def _set_index_path(index_path):
+    """
+    Set the path of the (application-wide) persistent reflection index. Can be set to None to disable the index.
+
+    :param index_path: Path to the index file. Does not need to exist.
+    """
+    global __index_path
+    __index_path = index_path
+
 
 def subclasses_in_pkg(package, superclass):
     """Returns an iterable of classes in a package which are subclasses of a superclass.
 
+    Only modules that contain a subclass of `superclass` are imported. Modules whose reflection index entries are up to
+    date are not imported to find out whether they do (see `subclass_names_in_pkg`).
+
     :param package: The package to search in
     :param superclass: The superclass to filter against
     :return: An iterable of classes in `package` which are subclasses of `superclass`
     """
-    return filter_subclasses(superclass, classes_in_pkg(package))
+    classes = []
+
+    for module_name, class_name in __subclasses_in_pkg_via_index(package, superclass):
+        try:
+            klass = importlib.import_module(module_name)
+            for attr in class_name.split("."):
+                klass = getattr(klass, attr)
+            classes.append(klass)
+        except Exception as ex:
+            print(module_name + ": cannot reflect: {ex}".format(ex=ex), file=sys.stderr)
+
+    return list(filter_subclasses(superclass, classes))
+
+
+def subclass_names_in_pkg(package, superclass):
+    """Returns the fully-qualified names of classes in a package which are subclasses of a superclass.
+
+    Modules whose reflection index entries are up to date are not imported: their classes are read from the index. Only
+    modules that changed since they were indexed (or that have not been indexed yet) are imported.
+
+    :param package: The package to search in
+    :param superclass: The superclass to filter against
+    :return: A list of fully-qualified class names (e.g. "lor.tasks.general.AlwaysRunsTask")
+    """
+    return [module_name + "." + class_name for module_name, class_name in __subclasses_in_pkg_via_index(package, superclass)]
 
 
 def filter_subclasses(superclass, iter):
@@ -48,19 +113,166 @@ def is_pkg(mod_or_pkg):
 def classes_in_pkg(package):
     """Returns an iterable of python classes found in `package`
 
+    Modules that the reflection index knows do not define any classes are not imported.
+
     :param package: The package to search in
     :return: An iterable of classes found in `package`
     """
-    package_members = pkgutil.walk_packages(package.__path__, prefix=package.__name__ + ".")
+    return __classes_in_pkg_via_index(package, lambda mro_names: True)
 
-    for module_finder, module_name, is_pkg in package_members:
-        if not is_pkg:
+
+def __classes_in_pkg_via_index(package, mro_predicate):
+    index = __ReflectionIndex(__index_path)
+    ret = []
+
+    for module_finder, module_name in __modules_in_pkg(package):
+        source_path = __try_get_source_path(module_finder, module_name)
+        maybe_entry = index.try_get(source_path)
+
+        if maybe_entry is not None and not any(mro_predicate(mro_names) for mro_names in maybe_entry.values()):
+            continue
+
+        try:
+            module = importlib.import_module(module_name)
+            classes = list(classes_in_module(module))
+            index.put(source_path, __describe_classes(classes))
+            ret += classes
+        except Exception as ex:
+            print(module_name + ": cannot reflect: {ex}".format(ex=ex), file=sys.stderr)
+
+    index.save()
+
+    return ret
+
+
+def __subclasses_in_pkg_via_index(package, superclass):
+    # Returns (module name, class qualname) pairs, importing only the modules whose index entries are not up to date
+    superclass_name = __qualified_name(superclass)
+    index = __ReflectionIndex(__index_path)
+    ret = []
+
+    for module_finder, module_name in __modules_in_pkg(package):
+        source_path = __try_get_source_path(module_finder, module_name)
+        maybe_entry = index.try_get(source_path)
+
+        if maybe_entry is None:
             try:
-                module_loader = module_finder.find_module(module_name)
-                module = module_loader.load_module()
-                yield from classes_in_module(module)
+                module = importlib.import_module(module_name)
             except Exception as ex:
                 print(module_name + ": cannot reflect: {ex}".format(ex=ex), file=sys.stderr)
+                continue
+            maybe_entry = __describe_classes(classes_in_module(module))
+            index.put(source_path, maybe_entry)
+
+        ret += [(module_name, class_name) for class_name, mro_names in sorted(maybe_entry.items()) if superclass_name in mro_names]
+
+    index.save()
+
+    return ret
+
+
+def __modules_in_pkg(package):
+    package_members = pkgutil.walk_packages(package.__path__, prefix=package.__name__ + ".")
+
+    for module_finder, module_name, is_pkg in package_members:
+        if not is_pkg:
+            yield module_finder, module_name
+
+
+def __try_get_source_path(module_finder, module_name):
+    try:
+        spec = module_finder.find_spec(module_name)
+    except Exception:
+        return None
+
+    if spec is not None and spec.has_location:
+        return spec.origin
+    else:
+        return None
+
+
+def __qualified_name(klass):
+    return klass.__module__ + "." + klass.__qualname__
+
+
+class __ReflectionIndex:
+    """A persistent, on-disk, mapping of <module source path: <class name: [qualified names in the class's MRO]>>.
+
+    Entries are only returned if the module's mtime and size still match the values recorded when it was indexed.
+    Because the whole MRO of each class is recorded, a module needs re-indexing if a base class defined in a *different*
+    module changes its bases. That is rare enough that the index does not attempt to track it.
+    """
+
+    def __init__(self, index_path):
+        self.index_path = index_path
+        self.entries = self.__try_read(index_path)
+        self.dirty = False
+
+    @staticmethod
+    def __try_read(index_path):
+        if index_path is None:
+            return {}
+
+        try:
+            with open(index_path, "r") as f:
+                entries = json.load(f)
+            return entries if isinstance(entries, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def __try_stat(source_path):
+        try:
+            st = os.stat(source_path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def try_get(self, source_path):
+        if source_path is None or source_path not in self.entries:
+            return None
+
+        entry = self.entries[source_path]
+
+        if self.__try_stat(source_path) == (entry["mtime_ns"], entry["size"]):
+            return entry["classes"]
+        else:
+            return None
+
+    def put(self, source_path, described_classes):
+        maybe_stat = None if source_path is None else self.__try_stat(source_path)
+
+        if maybe_stat is None:
+            return
+
+        mtime_ns, size = maybe_stat
+
+        self.entries[source_path] = {
+            "mtime_ns": mtime_ns,
+            "size": size,
+            "classes": described_classes,
+        }
+        self.dirty = True
+
+    def save(self):
+        if self.index_path is None or not self.dirty:
+            return
+
+        try:
+            index_dir = os.path.dirname(self.index_path)
+            os.makedirs(index_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=index_dir, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.index_path)
+            self.dirty = False
+        except OSError as ex:
+            print("{index_path}: cannot write reflection index: {ex}".format(index_path=self.index_path, ex=ex), file=sys.stderr)
+
+
+def __describe_classes(classes):
+    # <class qualname: [qualified names of the classes in the class's MRO]>, as held in the index
+    return {klass.__qualname__: [__qualified_name(base) for base in klass.__mro__] for klass in classes}
 
 
 def classes_in_module(module):
@@ -0,0 +1,363 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Utilities for reflecting over python source code *without* importing it
+
+Importing a module runs its module-level code (which might, for example, open a database connection or build a large
+constant table) and fails if any one of its imports fail. The functions in this module instead parse source files with
+`ast`, so they can be used to list the classes in a large package quickly and safely.
+
+Because nothing is executed, results are best-effort: class bases and parameter types are resolved from the `import`
+statements and class definitions that are visible in the source, rather than from the runtime objects.
+"""
+import ast
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+LUIGI_TASK_CLASS_NAMES = {
+    "luigi.Task",
+    "luigi.task.Task",
+    "luigi.ExternalTask",
+    "luigi.task.ExternalTask",
+    "luigi.WrapperTask",
+    "luigi.task.WrapperTask",
+}
+
+__MIN_SOURCES_FOR_PROCESS_POOL = 32
+
+# Annotated assignments (e.g. `x: int = luigi.IntParameter()`) only exist in Python 3.6+ sources
+__ANN_ASSIGN = getattr(ast, "AnnAssign", ())
+
+# Sources are sent to the process pool in batches, to reduce IPC overhead, on Pythons whose `Executor.map` supports it
+# (3.5+)
+__MAP_KWARGS = {"chunksize": 16} if sys.version_info >= (3, 5) else {}
+
+
+def find_source(module_name, search_path=None):
+    """Returns `(source_path, is_pkg)` for a module or package, or None if its source cannot be found.
+
+    Unlike `importlib.util.find_spec`, parent packages are *not* imported.
+
+    :param module_name: Fully-qualified name of the module (e.g. `lor.tasks.tar`)
+    :param search_path: List of directories to search. Defaults to `sys.path`
+    :return: A `(source_path, is_pkg)` tuple, or None
+    """
+    if search_path is None:
+        search_path = sys.path
+
+    parts = module_name.split(".")
+
+    for entry in search_path:
+        base = os.path.join(entry or os.getcwd(), *parts)
+        pkg_init = os.path.join(base, "__init__.py")
+
+        if os.path.isfile(pkg_init):
+            return pkg_init, True
+        elif os.path.isfile(base + ".py"):
+            return base + ".py", False
+
+    return None
+
+
+def find_sources_in_pkg(package_name, package_init_path):
+    """Returns a sorted list of `(module_name, source_path, is_pkg)` tuples for all modules/packages in a package.
+
+    Only descends into directories that contain an `__init__.py`, which matches `pkgutil.walk_packages`.
+
+    :param package_name: Fully-qualified name of the package
+    :param package_init_path: Path to the package's `__init__.py`
+    :return: A list of `(module_name, source_path, is_pkg)` tuples, including the package itself
+    """
+    ret = [(package_name, package_init_path, True)]
+    dirs_to_search = [(package_name, os.path.dirname(package_init_path))]
+
+    while len(dirs_to_search) > 0:
+        pkg_name, pkg_dir = dirs_to_search.pop()
+
+        for name in os.listdir(pkg_dir):
+            entry_path = os.path.join(pkg_dir, name)
+            if os.path.isdir(entry_path):
+                init_path = os.path.join(entry_path, "__init__.py")
+                if name.isidentifier() and os.path.isfile(init_path):
+                    sub_pkg_name = pkg_name + "." + name
+                    ret.append((sub_pkg_name, init_path, True))
+                    dirs_to_search.append((sub_pkg_name, entry_path))
+            elif name.endswith(".py") and name != "__init__.py":
+                stem = name[:-len(".py")]
+                if stem.isidentifier():
+                    ret.append((pkg_name + "." + stem, entry_path, False))
+
+    return sorted(ret, key=lambda source: source[0].split("."))
+
+
+def parse_module_source(source):
+    """Parses a module's source, returning a dict describing the classes and import aliases it contains.
+
+    The returned dict has the keys:
+
+    - `classes`: A dict of <class name: {"bases": [qualified names], "parameters": [(name, qualified type name)]}>
+    - `aliases`: A dict of <name bound at module level by an import: qualified name>
+    - `error`: An error message (only present if the source could not be read/parsed)
+
+    This is a top-level function that only deals in plain data so that it can be ran in a process pool.
+
+    :param source: A `(module_name, source_path, is_pkg)` tuple
+    :return: A dict
+    """
+    module_name, source_path, is_pkg = source
+
+    try:
+        with open(source_path, "rb") as f:
+            tree = ast.parse(f.read(), filename=source_path)
+    except (OSError, SyntaxError, ValueError) as ex:
+        return {"classes": {}, "aliases": {}, "error": str(ex)}
+
+    package_name = module_name if is_pkg else module_name.rpartition(".")[0]
+    aliases = {}
+    classes = {}
+
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.asname is not None:
+                    aliases[alias.asname] = alias.name
+                else:
+                    top_level_name = alias.name.split(".")[0]
+                    aliases[top_level_name] = top_level_name
+        elif isinstance(node, ast.ImportFrom):
+            from_module = __resolve_relative_module(package_name, node.module, node.level)
+            for alias in node.names:
+                if alias.name != "*":
+                    aliases[alias.asname or alias.name] = from_module + "." + alias.name
+        elif isinstance(node, ast.ClassDef):
+            classes[node.name] = __describe_class(node, module_name, aliases)
+
+    return {"classes": classes, "aliases": aliases}
+
+
+def __resolve_relative_module(package_name, module, level):
+    if level == 0:
+        return module
+
+    base_parts = package_name.split(".")
+    base = ".".join(base_parts[:len(base_parts) - (level - 1)])
+
+    if module is None:
+        return base
+    else:
+        return base + "." + module
+
+
+def __describe_class(class_node, module_name, aliases):
+    bases = []
+    for base_node in class_node.bases:
+        maybe_base = __try_qualify(base_node, module_name, aliases)
+        if maybe_base is not None:
+            bases.append(maybe_base)
+
+    parameters = []
+    for node in class_node.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1:
+            target, value = node.targets[0], node.value
+        elif isinstance(node, __ANN_ASSIGN) and node.value is not None:
+            target, value = node.target, node.value
+        else:
+            continue
+
+        if isinstance(target, ast.Name) and isinstance(value, ast.Call):
+            maybe_type = __try_qualify(value.func, module_name, aliases)
+            if maybe_type is not None:
+                parameters.append((target.id, maybe_type))
+
+    return {"bases": bases, "parameters": parameters}
+
+
+def __try_qualify(expr, module_name, aliases):
+    attrs = []
+    while isinstance(expr, ast.Attribute):
+        attrs.append(expr.attr)
+        expr = expr.value
+
+    if not isinstance(expr, ast.Name):
+        return None
+
+    head = aliases.get(expr.id, module_name + "." + expr.id)
+
+    return ".".join([head] + list(reversed(attrs)))
+
+
+def parse_module_sources(sources, max_workers=None):
+    """Returns a dict of <module name: `parse_module_source` result> for each source in `sources`.
+
+    Large numbers of sources are parsed in a process pool.
+
+    :param sources: An iterable of `(module_name, source_path, is_pkg)` tuples
+    :param max_workers: Maximum number of parsing processes. Defaults to the number of CPUs
+    :return: A dict of <module name: dict>
+    """
+    sources = list(sources)
+
+    if len(sources) < __MIN_SOURCES_FOR_PROCESS_POOL or max_workers == 1:
+        results = map(parse_module_source, sources)
+        return {source[0]: result for source, result in zip(sources, results)}
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(parse_module_source, sources, **__MAP_KWARGS)
+            return {source[0]: result for source, result in zip(sources, results)}
+
+
+class SourceIndex:
+    """An index of the classes found by parsing modules' source code.
+
+    Bases that refer to classes in modules that have not been parsed yet are resolved by locating and parsing those
+    modules (again, without importing them).
+    """
+
+    max_alias_resolution_depth = 16
+
+    def __init__(self, parsed_modules, search_path=None):
+        """
+        :param parsed_modules: A dict of <module name: `parse_module_source` result>
+        :param search_path: Directories to search when locating other modules. Defaults to `sys.path`
+        """
+        self.modules = dict(parsed_modules)
+        self.search_path = search_path
+        self.__is_subclass_cache = {}
+
+    def classes(self, module_name):
+        """Returns a sorted list of the qualified names of classes defined in `module_name`.
+        """
+        maybe_module = self.modules.get(module_name)
+
+        if maybe_module is None:
+            return []
+        else:
+            return [module_name + "." + class_name for class_name in sorted(maybe_module["classes"])]
+
+    def is_subclass(self, qualified_class_name, superclass_names, superclass_predicate=None):
+        """Returns True if the class is, or inherits from, a class named in `superclass_names`.
+
+        :param qualified_class_name: Qualified name of the class to check
+        :param superclass_names: A set of qualified superclass names
+        :param superclass_predicate: Optional callable that is also used to identify superclass names (e.g. for
+        classes that are in modules that cannot be found)
+        """
+        key = (qualified_class_name, frozenset(superclass_names), superclass_predicate)
+        if key in self.__is_subclass_cache:
+            return self.__is_subclass_cache[key]
+
+        ret = False
+        visited = set()
+        to_visit = [qualified_class_name]
+
+        while len(to_visit) > 0:
+            name = to_visit.pop()
+
+            if name in visited:
+                continue
+            visited.add(name)
+
+            if name in superclass_names or (superclass_predicate is not None and superclass_predicate(name)):
+                ret = True
+                break
+
+            maybe_class = self.__try_get_class(name)
+            if maybe_class is not None:
+                to_visit += maybe_class["bases"]
+
+        self.__is_subclass_cache[key] = ret
+        return ret
+
+    def parameters(self, qualified_class_name, parameter_predicate):
+        """Returns a list of (name, qualified type name) tuples for class-level attributes that satisfy
+        `parameter_predicate`, including attributes inherited from bases that can be resolved.
+        """
+        ret = {}
+        visited = set()
+
+        for name in self.__linearize(qualified_class_name, visited):
+            for param_name, param_type in self.__try_get_class(name)["parameters"]:
+                if param_name not in ret and parameter_predicate(self.__resolve_alias(param_type)):
+                    ret[param_name] = self.__resolve_alias(param_type)
+
+        return list(ret.items())
+
+    def __linearize(self, qualified_class_name, visited):
+        # Depth-first, left-to-right: good enough for listing parameters (python's C3 MRO only differs for diamonds).
+        ret = []
+        to_visit = [qualified_class_name]
+
+        while len(to_visit) > 0:
+            name = to_visit.pop()
+            if name in visited:
+                continue
+            visited.add(name)
+
+            maybe_class = self.__try_get_class(name)
+            if maybe_class is not None:
+                ret.append(name)
+                to_visit += reversed(maybe_class["bases"])
+
+        return ret
+
+    def __try_get_class(self, qualified_class_name):
+        name = self.__resolve_alias(qualified_class_name)
+        module_name, _, class_name = name.rpartition(".")
+        maybe_module = self.__try_get_module(module_name)
+
+        if maybe_module is None:
+            return None
+        else:
+            return maybe_module["classes"].get(class_name)
+
+    def __resolve_alias(self, qualified_name):
+        # e.g. "pkg.SomeTask" -> "pkg.tasks.SomeTask" if pkg/__init__.py contains "from pkg.tasks import SomeTask"
+        for _ in range(self.max_alias_resolution_depth):
+            module_name, _, name = qualified_name.rpartition(".")
+            maybe_module = self.__try_get_module(module_name)
+
+            if maybe_module is None or name in maybe_module["classes"] or name not in maybe_module["aliases"]:
+                return qualified_name
+            else:
+                qualified_name = maybe_module["aliases"][name]
+
+        return qualified_name
+
+    def __try_get_module(self, module_name):
+        if module_name == "" or module_name.split(".")[0] == "luigi":
+            return None
+
+        if module_name not in self.modules:
+            maybe_source = find_source(module_name, self.search_path)
+            if maybe_source is None:
+                self.modules[module_name] = None
+            else:
+                source_path, is_pkg = maybe_source
+                self.modules[module_name] = parse_module_source((module_name, source_path, is_pkg))
+
+        return self.modules[module_name]
+
+
+def is_luigi_task_class_name(qualified_name):
+    """Returns True if `qualified_name` looks like the name of a task class that is supplied by Luigi itself.
+    """
+    return qualified_name in LUIGI_TASK_CLASS_NAMES or \
+        (qualified_name.startswith("luigi.") and qualified_name.endswith("Task"))
+
+
+def is_luigi_parameter_class_name(qualified_name):
+    """Returns True if `qualified_name` looks like the name of a Luigi `Parameter` class.
+    """
+    return qualified_name.startswith("luigi.") and qualified_name.endswith("Parameter")
@@ -25,12 +25,17 @@ instead of the standard library's is because, in many cases:
   write lambdas/functions to filter+reduce process outputs: important when a subprocess produces *a lot* of logging
   output (e.g. long-running Hadoop MR jobs) and you don't want to risk a memory leak.
 """
+import os
 import subprocess
 import sys
 from threading import Thread
 
 from luigi.contrib.external_program import ExternalProgramRunContext
 
+import lor._constants
+import lor._snapshot
+from lor import workspace, path, props
+
 
 def call(args):
     """Synchronously run the command described by args, returning an exit code integer once the subprocess exits.
@@ -100,6 +105,18 @@ def call_and_write_stdout_to_file(args, output_path):
 
 
 def run_luigi_task(task_class, task_args):
+    """Run a luigi task in a separate `luigi` process, returning its exit code.
+
+    If this process is in a workspace, its bootstrapped state (workspace, overlay paths, and properties, including any
+    CLI overrides) is passed to the child through a snapshot file (see `lor._snapshot`), so the child sees the same
+    properties as this process without having to locate the workspace or parse property files. The workspace is also
+    added to the child's PYTHONPATH, so that workspace tasks can be imported. The snapshot file is removed once the
+    child exits.
+
+    :param task_class: The luigi task class to run
+    :param task_args: A list of luigi command-line args (e.g. task parameters)
+    :return: Exit code of the `luigi` process
+    """
     args = [
         "luigi",
         "--module",
@@ -113,4 +130,22 @@ def run_luigi_task(task_class, task_args):
     ]
     all_args = args + task_args
 
-    return subprocess.call(all_args)
+    ws_path = workspace.get_path()
+
+    if ws_path is None:
+        return subprocess.call(all_args)
+
+    snapshot_path = lor._snapshot.write(ws_path, path.get_overlay_paths(), props.get_loaders())
+    try:
+        return subprocess.call(all_args, env=__get_luigi_task_env(ws_path, snapshot_path))
+    finally:
+        lor._snapshot.remove(snapshot_path)
+
+
+def __get_luigi_task_env(ws_path, snapshot_path):
+    env = os.environ.copy()
+    env[lor._constants.SNAPSHOT_ENV_VARNAME] = snapshot_path
+    pythonpath = env.get("PYTHONPATH")
+    env["PYTHONPATH"] = ws_path if pythonpath is None or pythonpath == "" else ws_path + os.pathsep + pythonpath
+
+    return env
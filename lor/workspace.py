@@ -22,17 +22,24 @@ establishing whether a directory is a workspace, resolving paths in the workspac
 This module also provides global access to the current workspace, which can be established automatically (from the
 current working dir or an env var) or set explicitly (e.g. by LoR's CLI commands). This enables downstream code to
 perform working-directory-independent pathing.
+
+Locating a workspace from the working directory requires checking each parent directory for a workspace, which can be
+slow on network filesystems. Results are memoized for the lifetime of the process and, optionally, persisted in a
+"hints" file (see `try_locate`).
 """
+import json
 import os
 import subprocess
 import sys
-
-import yaml
+import tempfile
 
 import lor._constants
 import lor._paths
+import lor._snapshot
+from lor.util import compiled_yaml
 
 __current_workspace_path = None
+__located_workspace_paths = {}  # <dir: workspace path (or None, if the dir is not in a workspace)>
 
 
 def get_path(cwd=None):
@@ -47,7 +54,8 @@ def get_path(cwd=None):
         cwd = os.getcwd()
 
     if __current_workspace_path is None:
-        maybe_ws_path = try_locate(cwd)
+        snapshot = lor._snapshot.try_load()
+        maybe_ws_path = snapshot["workspace"] if snapshot is not None else try_locate(cwd)
         if maybe_ws_path is not None:
             __current_workspace_path = maybe_ws_path
         else:
@@ -127,16 +135,15 @@ def get_package_name(ws_path):
     if not os.path.exists(props_file_path):
         raise FileNotFoundError("{props_file_path}: does not exist: required to load WORKSPACE_NAME".format(props_file_path=props_file_path))
 
-    with open(props_file_path, "r") as f:
-        try:
-            props = yaml.load(f)
-        except Exception as ex:
-            raise RuntimeError("{props_file_path}: cannot be parsed as YAML: are you sure its valid?".format(props_file_path=props_file_path)) from ex
+    try:
+        props = compiled_yaml.load(props_file_path)
+    except Exception as ex:
+        raise RuntimeError("{props_file_path}: cannot be parsed as YAML: are you sure its valid?".format(props_file_path=props_file_path)) from ex
 
-        if "WORKSPACE_NAME" in props:
-            return props["WORKSPACE_NAME"]
-        else:
-            raise KeyError("WORKSPACE_NAME: cannot be found in {props_file_path}: required to locate the main pyhon package".format(props_file_path=props_file_path))
+    if "WORKSPACE_NAME" in props:
+        return props["WORKSPACE_NAME"]
+    else:
+        raise KeyError("WORKSPACE_NAME: cannot be found in {props_file_path}: required to locate the main pyhon package".format(props_file_path=props_file_path))
 
 
 def try_locate(cwd=None):
@@ -146,19 +153,27 @@ def try_locate(cwd=None):
     This function looks for a workspace by:
 
     - Checking if LOR_HOME environment variable is set and trying that
-    - Checking if `cwd` is a workspace
+    - Checking if `cwd`, or any of its parents, is a workspace
+
+    Results for `cwd` (and the parents that were checked) are memoized, so repeated calls do not touch the filesystem.
+    If the LOR_WORKSPACE_HINTS environment variable is set to a path, that file is used as a persistent
+    <dir: workspace path> hint map. Hints are checked (with one `stat`) before walking the directory tree, and
+    workspaces that are located by walking the tree are added to the file.
     """
     maybe_workspace_from_env = __try_get_workspace_path_from_env_var()
 
     if maybe_workspace_from_env is not None:
         return maybe_workspace_from_env
     else:
-        maybe_workspace_path = __try_get_workspace_path_from_cwd(cwd)
+        return __try_get_workspace_path_from_cwd(cwd)
 
-        if maybe_workspace_path is not None:
-            return maybe_workspace_path
-        else:
-            return None
+
+def _clear_location_cache():
+    """
+    Forget all memoized `try_locate` results (e.g. because a workspace was created in a directory that was previously
+    found to not be in a workspace).
+    """
+    __located_workspace_paths.clear()
 
 
 def __try_get_workspace_path_from_env_var():
@@ -179,14 +194,99 @@ def __try_get_workspace_path_from_cwd(cwd=None):
     if cwd is None:
         cwd = os.getcwd()
 
-    if is_workspace(cwd):
-        return cwd
-    else:
-        parent = os.path.dirname(cwd)
-        if parent == cwd:  # we're at the root
+    cwd = os.path.abspath(cwd)
+
+    if cwd in __located_workspace_paths:
+        return __located_workspace_paths[cwd]
+
+    hints_path = os.environ.get(lor._constants.WORKSPACE_HINTS_ENV_VARNAME)
+    maybe_hints = None if hints_path is None else __read_hints(hints_path)
+
+    maybe_ws_path = None if maybe_hints is None else __try_get_workspace_path_from_hints(maybe_hints, cwd)
+
+    if maybe_ws_path is not None:
+        __located_workspace_paths[cwd] = maybe_ws_path
+        return maybe_ws_path
+
+    maybe_ws_path = __walk_up_to_workspace(cwd)
+
+    if maybe_ws_path is not None and maybe_hints is not None:
+        maybe_hints[cwd] = maybe_ws_path
+        __write_hints(hints_path, maybe_hints)
+
+    return maybe_ws_path
+
+
+def __walk_up_to_workspace(start_dir):
+    checked_dirs = []
+    current_dir = start_dir
+    ret = None
+
+    while True:
+        if current_dir in __located_workspace_paths:
+            ret = __located_workspace_paths[current_dir]
+            break
+
+        checked_dirs.append(current_dir)
+
+        if __contains_binstub(current_dir):
+            ret = current_dir
+            break
+
+        parent = os.path.dirname(current_dir)
+        if parent == current_dir:  # we're at the root
+            break
+        else:
+            current_dir = parent
+
+    for checked_dir in checked_dirs:
+        __located_workspace_paths[checked_dir] = ret
+
+    return ret
+
+
+def __contains_binstub(dir_path):
+    try:
+        os.stat(os.path.join(dir_path, lor._constants.WORKSPACE_EXEC_BINSTUB))
+        return True
+    except OSError:
+        return False
+
+
+def __try_get_workspace_path_from_hints(hints, cwd):
+    current_dir = cwd
+
+    while True:
+        if current_dir in hints:
+            hinted_ws_path = hints[current_dir]
+            return hinted_ws_path if __contains_binstub(hinted_ws_path) else None
+
+        parent = os.path.dirname(current_dir)
+        if parent == current_dir:
             return None
-        else:  # try the next dir up
-            return __try_get_workspace_path_from_cwd(parent)
+        else:
+            current_dir = parent
+
+
+def __read_hints(hints_path):
+    try:
+        with open(hints_path, "r") as f:
+            hints = json.load(f)
+        return hints if isinstance(hints, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def __write_hints(hints_path, hints):
+    try:
+        hints_dir = os.path.dirname(os.path.abspath(hints_path))
+        os.makedirs(hints_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=hints_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(hints, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, hints_path)
+    except OSError as ex:
+        print("{hints_path}: cannot write workspace hints: {ex}".format(hints_path=hints_path, ex=ex), file=sys.stderr)
 
 
 def is_workspace(path):
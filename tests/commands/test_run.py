@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import os
+import tempfile
+import unittest
+
+import luigi
+
+from lor import props
+from lor.commands import run
+from lor.props import DictPropertyLoader
+
+
+class PropertyDependentTask(luigi.Task):
+
+    def output(self):
+        return luigi.LocalTarget(os.path.join(props.get("output_dir"), props.get("output_name")))
+
+    def run(self):
+        with self.output().open("w") as f:
+            f.write(props.get("output_name"))
+
+
+class CountingPropertyLoader(DictPropertyLoader):
+
+    def __init__(self, name, property_dict):
+        super().__init__(name, property_dict)
+        self.lookups = []
+
+    def try_get(self, prop_name):
+        self.lookups.append(prop_name)
+        return super().try_get(prop_name)
+
+
+class FailingTask(luigi.Task):
+
+    def run(self):
+        raise RuntimeError("this task always fails")
+
+
+class TestRun(unittest.TestCase):
+
+    def tearDown(self):
+        props._set_loaders(None)
+
+    def test_run_batch_applies_property_overrides_to_task_outputs_during_scheduling_and_the_summary(self):
+        output_dir = tempfile.mkdtemp()
+        props._set_loaders([DictPropertyLoader("base", {"output_dir": output_dir, "output_name": "base"})])
+        spec = {"module": __name__, "task": "PropertyDependentTask", "properties": {"output_name": "overridden"}, "line": 1}
+
+        summary = run.run_batch([spec], ["--local-scheduler"])
+
+        self.assertEqual(["complete"], [t["status"] for t in summary["tasks"]])
+        self.assertEqual(["overridden"], os.listdir(output_dir))
+        self.assertEqual("base", props.get("output_name"))
+
+    def test_run_batch_does_not_leave_overrides_on_the_task_instances(self):
+        output_dir = tempfile.mkdtemp()
+        props._set_loaders([DictPropertyLoader("base", {"output_dir": output_dir, "output_name": "base"})])
+        spec = {"module": __name__, "task": "PropertyDependentTask", "properties": {"output_name": "overridden"}, "line": 1}
+
+        run.run_batch([spec], ["--local-scheduler"])
+
+        self.assertEqual(os.path.join(output_dir, "base"), PropertyDependentTask().output().path)
+
+    def test_run_batch_memoizes_properties_across_an_overridden_tasks_methods(self):
+        output_dir = tempfile.mkdtemp()
+        base_loader = CountingPropertyLoader("base", {"output_dir": output_dir, "output_name": "base"})
+        props._set_loaders([base_loader])
+        spec = {"module": __name__, "task": "PropertyDependentTask", "properties": {"output_name": "overridden"}, "line": 1}
+
+        run.run_batch([spec], ["--local-scheduler"])
+
+        self.assertEqual(["output_dir"], base_loader.lookups)
+
+    def test_run_batch_reports_why_tasks_failed(self):
+        props._set_loaders([DictPropertyLoader("base", {})])
+        spec = {"module": __name__, "task": "FailingTask", "line": 1}
+
+        summary = run.run_batch([spec], ["--local-scheduler"])
+
+        self.assertEqual("incomplete", summary["tasks"][0]["status"])
+        self.assertIn("this task always fails", summary["tasks"][0]["error"])
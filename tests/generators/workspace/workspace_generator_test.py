@@ -40,3 +40,10 @@ class TestWorkspaceGenerator(TestCase):
         ret = workspace_generator.create(path)
 
         self.assertEqual(ret, path)
+
+    def test_create_writes_a_gitignore_that_ignores_compiled_property_caches(self):
+        path = os.path.join(tempfile.mkdtemp(), "ws")
+        workspace_generator.create(path)
+
+        with open(os.path.join(path, ".gitignore")) as f:
+            self.assertIn(".*.yml.cache", f.read().splitlines())
@@ -13,10 +13,19 @@
 # limitations under the License.
 #
 import io
+import json
 import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
 import unittest
 
+import lor._constants
+import lor._instrumentation
 import lor._paths
+import lor.client
 import lor.util.subprocess
 from lor.test import TemporaryWorkspace, TemporaryEnv
 
@@ -26,6 +35,8 @@ def run_cli(args):
         # CI might be running from a non-standard dir, so need to setup the python path correctly
         # before launching off a subprocess
         os.environ["PYTHONPATH"] = os.path.normpath(os.path.join(os.path.dirname(__file__), "../.."))
+        # Keep the CLI's reflection index out of the user's home dir
+        os.environ[lor._constants.REFLECTION_INDEX_ENV_VARNAME] = os.path.join(tempfile.mkdtemp(), "reflection-index.json")
         cli_command = lor._paths.lor_path("lor")
         all_args = ["python3", cli_command] + args
 
@@ -44,6 +55,20 @@ def run_cli(args):
         return stdout, stderr, exit_code
 
 
+def start_server(ws):
+    env = os.environ.copy()
+    env["PYTHONPATH"] = os.path.normpath(os.path.join(os.path.dirname(__file__), "../.."))
+    env[lor._constants.REFLECTION_INDEX_ENV_VARNAME] = os.path.join(tempfile.mkdtemp(), "reflection-index.json")
+    p = subprocess.Popen(["python3", lor._paths.lor_path("lor"), "server"], cwd=ws, env=env, stderr=subprocess.DEVNULL)
+
+    sock_path = lor.client.socket_path(ws)
+    deadline = time.time() + 30
+    while not os.path.exists(sock_path) and time.time() < deadline and p.poll() is None:
+        time.sleep(0.05)
+
+    return p
+
+
 def __append_to_builder(builder, line):
     builder.write(line)
     builder.flush()
@@ -109,6 +134,62 @@ class TestCli(unittest.TestCase):
                 self.assertEqual(exit_code, 0)
                 # TODO: test output conforms
 
+    def test_call_lor_ls_static_emits_tasks_with_their_parameters_and_zero_exit(self):
+        with TemporaryWorkspace() as ws:
+            with TemporaryEnv():
+                os.chdir(ws)
+                args = ["ls", "--static", "lor.tasks"]
+                stdout, stderr, exit_code = run_cli(args)
+                self.assertEqual(exit_code, 0)
+                self.assertTrue("lor.tasks.tar.TarballTask(upstream_task, output_path)" in stdout)
+
+    def test_call_lor_with_profile_startup_writes_json_profile_and_prints_report(self):
+        with TemporaryWorkspace() as ws:
+            with TemporaryEnv():
+                os.chdir(ws)
+                json_path = os.path.join(tempfile.mkdtemp(), "profile.json")
+                args = ["--profile-startup=" + json_path, "ls", "lor.tasks"]
+                stdout, stderr, exit_code = run_cli(args)
+                self.assertEqual(exit_code, 0)
+                self.assertTrue("lor startup profile" in stderr)
+
+                with open(json_path) as f:
+                    profile = json.load(f)
+
+                self.assertIn("workspace.try_locate", [p["name"] for p in profile["phases"]])
+                self.assertIn("lor.commands.ls", [i["module"] for i in profile["imports"]])
+
+    def test_call_lor_run_with_instrument_writes_json_summary_of_property_accesses(self):
+        with TemporaryWorkspace() as ws:
+            with TemporaryEnv():
+                os.chdir(ws)
+                with open(os.path.join(ws, "instrumented_tasks.py"), "w") as f:
+                    f.write("import luigi\n"
+                            "import lor.props\n"
+                            "class GetsPropertyTask(luigi.Task):\n"
+                            "    def run(self):\n"
+                            "        for _ in range(10):\n"
+                            "            lor.props.get('WORKSPACE_NAME')\n")
+                json_path = os.path.join(tempfile.mkdtemp(), "accesses.json")
+                args = ["run", "--instrument", "--instrument-output", json_path, "--module", "instrumented_tasks", "GetsPropertyTask", "--local-scheduler"]
+                stdout, stderr, exit_code = run_cli(args)
+                self.assertEqual(exit_code, 0)
+                self.assertTrue("lor property/path accesses" in stderr)
+
+                with open(json_path) as f:
+                    summary = json.load(f)
+
+                self.assertEqual([("WORKSPACE_NAME", 10)], [(a["key"], a["count"]) for a in summary["props"]])
+
+    def test_call_lor_run_with_instrument_before_task_name_does_not_consume_task_name(self):
+        with TemporaryWorkspace() as ws:
+            with TemporaryEnv():
+                os.chdir(ws)
+                args = ["run", "--module", "lor.tasks.general", "--instrument", "AlwaysRunsTask", "--local-scheduler"]
+                stdout, stderr, exit_code = run_cli(args)
+                self.assertEqual(exit_code, 0)
+                self.assertTrue(os.path.exists(os.path.join(ws, lor._instrumentation.DEFAULT_JSON_PATH)))
+
     def test_call_lor_run_with_invalid_task_classname_results_in_nonzero_exit(self):
         with TemporaryWorkspace() as ws:
             with TemporaryEnv():
@@ -125,6 +206,22 @@ class TestCli(unittest.TestCase):
                 stdout, stderr, exit_code = run_cli(args)
                 self.assertEqual(exit_code, 0)
 
+    def test_call_lor_run_with_batch_emits_summary_of_each_task_and_nonzero_exit_if_any_are_invalid(self):
+        with TemporaryWorkspace() as ws:
+            with TemporaryEnv():
+                os.chdir(ws)
+                batch_path = os.path.join(ws, "tasks.jsonl")
+                with open(batch_path, "w") as f:
+                    f.write(json.dumps({"module": "lor.tasks.general", "task": "AlwaysRunsTask"}) + "\n")
+                    f.write(json.dumps({"module": "lor.tasks.general", "task": "SomeInvalidClass"}) + "\n")
+
+                args = ["run", "--batch", batch_path, "--local-scheduler"]
+                stdout, stderr, exit_code = run_cli(args)
+
+                self.assertNotEqual(exit_code, 0)
+                summary = json.loads(stdout)
+                self.assertEqual(["complete", "invalid"], [t["status"] for t in summary["tasks"]])
+
     def test_call_lor_properties_emits_varname_varval_space_separated_and_zero_exit(self):
         with TemporaryWorkspace() as ws:
             with TemporaryEnv():
@@ -134,6 +231,28 @@ class TestCli(unittest.TestCase):
                 self.assertEqual(exit_code, 0)
                 # TODO: test output conforms
 
+    def test_call_lor_properties_with_overlay_uses_overlay_properties_over_workspace_properties(self):
+        with TemporaryWorkspace() as ws:
+            with TemporaryEnv():
+                os.chdir(ws)
+                overlay = tempfile.mkdtemp()
+                os.mkdir(os.path.join(overlay, "etc"))
+                with open(os.path.join(overlay, "etc", "properties.yml"), "w") as f:
+                    f.write("overlaid_key: overlaid_value\n")
+
+                stdout, stderr, exit_code = run_cli(["properties", "--overlay", overlay])
+
+                self.assertEqual(exit_code, 0)
+                self.assertIn("overlaid_key=overlaid_value", stdout)
+
+    def test_call_lor_properties_with_nonexistent_overlay_results_in_nonzero_exit(self):
+        with TemporaryWorkspace() as ws:
+            with TemporaryEnv():
+                os.chdir(ws)
+                stdout, stderr, exit_code = run_cli(["properties", "--overlay", os.path.join(ws, "does-not-exist")])
+
+                self.assertNotEqual(exit_code, 0)
+
     def test_call_lor_dot_with_nothing_results_in_nonzero_exit(self):
         with TemporaryWorkspace() as ws:
             with TemporaryEnv():
@@ -161,6 +280,27 @@ class TestCli(unittest.TestCase):
                 self.assertEqual(exit_code, 0)
                 # TODO: test output
 
+    def test_call_lor_dot_with_format_and_output_writes_graph_to_file(self):
+        with TemporaryWorkspace() as ws:
+            with TemporaryEnv():
+                os.chdir(ws)
+                output_path = os.path.join(ws, "graph.jsonl")
+                args = ["dot", "--format", "jsonl", "--output", output_path, "--module", "lor.tasks.general", "AlwaysRunsTask"]
+                stdout, stderr, exit_code = run_cli(args)
+                self.assertEqual(exit_code, 0)
+                with open(output_path) as f:
+                    nodes = [json.loads(line) for line in f]
+                self.assertEqual("AlwaysRunsTask", nodes[0]["label"])
+
+    def test_call_lor_dot_with_status_includes_each_tasks_status(self):
+        with TemporaryWorkspace() as ws:
+            with TemporaryEnv():
+                os.chdir(ws)
+                args = ["dot", "--status", "--format", "jsonl", "--module", "lor.tasks.general", "AlwaysRunsTask"]
+                stdout, stderr, exit_code = run_cli(args)
+                self.assertEqual(exit_code, 0)
+                self.assertEqual("external", json.loads(stdout.splitlines()[0])["status"])
+
     def test_call_lor_dot_with_invalid_task_class_returns_nonzero_exit(self):
         with TemporaryWorkspace() as ws:
             with TemporaryEnv():
@@ -170,3 +310,64 @@ class TestCli(unittest.TestCase):
                 self.assertNotEqual(exit_code, 0)
 
 
+
+    def test_call_lor_server_serves_forwarded_commands_until_stopped(self):
+        with TemporaryWorkspace() as ws:
+            with TemporaryEnv():
+                os.chdir(ws)
+                server = start_server(ws)
+                try:
+                    forward_script = "import sys, lor.client; sys.exit(lor.client.try_forward(sys.argv[1], ['ls', 'lor.tasks']))"
+                    exit_code = subprocess.call([sys.executable, "-c", forward_script, ws], env=dict(os.environ, PYTHONPATH=lor._paths.lor_path("")), stdout=subprocess.DEVNULL)
+                    self.assertEqual(exit_code, 0)
+
+                    stdout, stderr, exit_code = run_cli(["server", "--stop"])
+                    self.assertEqual(exit_code, 0)
+                    self.assertEqual(server.wait(timeout=30), 0)
+                finally:
+                    if server.poll() is None:
+                        server.kill()
+
+    def test_call_lor_server_runs_forwarded_commands_with_the_clients_luigi_config(self):
+        with TemporaryWorkspace() as ws:
+            with TemporaryEnv():
+                os.chdir(ws)
+                with open(os.path.join(ws, "config_tasks.py"), "w") as f:
+                    f.write("import luigi\n"
+                            "class WritesConfigTask(luigi.Task):\n"
+                            "    out = luigi.Parameter()\n"
+                            "    def run(self):\n"
+                            "        with open(self.out, 'w') as f:\n"
+                            "            f.write(luigi.configuration.get_config().get('lortest', 'value', 'unset'))\n")
+                config_path = os.path.join(tempfile.mkdtemp(), "luigi.cfg")
+                with open(config_path, "w") as f:
+                    f.write("[lortest]\nvalue=from-client\n")
+                out_path = os.path.join(tempfile.mkdtemp(), "out")
+
+                server = start_server(ws)
+                try:
+                    forward_script = "import sys, lor.client; sys.exit(lor.client.try_forward(sys.argv[1], sys.argv[2:]))"
+                    args = ["run", "--module", "config_tasks", "WritesConfigTask", "--out", out_path, "--local-scheduler"]
+                    env = dict(os.environ, PYTHONPATH=lor._paths.lor_path(""), LUIGI_CONFIG_PATH=config_path)
+                    exit_code = subprocess.call([sys.executable, "-c", forward_script, ws] + args, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=60)
+                    self.assertEqual(exit_code, 0)
+
+                    with open(out_path) as f:
+                        self.assertEqual("from-client", f.read())
+                finally:
+                    server.kill()
+
+    def test_call_lor_server_serves_other_clients_while_a_client_has_not_sent_its_request(self):
+        with TemporaryWorkspace() as ws:
+            with TemporaryEnv():
+                os.chdir(ws)
+                server = start_server(ws)
+                try:
+                    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stalled_client:
+                        stalled_client.connect(lor.client.socket_path(ws))
+
+                        forward_script = "import sys, lor.client; sys.exit(lor.client.try_forward(sys.argv[1], ['ls', 'lor.tasks']))"
+                        exit_code = subprocess.call([sys.executable, "-c", forward_script, ws], env=dict(os.environ, PYTHONPATH=lor._paths.lor_path("")), stdout=subprocess.DEVNULL, timeout=30)
+                        self.assertEqual(exit_code, 0)
+                finally:
+                    server.kill()
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import os
+import tempfile
+from unittest import TestCase, mock
+
+from lor import client, util
+from lor.test import TemporaryEnv
+
+
+class TestClient(TestCase):
+
+    def test_socket_path_is_the_same_for_the_same_workspace(self):
+        ws_path = tempfile.mkdtemp()
+
+        self.assertEqual(client.socket_path(ws_path), client.socket_path(os.path.join(ws_path, ".")))
+
+    def test_socket_path_differs_between_workspaces(self):
+        self.assertNotEqual(client.socket_path(tempfile.mkdtemp()), client.socket_path(tempfile.mkdtemp()))
+
+    def test_try_forward_returns_None_if_no_server_is_running(self):
+        self.assertIsNone(client.try_forward(tempfile.mkdtemp(), ["ls", "lor.tasks"]))
+
+    def test_try_forward_returns_None_for_commands_that_are_not_forwarded(self):
+        self.assertIsNone(client.try_forward(tempfile.mkdtemp(), ["new", util.base36_str()]))
+
+    def test_try_forward_returns_None_if_server_is_disabled_by_env_var(self):
+        with TemporaryEnv() as env:
+            env["LOR_NO_SERVER"] = "1"
+            self.assertIsNone(client.try_forward(tempfile.mkdtemp(), ["ls", "lor.tasks"]))
+
+    def test_try_forward_returns_None_without_connecting_if_stdin_is_None(self):
+        with mock.patch("sys.stdin", None), mock.patch("socket.socket", side_effect=AssertionError("socket created")):
+            self.assertIsNone(client.try_forward(tempfile.mkdtemp(), ["ls", "lor.tasks"]))
+
+    def test_stop_server_returns_False_if_no_server_is_running(self):
+        self.assertFalse(client.stop_server(tempfile.mkdtemp()))
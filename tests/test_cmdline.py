@@ -12,10 +12,39 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import os
+import tempfile
 from unittest import TestCase
 
+import lor.commands
+from lor import cmdline
+from lor.util import reflection
+from lor.util.cli import CliCommand
+
 
 class TestCmdline(TestCase):
 
     # TODO: need to launch off a separate python process; otherwise, any calls to exit(2) may close the test suite.
-    pass
+
+    def setUp(self):
+        # Listing the commands reflects over `lor.commands`, which would otherwise write to the user's reflection index
+        self.previous_index_path = reflection.get_index_path()
+        reflection._set_index_path(os.path.join(tempfile.mkdtemp(), "reflection-index.json"))
+
+    def tearDown(self):
+        reflection._set_index_path(self.previous_index_path)
+
+    def test_get_default_workspace_subcommands_contains_all_commands_in_commands_pkg(self):
+        subcommand_classes = reflection.subclasses_in_pkg(package=lor.commands, superclass=CliCommand)
+        expected = {klass().name(): klass().description() for klass in subcommand_classes}
+
+        actual = {name: cmd.description() for name, cmd in cmdline.get_default_workspace_subcommands().items()}
+
+        self.assertEqual(expected, actual)
+
+    def test_get_default_workspace_subcommands_load_to_commands_with_the_same_name(self):
+        for name, cmd in cmdline.get_default_workspace_subcommands().items():
+            self.assertEqual(name, cmd.load().name())
+
+    def test_get_default_out_of_workspace_subcommands_contains_new(self):
+        self.assertIn("new", cmdline.get_default_out_of_workspace_subcommands())
@@ -14,9 +14,10 @@
 #
 import os
 import tempfile
-from unittest import TestCase
+from unittest import TestCase, mock
 
-from lor import path, workspace, util
+from lor import path, workspace, util, props
+from lor.props import DictPropertyLoader
 from lor.generators.workspace import workspace_generator
 
 
@@ -153,6 +154,195 @@ class TestPaths(TestCase):
 
         self.assertEqual(returned_path, os.path.join(overlay1, file_name))
 
+    def test_resolve_interpolates_property_references_in_path_components(self):
+        overlay = tempfile.mkdtemp()
+        dir_name = util.base36_str()
+        file_name = util.base36_str()
+        os.mkdir(os.path.join(overlay, dir_name))
+        self.__create_file(os.path.join(overlay, dir_name, file_name))
+
+        path._set_overlay_paths([overlay])
+        props._set_loaders([DictPropertyLoader("some-loader", {"SOME_DIR": dir_name})])
+
+        returned_path = path.resolve("${SOME_DIR}", file_name)
+
+        self.assertEqual(os.path.join(overlay, dir_name, file_name), returned_path)
+
+    def test_resolve_does_not_access_filesystem_when_resolving_a_path_again(self):
+        overlay = tempfile.mkdtemp()
+        file_name = util.base36_str()
+        self.__create_file(os.path.join(overlay, file_name))
+        path._set_overlay_paths([overlay])
+
+        expected_path = path.resolve(file_name)
+
+        with mock.patch("os.listdir", side_effect=AssertionError("listdir called")), \
+                mock.patch("os.stat", side_effect=AssertionError("stat called")):
+            self.assertEqual(expected_path, path.resolve(file_name))
+
+    def test_resolve_finds_file_created_after_its_dir_was_listed(self):
+        overlay = tempfile.mkdtemp()
+        file_name = util.base36_str()
+        self.__create_file(os.path.join(overlay, util.base36_str()))
+        path._set_overlay_paths([overlay])
+        path.resolve_all(file_name)
+
+        self.__create_file(os.path.join(overlay, file_name))
+
+        self.assertEqual(os.path.join(overlay, file_name), path.resolve(file_name))
+
+    def test_invalidate_causes_deleted_files_to_no_longer_resolve(self):
+        overlay = tempfile.mkdtemp()
+        file_name = util.base36_str()
+        self.__create_file(os.path.join(overlay, file_name))
+        path._set_overlay_paths([overlay])
+        path.resolve(file_name)
+
+        os.remove(os.path.join(overlay, file_name))
+        path.invalidate()
+
+        with self.assertRaises(FileNotFoundError):
+            path.resolve(file_name)
+
+    def test_resolve_all_returns_nested_paths_that_exist_in_each_overlay(self):
+        overlays = [tempfile.mkdtemp(), tempfile.mkdtemp(), tempfile.mkdtemp()]
+        for overlay in overlays[1:]:
+            os.makedirs(os.path.join(overlay, "a", "b"))
+            self.__create_file(os.path.join(overlay, "a", "b", "c"))
+        path._set_overlay_paths(overlays)
+
+        expected = [os.path.join(overlay, "a", "b", "c") for overlay in overlays[1:]]
+
+        self.assertEqual(expected, path.resolve_all("a", "b/c"))
+
+    def test_listdir_returns_sorted_entries_merged_across_overlays(self):
+        overlays = [tempfile.mkdtemp(), tempfile.mkdtemp()]
+        for overlay, names in zip(overlays, [["b", "c"], ["a", "c"]]):
+            os.mkdir(os.path.join(overlay, "d"))
+            for name in names:
+                self.__create_file(os.path.join(overlay, "d", name))
+        path._set_overlay_paths(overlays)
+
+        self.assertEqual(["a", "b", "c"], path.listdir("d"))
+
+    def test_listdir_raises_FileNotFoundError_if_dir_does_not_exist_in_any_overlay(self):
+        path._set_overlay_paths([tempfile.mkdtemp()])
+
+        with self.assertRaises(FileNotFoundError):
+            path.listdir(util.base36_str())
+
+    def test_glob_yields_matches_from_highest_priority_overlay_on_name_clashes(self):
+        overlays = [tempfile.mkdtemp(), tempfile.mkdtemp()]
+        for overlay, names in zip(overlays, [["a.csv", "b.csv"], ["b.csv", "c.csv", "c.txt"]]):
+            os.mkdir(os.path.join(overlay, "d"))
+            for name in names:
+                self.__create_file(os.path.join(overlay, "d", name))
+        path._set_overlay_paths(overlays)
+
+        ret = path.glob("d/*.csv")
+
+        self.assertNotIsInstance(ret, list)
+        self.assertEqual(
+            sorted([os.path.join(overlays[0], "d", "a.csv"),
+                    os.path.join(overlays[0], "d", "b.csv"),
+                    os.path.join(overlays[1], "d", "c.csv")]),
+            sorted(ret))
+
+    def test_glob_lists_each_overlay_dir_once_rather_than_checking_each_name_against_higher_overlays(self):
+        overlays = [tempfile.mkdtemp(), tempfile.mkdtemp(), tempfile.mkdtemp()]
+        for overlay in overlays:
+            for i in range(5):
+                self.__create_file(os.path.join(overlay, "{i}.csv".format(i=i)))
+        path._set_overlay_paths(overlays)
+
+        with mock.patch("os.listdir", side_effect=os.listdir) as listdir, \
+                mock.patch("os.path.lexists", side_effect=AssertionError("lexists called")):
+            ret = list(path.glob("*.csv"))
+
+        self.assertEqual(sorted(os.path.join(overlays[0], "{i}.csv".format(i=i)) for i in range(5)), sorted(ret))
+        self.assertEqual(len(overlays), listdir.call_count)
+
+    def test_glob_double_star_matches_nested_dirs_and_skips_hidden_names(self):
+        overlay = tempfile.mkdtemp()
+        os.makedirs(os.path.join(overlay, "x", "y"))
+        os.makedirs(os.path.join(overlay, ".hidden"))
+        for rel_path in ["f.yml", os.path.join("x", "f.yml"), os.path.join("x", "y", "f.yml"), os.path.join(".hidden", "f.yml")]:
+            self.__create_file(os.path.join(overlay, rel_path))
+        path._set_overlay_paths([overlay])
+
+        self.assertEqual(
+            sorted(os.path.join(overlay, p) for p in ["f.yml", os.path.join("x", "f.yml"), os.path.join("x", "y", "f.yml")]),
+            sorted(path.glob("**/*.yml")))
+
+    def test_walk_merges_dirs_across_overlays(self):
+        overlays = [tempfile.mkdtemp(), tempfile.mkdtemp()]
+        os.makedirs(os.path.join(overlays[0], "d", "sub"))
+        self.__create_file(os.path.join(overlays[0], "d", "a"))
+        os.makedirs(os.path.join(overlays[1], "d", "sub"))
+        self.__create_file(os.path.join(overlays[1], "d", "sub", "b"))
+        self.__create_file(os.path.join(overlays[1], "d", "a"))
+        path._set_overlay_paths(overlays)
+
+        ret = [(d, sorted(dir_names), sorted(file_names)) for d, dir_names, file_names in path.walk("d")]
+
+        self.assertEqual([("d", ["sub"], ["a"]), (os.path.join("d", "sub"), [], ["b"])], ret)
+
+    def test_walk_can_be_pruned_in_place_when_topdown(self):
+        overlay = tempfile.mkdtemp()
+        os.makedirs(os.path.join(overlay, "top", "skip", "deeper"))
+        os.makedirs(os.path.join(overlay, "top", "keep"))
+        path._set_overlay_paths([overlay])
+
+        visited = []
+        for d, dir_names, _ in path.walk("top"):
+            visited.append(d)
+            if "skip" in dir_names:
+                dir_names.remove("skip")
+
+        self.assertEqual(["top", os.path.join("top", "keep")], visited)
+
+    def test_resolve_and_listdir_use_path_index_instead_of_listing_dirs(self):
+        ws_path = os.path.join(tempfile.mkdtemp(), "ws")
+        workspace_generator.create(ws_path)
+        workspace._set_path(ws_path)
+        overlay = tempfile.mkdtemp()
+        os.mkdir(os.path.join(overlay, "etc"))
+        self.__create_file(os.path.join(overlay, "etc", "overlaid"))
+
+        try:
+            path._set_overlay_paths([overlay])
+            path.build_index()
+
+            with mock.patch("os.listdir", side_effect=AssertionError("listdir called")):
+                self.assertEqual(os.path.join(overlay, "etc", "overlaid"), path.resolve("etc", "overlaid"))
+                self.assertEqual(
+                    [os.path.join(overlay, "etc"), os.path.join(ws_path, "etc")],
+                    path.resolve_all("etc"))
+                self.assertIn("overlaid", path.listdir("etc"))
+                self.assertIn("properties.yml", path.listdir("etc"))
+        finally:
+            path._set_overlay_paths([])
+            workspace._set_path(None)
+
+    def test_resolve_falls_back_to_filesystem_for_dirs_changed_after_path_index_was_built(self):
+        ws_path = os.path.join(tempfile.mkdtemp(), "ws")
+        workspace_generator.create(ws_path)
+        workspace._set_path(ws_path)
+        file_name = util.base36_str()
+        self.__create_file(os.path.join(ws_path, "etc", file_name))
+
+        try:
+            path._set_overlay_paths([])
+            path.build_index()
+            os.remove(os.path.join(ws_path, "etc", file_name))
+            etc_stat = os.stat(os.path.join(ws_path, "etc"))
+            os.utime(os.path.join(ws_path, "etc"), ns=(etc_stat.st_atime_ns, etc_stat.st_mtime_ns + 10 ** 9))
+
+            with self.assertRaises(FileNotFoundError):
+                path.resolve("etc", file_name)
+        finally:
+            workspace._set_path(None)
+
     def test_resolve_returns_result_from_another_overlay_if_exists_in_different_overlay(self):
         empty_overlay = tempfile.mkdtemp()
         overlay_with_file = tempfile.mkdtemp()
@@ -12,16 +12,21 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import contextlib
+import io
 import os
+import tempfile
 import unittest
+from unittest import mock
 
 import yaml
 
 import lor
 import lor._constants
 from lor import util, props, workspace
-from lor.props import DictPropertyLoader, YAMLFilePropertyLoader, PropertyLoader
-from lor.test import TemporaryWorkspace
+from lor.props import DictPropertyLoader, YAMLFilePropertyLoader, PropertyLoader, LazyPropertyLoader, \
+    ReloadingYAMLFilePropertyLoader, EnvPropertyLoader
+from lor.test import TemporaryWorkspace, TemporaryEnv
 from tests import tst_helpers
 
 
@@ -328,3 +333,258 @@ class TestProperties(unittest.TestCase):
         }
 
         self.assertEqual(expected_ret, ret)
+
+    def test_get_source_returns_name_of_loader_that_supplies_property(self):
+        k1 = util.base36_str()
+        k2 = util.base36_str()
+        loaders = [
+            DictPropertyLoader("first", {k1: util.base36_str()}),
+            DictPropertyLoader("second", {k1: util.base36_str(), k2: util.base36_str()}),
+        ]
+
+        props._set_loaders(loaders)
+
+        self.assertEqual("first", props.get_source(k1))
+        self.assertEqual("second", props.get_source(k2))
+
+    def test_get_source_raises_KeyError_for_non_existent_property(self):
+        props._set_loaders([DictPropertyLoader("some-loader", {})])
+
+        with self.assertRaises(KeyError):
+            props.get_source(util.base36_str())
+
+    def test__set_loaders_replaces_snapshot_used_by_get(self):
+        k = util.base36_str()
+        v1 = util.base36_str()
+        v2 = util.base36_str()
+
+        props._set_loaders([DictPropertyLoader("first", {k: v1})])
+        self.assertEqual(v1, props.get(k))
+
+        props._set_loaders([DictPropertyLoader("second", {k: v2})])
+        self.assertEqual(v2, props.get(k))
+
+    def test_get_all_returns_a_copy_of_the_snapshot(self):
+        k = util.base36_str()
+        v = util.base36_str()
+        props._set_loaders([DictPropertyLoader("some-loader", {k: v})])
+
+        props.get_all()[k] = util.base36_str()
+
+        self.assertEqual(v, props.get(k))
+
+    def test_PropertySnapshot_falls_through_None_values_like_get_property_from_list_of_loaders(self):
+        k = util.base36_str()
+        v = util.base36_str()
+        loaders = [
+            DictPropertyLoader("first", {k: None}),
+            DictPropertyLoader("second", {k: v}),
+        ]
+
+        snapshot = props.PropertySnapshot(loaders)
+
+        self.assertEqual(props.get_property_from_list_of_loaders(loaders, k), snapshot.get(k))
+        self.assertEqual("second", snapshot.get_source(k))
+
+    def test_LazyPropertyLoader_get_name_does_not_create_wrapped_loader(self):
+        loader = LazyPropertyLoader("some-name", raise_on_call)
+
+        self.assertEqual("some-name", loader.get_name())
+        self.assertFalse(loader.is_loaded())
+
+    def test_LazyPropertyLoader_try_get_returns_property_from_wrapped_loader(self):
+        k = util.base36_str()
+        v = util.base36_str()
+        loader = LazyPropertyLoader("some-name", lambda: DictPropertyLoader("wrapped", {k: v}))
+
+        self.assertEqual(v, loader.try_get(k))
+        self.assertTrue(loader.is_loaded())
+
+    def test_get_does_not_load_lazy_loaders_if_higher_priority_loader_has_property(self):
+        k = util.base36_str()
+        v = util.base36_str()
+        lazy_loader = LazyPropertyLoader("lazy", raise_on_call)
+        props._set_loaders([DictPropertyLoader("first", {k: v}), lazy_loader])
+
+        self.assertEqual(v, props.get(k))
+        self.assertFalse(lazy_loader.is_loaded())
+
+    def test_get_raises_lazy_loader_errors_when_lookup_reaches_it(self):
+        props._set_loaders([DictPropertyLoader("first", {}), LazyPropertyLoader("lazy", raise_on_call)])
+
+        with self.assertRaises(RuntimeError):
+            props.get(util.base36_str())
+
+    def test_ReloadingYAMLFilePropertyLoader_reloads_changed_file(self):
+        tmp_path = os.path.join(tempfile.mkdtemp(), "properties.yml")
+        with open(tmp_path, "w") as f:
+            yaml.dump({"k": "v1"}, f)
+
+        loader = ReloadingYAMLFilePropertyLoader(tmp_path, min_check_interval=0)
+        first_generation = loader.generation()
+        self.assertEqual("v1", loader.get("k"))
+
+        with open(tmp_path, "w") as f:
+            yaml.dump({"k": "changed"}, f)
+
+        self.assertEqual("changed", loader.get("k"))
+        self.assertGreater(loader.generation(), first_generation)
+
+    def test_ReloadingYAMLFilePropertyLoader_does_not_check_file_more_often_than_min_check_interval(self):
+        tmp_path = os.path.join(tempfile.mkdtemp(), "properties.yml")
+        with open(tmp_path, "w") as f:
+            yaml.dump({"k": "v1"}, f)
+
+        loader = ReloadingYAMLFilePropertyLoader(tmp_path, min_check_interval=3600)
+
+        with open(tmp_path, "w") as f:
+            yaml.dump({"k": "changed"}, f)
+
+        self.assertEqual("v1", loader.get("k"))
+
+    def test_ReloadingYAMLFilePropertyLoader_keeps_previous_properties_if_changed_file_is_invalid(self):
+        tmp_path = os.path.join(tempfile.mkdtemp(), "properties.yml")
+        with open(tmp_path, "w") as f:
+            yaml.dump({"k": "v1"}, f)
+
+        loader = ReloadingYAMLFilePropertyLoader(tmp_path, min_check_interval=0)
+
+        with open(tmp_path, "w") as f:
+            f.write("k: [unclosed")
+
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual("v1", loader.get("k"))
+
+    def test_generation_changes_and_get_returns_new_value_when_loader_reloads(self):
+        tmp_path = os.path.join(tempfile.mkdtemp(), "properties.yml")
+        with open(tmp_path, "w") as f:
+            yaml.dump({"k": "v1"}, f)
+
+        props._set_loaders([ReloadingYAMLFilePropertyLoader(tmp_path, min_check_interval=0)])
+        self.assertEqual("v1", props.get("k"))
+        first_generation = props.generation()
+
+        with open(tmp_path, "w") as f:
+            yaml.dump({"k": "changed"}, f)
+
+        self.assertEqual("changed", props.get("k"))
+        self.assertGreater(props.generation(), first_generation)
+
+    def test_get_does_not_touch_loaders_once_a_property_is_memoized_if_no_loader_can_reload(self):
+        loader = DictPropertyLoader("some-loader", {"k": "v"})
+        props._set_loaders([loader])
+        self.assertEqual("v", props.get("k"))
+
+        with mock.patch.object(loader, "try_get", side_effect=AssertionError("try_get called")), \
+                mock.patch.object(loader, "generation", side_effect=AssertionError("generation called")):
+            self.assertEqual("v", props.get("k"))
+            self.assertEqual("v", props.get_snapshot().get("k"))
+
+    def test__set_loaders_changes_generation(self):
+        props._set_loaders([DictPropertyLoader("some-loader", {})])
+        first_generation = props.generation()
+
+        props._set_loaders([DictPropertyLoader("some-other-loader", {})])
+
+        self.assertNotEqual(first_generation, props.generation())
+
+    def test_get_returns_nested_property_for_dotted_name(self):
+        props._set_loaders([DictPropertyLoader("some-loader", {"db": {"pool": {"size": 4}}})])
+
+        self.assertEqual(4, props.get("db.pool.size"))
+        self.assertEqual({"size": 4}, props.get("db.pool"))
+
+    def test_get_prefers_literal_dotted_name_over_nested_property(self):
+        props._set_loaders([DictPropertyLoader("some-loader", {"db.host": "literal", "db": {"host": "nested"}})])
+
+        self.assertEqual("literal", props.get("db.host"))
+
+    def test_get_falls_through_to_lower_priority_loader_for_missing_nested_property(self):
+        props._set_loaders([
+            DictPropertyLoader("first", {"db": {"host": "h"}}),
+            DictPropertyLoader("second", {"db": {"pool": {"size": 4}}}),
+        ])
+
+        self.assertEqual("h", props.get("db.host"))
+        self.assertEqual(4, props.get("db.pool.size"))
+        self.assertEqual("second", props.get_source("db.pool.size"))
+
+    def test_get_raises_KeyError_for_dotted_name_through_non_dict(self):
+        props._set_loaders([DictPropertyLoader("some-loader", {"db": "not-a-dict"})])
+
+        with self.assertRaises(KeyError):
+            props.get("db.host")
+
+    def test_get_prefix_returns_flattened_properties_with_prefix(self):
+        props._set_loaders([
+            DictPropertyLoader("first", {"db": {"host": "h1"}, "dbx": 1, "other": 2}),
+            DictPropertyLoader("second", {"db": {"host": "h2", "pool": {"size": 4}}}),
+        ])
+
+        self.assertEqual({"db.host": "h1", "db.pool.size": 4}, props.get_prefix("db."))
+        self.assertEqual({}, props.get_prefix("nothing."))
+
+    def test_get_interpolates_references_to_other_properties(self):
+        props._set_loaders([
+            DictPropertyLoader("first", {"OUTPUT_DIR": "${DATA_DIR}/output"}),
+            DictPropertyLoader("second", {"DATA_DIR": "/data", "db": {"url": "${db.host}:5432", "host": "h"}}),
+        ])
+
+        self.assertEqual("/data/output", props.get("OUTPUT_DIR"))
+        self.assertEqual("h:5432", props.get("db.url"))
+        self.assertEqual({"db.url": "h:5432", "db.host": "h"}, props.get_prefix("db."))
+        self.assertEqual("/data/output", props.get_all()["OUTPUT_DIR"])
+
+    def test_get_raises_ValueError_for_cyclic_references(self):
+        props._set_loaders([DictPropertyLoader("some-loader", {"a": "${b}", "b": "${a}"})])
+
+        with self.assertRaises(ValueError):
+            props.get("a")
+
+    def test_get_all_and_get_prefix_leave_references_to_unknown_properties_verbatim(self):
+        props._set_loaders([DictPropertyLoader("some-loader", {"CMD": "echo ${HOME}", "cmds": {"ls": "ls ${DIR}"}, "DIR": "/d"})])
+
+        self.assertEqual("echo ${HOME}", props.get_all()["CMD"])
+        self.assertEqual({"cmds.ls": "ls /d"}, props.get_prefix("cmds."))
+        self.assertEqual("echo ${HOME}", props.get("CMD"))
+
+    def test_get_all_leaves_malformed_references_in_values(self):
+        props._set_loaders([DictPropertyLoader("some-loader", {"SED": "sed s/${/x/", "EMPTY": "${}", "DIR": "/d"})])
+
+        self.assertEqual({"SED": "sed s/${/x/", "EMPTY": "${}", "DIR": "/d"}, props.get_all())
+
+    def test_interpolate_replaces_property_references(self):
+        props._set_loaders([DictPropertyLoader("some-loader", {"DATA_DIR": "/data"})])
+
+        self.assertEqual("/data/x and ${literal}", props.interpolate("${DATA_DIR}/x and $${literal}"))
+
+    def test_EnvPropertyLoader_loads_prefixed_environment_variables_without_prefix(self):
+        loader = EnvPropertyLoader(environ={"LOR_PROP_FOO": "bar", "LOR_PROP_": "empty-name", "OTHER": "x"})
+
+        self.assertEqual({"FOO": "bar"}, loader.get_all())
+        self.assertEqual("bar", loader.get("FOO"))
+        self.assertIsNone(loader.try_get("OTHER"))
+
+    def test_EnvPropertyLoader_does_not_see_environment_changes_after_creation(self):
+        with TemporaryEnv() as env:
+            env["LOR_PROP_FOO"] = "bar"
+            loader = EnvPropertyLoader()
+            env["LOR_PROP_FOO"] = "changed"
+
+            self.assertEqual("bar", loader.get("FOO"))
+
+    def test_default_loaders_prioritize_environment_variables_over_workspace_properties(self):
+        with TemporaryWorkspace() as ws:
+            props_path = os.path.join(ws, lor._constants.WORKSPACE_PROPS)
+            with open(props_path, "w") as f:
+                yaml.dump({"FOO": "from-file"}, f)
+
+            with TemporaryEnv() as env:
+                env["LOR_PROP_FOO"] = "from-env"
+                props._set_loaders(None)
+
+                self.assertEqual("from-env", props.get("FOO"))
+
+
+def raise_on_call():
+    raise RuntimeError("should not be called")
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import os
+import tempfile
+from unittest import TestCase
+
+import lor._constants
+import lor._snapshot
+from lor.props import DictPropertyLoader
+from lor.test import TemporaryWorkspace, TemporaryEnv
+
+
+class TestSnapshot(TestCase):
+
+    def tearDown(self):
+        lor._snapshot._set_snapshot_path(None)
+
+    def test_try_load_returns_None_if_no_snapshot_was_passed(self):
+        lor._snapshot._set_snapshot_path(None)
+
+        self.assertIsNone(lor._snapshot.try_load())
+
+    def test_try_load_returns_snapshot_written_for_this_workspace(self):
+        with TemporaryWorkspace() as ws, TemporaryEnv() as env:
+            env[lor._constants.WORKSPACE_ENV_VARNAME] = ws
+            snapshot_path = lor._snapshot.write(ws, [], [DictPropertyLoader("some-loader", {"k": "v"})])
+            try:
+                lor._snapshot._set_snapshot_path(snapshot_path)
+
+                snapshot = lor._snapshot.try_load()
+
+                self.assertEqual(ws, snapshot["workspace"])
+                self.assertEqual([("some-loader", {"k": "v"})], snapshot["property_loaders"])
+            finally:
+                lor._snapshot.remove(snapshot_path)
+
+    def test_try_load_returns_None_if_snapshot_file_was_removed(self):
+        with TemporaryWorkspace() as ws:
+            snapshot_path = lor._snapshot.write(ws, [], [])
+            lor._snapshot.remove(snapshot_path)
+            lor._snapshot._set_snapshot_path(snapshot_path)
+
+            self.assertIsNone(lor._snapshot.try_load())
+
+    def test_try_load_returns_None_if_snapshot_is_for_a_different_workspace(self):
+        with TemporaryWorkspace() as ws, TemporaryWorkspace() as other_ws, TemporaryEnv() as env:
+            env[lor._constants.WORKSPACE_ENV_VARNAME] = other_ws
+            snapshot_path = lor._snapshot.write(ws, [], [])
+            try:
+                lor._snapshot._set_snapshot_path(snapshot_path)
+
+                self.assertIsNone(lor._snapshot.try_load())
+            finally:
+                lor._snapshot.remove(snapshot_path)
+
+    def test_written_snapshot_is_only_readable_by_its_owner(self):
+        snapshot_path = lor._snapshot.write(tempfile.gettempdir(), [], [])
+        try:
+            self.assertEqual(0, os.stat(snapshot_path).st_mode & 0o077)
+        finally:
+            lor._snapshot.remove(snapshot_path)
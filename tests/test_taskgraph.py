@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import datetime
+import os
+import sys
+import tempfile
+import threading
+from unittest import TestCase, mock
+
+import luigi
+from luigi.task import MixinNaiveBulkComplete
+
+from lor import taskgraph
+
+
+class Leaf(luigi.Task):
+    n = luigi.IntParameter()
+
+
+class Chain(luigi.Task):
+    n = luigi.IntParameter()
+
+    def requires(self):
+        return Chain(n=self.n - 1) if self.n > 0 else None
+
+
+class ListRequirer(luigi.Task):
+    def requires(self):
+        return [Leaf(n=1), Leaf(n=2)]
+
+
+class DictRequirer(luigi.Task):
+    def requires(self):
+        return {"a": Leaf(n=1), "b": ListRequirer()}
+
+
+class GeneratorRequirer(luigi.Task):
+    def requires(self):
+        yield DictRequirer()
+        yield Leaf(n=2)
+
+
+class CountingRequirer(luigi.Task):
+    num_calls = 0
+
+    def requires(self):
+        CountingRequirer.num_calls += 1
+        return []
+
+
+class Diamond(luigi.Task):
+    def requires(self):
+        return [DiamondSide(side="left"), DiamondSide(side="right")]
+
+
+class DiamondSide(luigi.Task):
+    side = luigi.Parameter()
+
+    def requires(self):
+        return CountingRequirer()
+
+
+class BarrierSide(luigi.Task):
+    side = luigi.Parameter()
+    barrier = None
+
+    def requires(self):
+        # Only returns once both sides' requires() are running at the same time
+        BarrierSide.barrier.wait()
+        return Leaf(n=len(self.side))
+
+
+class BarrierRoot(luigi.Task):
+    def requires(self):
+        return [BarrierSide(side="left"), BarrierSide(side="right")]
+
+
+class Failing(luigi.Task):
+    def requires(self):
+        raise RuntimeError("requires failed")
+
+
+class LocalOutput(luigi.Task):
+    dir = luigi.Parameter()
+    n = luigi.IntParameter()
+
+    def output(self):
+        return luigi.LocalTarget(os.path.join(self.dir, str(self.n)))
+
+    def run(self):
+        pass
+
+
+class ExternalInput(luigi.ExternalTask):
+    pass
+
+
+class RangeStyleBulkChecked(luigi.Task):
+    date = luigi.DateParameter()
+    region = luigi.Parameter()
+    bulk_calls = []
+
+    @classmethod
+    def bulk_complete(cls, parameter_tuples):
+        # Like `luigi.tools.range`, `cls` is a partial that fixes the other parameters
+        dates = list(parameter_tuples)
+        RangeStyleBulkChecked.bulk_calls.append((cls.keywords, dates))
+        return [d for d in dates if d.day == 2]
+
+    def run(self):
+        pass
+
+
+class NaiveBulkChecked(MixinNaiveBulkComplete, luigi.Task):
+    date = luigi.DateParameter()
+    region = luigi.Parameter()
+
+    def complete(self):
+        return self.region == "eu" and self.date.day == 2
+
+    def run(self):
+        pass
+
+
+class FailingBulkChecked(luigi.Task):
+    n = luigi.IntParameter()
+
+    @classmethod
+    def bulk_complete(cls, parameter_tuples):
+        raise RuntimeError("bulk_complete failed")
+
+    def complete(self):
+        return self.n == 1
+
+    def run(self):
+        pass
+
+
+class CustomComplete(luigi.Task):
+    done = luigi.BoolParameter()
+
+    def complete(self):
+        return self.done
+
+    def run(self):
+        pass
+
+
+class TestTaskGraph(TestCase):
+
+    def test_build_handles_list_dict_and_generator_requirements(self):
+        graph = taskgraph.build(GeneratorRequirer())
+
+        self.assertEqual(GeneratorRequirer().task_id, graph.root_id)
+        self.assertEqual(
+            {GeneratorRequirer().task_id, DictRequirer().task_id, ListRequirer().task_id, Leaf(n=1).task_id, Leaf(n=2).task_id},
+            set(graph.tasks))
+        self.assertEqual([DictRequirer().task_id, Leaf(n=2).task_id], graph.requirements[GeneratorRequirer().task_id])
+        self.assertEqual([Leaf(n=1).task_id, ListRequirer().task_id], graph.requirements[DictRequirer().task_id])
+        self.assertEqual([], graph.requirements[Leaf(n=1).task_id])
+
+    def test_build_visits_shared_requirements_once(self):
+        CountingRequirer.num_calls = 0
+
+        graph = taskgraph.build(Diamond())
+
+        self.assertEqual(1, CountingRequirer.num_calls)
+        self.assertEqual(4, len(graph))
+        self.assertEqual(4, len(list(graph.edges())))
+
+    def test_build_handles_chains_deeper_than_the_recursion_limit(self):
+        depth = sys.getrecursionlimit() + 100
+
+        graph = taskgraph.build(Chain(n=depth))
+
+        self.assertEqual(depth + 1, len(graph))
+        self.assertEqual([Chain(n=0).task_id], graph.requirements[Chain(n=1).task_id])
+
+    def test_build_returns_the_same_ids_for_the_same_graph(self):
+        self.assertEqual(list(taskgraph.build(Diamond()).tasks), list(taskgraph.build(Diamond()).tasks))
+
+    def test_get_requirements_removes_duplicates(self):
+        class Duplicating(luigi.Task):
+            def requires(self):
+                return [Leaf(n=1), {"again": Leaf(n=1)}]
+
+        self.assertEqual([Leaf(n=1)], taskgraph.get_requirements(Duplicating()))
+
+    def test_walk_yields_tasks_in_the_same_order_regardless_of_concurrency(self):
+        def walk_ids(concurrency):
+            return [(t.task_id, [r.task_id for r in required]) for t, required in taskgraph.walk(GeneratorRequirer(), concurrency)]
+
+        self.assertEqual(walk_ids(1), walk_ids(4))
+
+    def test_walk_evaluates_independent_requires_concurrently(self):
+        BarrierSide.barrier = threading.Barrier(2, timeout=10)
+
+        graph = taskgraph.build(BarrierRoot(), concurrency=2)
+
+        self.assertEqual(5, len(graph))
+
+    def test_walk_raises_exceptions_from_requires_when_concurrent(self):
+        with self.assertRaises(RuntimeError):
+            list(taskgraph.walk(Failing(), concurrency=2))
+
+    def test_walk_raises_ValueError_if_concurrency_is_less_than_1(self):
+        with self.assertRaises(ValueError):
+            taskgraph.walk(Leaf(n=1), concurrency=0)
+
+    def test_walk_does_not_expand_tasks_beyond_max_depth(self):
+        CountingRequirer.num_calls = 0
+
+        visits = list(taskgraph.walk(Diamond(), max_depth=1))
+
+        self.assertEqual(0, CountingRequirer.num_calls)
+        self.assertEqual([Diamond().task_id, DiamondSide(side="left").task_id, DiamondSide(side="right").task_id], [t.task_id for t, _ in visits])
+        self.assertEqual([], visits[1][1])
+
+    def test_walk_drops_and_does_not_expand_tasks_that_are_not_included(self):
+        CountingRequirer.num_calls = 0
+
+        graph = taskgraph.build(Diamond(), include=lambda t: t.side != "left" if isinstance(t, DiamondSide) else True)
+
+        self.assertEqual([Diamond().task_id, DiamondSide(side="right").task_id, CountingRequirer().task_id], list(graph.tasks))
+        self.assertEqual([DiamondSide(side="right").task_id], graph.requirements[Diamond().task_id])
+        self.assertEqual(1, CountingRequirer.num_calls)
+
+    def test_walk_between_yields_only_tasks_on_paths_between_matching_tasks(self):
+        visits = list(taskgraph.walk_between(GeneratorRequirer(), "^DictRequirer_", "^Leaf_1_"))
+
+        self.assertEqual({DictRequirer().task_id, ListRequirer().task_id, Leaf(n=1).task_id}, {t.task_id for t, _ in visits})
+        required_by_id = {t.task_id: [r.task_id for r in required] for t, required in visits}
+        self.assertEqual([Leaf(n=1).task_id], required_by_id[ListRequirer().task_id])
+
+    def test_to_nodes_collapses_matching_classes_into_a_node_with_a_count(self):
+        nodes = list(taskgraph.to_nodes(taskgraph.walk(Chain(n=3)), collapse_pattern="^Chain$"))
+
+        self.assertEqual([("collapsed:Chain", {"label": "Chain (x4)", "count": "4"}, [])], nodes)
+
+    def test_to_nodes_points_requirements_at_collapsed_nodes(self):
+        nodes = list(taskgraph.to_nodes(taskgraph.walk(Diamond()), collapse_pattern="Side"))
+
+        self.assertEqual(
+            [(Diamond().task_id, {"label": "Diamond", "count": "1"}, ["collapsed:DiamondSide"]),
+             (CountingRequirer().task_id, {"label": "CountingRequirer", "count": "1"}, []),
+             ("collapsed:DiamondSide", {"label": "DiamondSide (x2)", "count": "2"}, [CountingRequirer().task_id])],
+            nodes)
+
+    def test_get_statuses_lists_each_output_dir_once_for_local_targets(self):
+        output_dir = tempfile.mkdtemp()
+        with open(os.path.join(output_dir, "1"), "w"):
+            pass
+
+        tasks = [LocalOutput(dir=output_dir, n=1), LocalOutput(dir=output_dir, n=2), ExternalInput()]
+        with mock.patch("os.path.exists", side_effect=AssertionError("exists called")):
+            statuses = taskgraph.get_statuses(tasks, concurrency=2)
+
+        self.assertEqual(
+            {tasks[0].task_id: taskgraph.COMPLETE, tasks[1].task_id: taskgraph.INCOMPLETE, tasks[2].task_id: taskgraph.EXTERNAL},
+            statuses)
+
+    def test_get_statuses_calls_bulk_complete_like_luigi_range_tools_once_per_group_of_fixed_params(self):
+        RangeStyleBulkChecked.bulk_calls = []
+        tasks = [RangeStyleBulkChecked(date=datetime.date(2020, 1, d), region=r) for r in ["eu", "us"] for d in [1, 2]]
+
+        statuses = taskgraph.get_statuses(tasks)
+
+        self.assertEqual(
+            [({"region": "eu"}, [datetime.date(2020, 1, 1), datetime.date(2020, 1, 2)]),
+             ({"region": "us"}, [datetime.date(2020, 1, 1), datetime.date(2020, 1, 2)])],
+            RangeStyleBulkChecked.bulk_calls)
+        self.assertEqual([taskgraph.INCOMPLETE, taskgraph.COMPLETE] * 2, [statuses[t.task_id] for t in tasks])
+
+    def test_get_statuses_works_with_luigis_naive_bulk_complete(self):
+        tasks = [NaiveBulkChecked(date=datetime.date(2020, 1, d), region=r) for r in ["eu", "us"] for d in [1, 2]]
+
+        statuses = taskgraph.get_statuses(tasks)
+
+        self.assertEqual([taskgraph.INCOMPLETE, taskgraph.COMPLETE, taskgraph.INCOMPLETE, taskgraph.INCOMPLETE], [statuses[t.task_id] for t in tasks])
+
+    def test_get_statuses_falls_back_to_complete_if_bulk_complete_fails(self):
+        statuses = taskgraph.get_statuses([FailingBulkChecked(n=1), FailingBulkChecked(n=2)])
+
+        self.assertEqual([taskgraph.COMPLETE, taskgraph.INCOMPLETE], [statuses[FailingBulkChecked(n=n).task_id] for n in [1, 2]])
+
+    def test_get_statuses_calls_complete_for_other_tasks(self):
+        statuses = taskgraph.get_statuses([CustomComplete(done=True), CustomComplete(done=False)], concurrency=2)
+
+        self.assertEqual([taskgraph.COMPLETE, taskgraph.INCOMPLETE], [statuses[CustomComplete(done=d).task_id] for d in [True, False]])
+
+    def test_to_nodes_includes_status_and_color_when_statuses_supplied(self):
+        nodes = list(taskgraph.to_nodes(taskgraph.walk(Diamond()), "Side", statuses={
+            Diamond().task_id: taskgraph.INCOMPLETE,
+            DiamondSide(side="left").task_id: taskgraph.COMPLETE,
+            DiamondSide(side="right").task_id: taskgraph.INCOMPLETE,
+            CountingRequirer().task_id: taskgraph.EXTERNAL,
+        }))
+
+        self.assertEqual({"label": "CountingRequirer", "count": "1", "status": "external", "color": "gray"}, nodes[1][1])
+        self.assertEqual("incomplete", nodes[2][1]["status"])
@@ -98,6 +98,14 @@ class TestHelpers(unittest.TestCase):
         self.assertEqual("a or b", util.or_join(["a", "b"]))
         self.assertEqual("a, b, or c", util.or_join(["a", "b", "c"]))
 
+    def test_flatten_returns_expected_results(self):
+        self.assertEqual([], util.flatten({}))
+        self.assertEqual([("a", 1)], util.flatten({"a": 1}))
+        self.assertEqual(
+            [("a.b", 1), ("a.c.d", [2]), ("e", 3)],
+            sorted(util.flatten({"a": {"b": 1, "c": {"d": [2]}}, "e": 3})))
+        self.assertEqual([("a/b", 1)], util.flatten({"a": {"b": 1}}, separator="/"))
+
     def test_to_camel_case_returns_expected_results(self):
         cases = [
             ("some_str", "SomeStr"),
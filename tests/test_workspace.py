@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import json
 import os
 import stat
 import tempfile
@@ -197,6 +198,48 @@ class TestWorkspaces(TestCase):
             ws_path = workspace.try_locate()
             self.assertEqual(os.path.realpath(cwd), os.path.realpath(ws_path))
 
+    def test_try_locate_memoizes_results(self):
+        cwd = os.path.join(tempfile.mkdtemp(), "ws")
+        workspace_generator.create(cwd)
+        some_subdir = os.path.join(cwd, "some", "subdir")
+        os.makedirs(some_subdir)
+
+        self.assertEqual(cwd, workspace.try_locate(some_subdir))
+
+        os.remove(os.path.join(cwd, lor._constants.WORKSPACE_EXEC_BINSTUB))
+
+        self.assertEqual(cwd, workspace.try_locate(some_subdir))
+        self.assertEqual(cwd, workspace.try_locate(os.path.join(cwd, "some")))
+
+        workspace._clear_location_cache()
+
+        self.assertIsNone(workspace.try_locate(some_subdir))
+
+    def test_try_locate_uses_workspace_hints_file_if_set_in_env(self):
+        ws_path = os.path.join(tempfile.mkdtemp(), "ws")
+        workspace_generator.create(ws_path)
+        some_dir = tempfile.mkdtemp()
+        hints_path = os.path.join(tempfile.mkdtemp(), "hints.json")
+
+        with open(hints_path, "w") as f:
+            json.dump({some_dir: ws_path}, f)
+
+        with TemporaryEnv() as env:
+            env[lor._constants.WORKSPACE_HINTS_ENV_VARNAME] = hints_path
+            self.assertEqual(ws_path, workspace.try_locate(os.path.join(some_dir, "deep", "subdir")))
+
+    def test_try_locate_adds_located_workspaces_to_hints_file(self):
+        ws_path = os.path.join(tempfile.mkdtemp(), "ws")
+        workspace_generator.create(ws_path)
+        hints_path = os.path.join(tempfile.mkdtemp(), "hints.json")
+
+        with TemporaryEnv() as env:
+            env[lor._constants.WORKSPACE_HINTS_ENV_VARNAME] = hints_path
+            workspace.try_locate(ws_path)
+
+        with open(hints_path) as f:
+            self.assertEqual({ws_path: ws_path}, json.load(f))
+
     def test_get_package_name_returns_a_string_for_new_workspace(self):
         cwd = os.path.join(tempfile.mkdtemp(), "wd")
         workspace_generator.create(cwd)
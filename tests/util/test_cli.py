@@ -12,9 +12,59 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import argparse
+import os
+import sys
 from unittest import TestCase
 
+from lor.util import cli
+from lor.util.cli import LazyCliCommand
+
 
 class TestCli(TestCase):
 
-    pass
+    def test_LazyCliCommand_name_and_description_return_supplied_values(self):
+        cmd = LazyCliCommand("some-name", "some description", "lor.commands.run.RunCommand")
+
+        self.assertEqual("some-name", cmd.name())
+        self.assertEqual("some description", cmd.description())
+
+    def test_LazyCliCommand_does_not_import_implementation_until_loaded(self):
+        module_name = "tests.fixture_pkg.reflectiont.mod_with_class"
+        existing_module = sys.modules.pop(module_name, None)
+
+        try:
+            cmd = LazyCliCommand("some-name", "some description", module_name + ".SomeClass")
+
+            self.assertNotIn(module_name, sys.modules)
+
+            loaded = cmd.load()
+
+            self.assertIn(module_name, sys.modules)
+            self.assertEqual("SomeClass", type(loaded).__name__)
+        finally:
+            if existing_module is not None:
+                sys.modules[module_name] = existing_module
+
+    def test_extract_property_overrides_returns_dict_of_KEY_VALUE_pairs(self):
+        namespace = argparse.Namespace(properties=["a=1", "b=x=y", "c="])
+
+        self.assertEqual({"a": "1", "b": "x=y", "c": ""}, cli.extract_property_overrides(namespace))
+
+    def test_extract_property_overrides_returns_empty_dict_if_no_properties_supplied(self):
+        self.assertEqual({}, cli.extract_property_overrides(argparse.Namespace(properties=None)))
+
+    def test_add_overlay_arg_collects_repeated_overlays_as_absolute_paths_in_order(self):
+        parser = argparse.ArgumentParser()
+        cli.add_overlay_arg(parser)
+
+        namespace = parser.parse_args(["--overlay", "a", "--overlay", "/b"])
+
+        self.assertEqual([os.path.abspath("a"), "/b"], cli.extract_overlay_paths(namespace))
+
+    def test_extract_overlay_paths_returns_empty_list_if_no_overlays_supplied(self):
+        self.assertEqual([], cli.extract_overlay_paths(argparse.Namespace(overlays=None)))
+
+    def test_extract_property_overrides_raises_ValueError_for_entry_without_equals(self):
+        with self.assertRaises(ValueError):
+            cli.extract_property_overrides(argparse.Namespace(properties=["a"]))
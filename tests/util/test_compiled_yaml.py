@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import datetime
+import marshal
+import os
+import tempfile
+from unittest import TestCase, mock
+
+from lor.util import compiled_yaml
+
+
+def write_yaml(content):
+    yaml_path = os.path.join(tempfile.mkdtemp(), "properties.yml")
+    with open(yaml_path, "w") as f:
+        f.write(content)
+    return yaml_path
+
+
+def tamper_with_cached_data(yaml_path, data):
+    cache_path = compiled_yaml.get_cache_path(yaml_path)
+    with open(cache_path, "rb") as f:
+        header = f.readline()
+    with open(cache_path, "wb") as f:
+        f.write(header)
+        f.write(marshal.dumps(data))
+
+
+class TestCompiledYaml(TestCase):
+
+    def test_load_returns_parsed_yaml(self):
+        yaml_path = write_yaml("foo: bar\nbaz: [1, 2]\n")
+        self.assertEqual({"foo": "bar", "baz": [1, 2]}, compiled_yaml.load(yaml_path))
+
+    def test_load_writes_cache_beside_yaml_file(self):
+        yaml_path = write_yaml("foo: bar\n")
+        compiled_yaml.load(yaml_path)
+
+        cache_path = compiled_yaml.get_cache_path(yaml_path)
+
+        self.assertEqual(os.path.dirname(yaml_path), os.path.dirname(cache_path))
+        self.assertTrue(os.path.exists(cache_path))
+
+    def test_load_uses_cache_if_yaml_file_is_unchanged(self):
+        yaml_path = write_yaml("foo: bar\n")
+        compiled_yaml.load(yaml_path)
+        tamper_with_cached_data(yaml_path, {"from": "cache"})
+
+        self.assertEqual({"from": "cache"}, compiled_yaml.load(yaml_path))
+
+    def test_load_reparses_yaml_file_if_its_content_changes(self):
+        yaml_path = write_yaml("foo: bar\n")
+        compiled_yaml.load(yaml_path)
+
+        with open(yaml_path, "w") as f:
+            f.write("foo: changed\n")
+
+        self.assertEqual({"foo": "changed"}, compiled_yaml.load(yaml_path))
+
+    def test_load_uses_cache_if_yaml_file_is_touched_but_content_is_unchanged(self):
+        yaml_path = write_yaml("foo: bar\n")
+        compiled_yaml.load(yaml_path)
+        tamper_with_cached_data(yaml_path, {"from": "cache"})
+
+        st = os.stat(yaml_path)
+        os.utime(yaml_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+
+        self.assertEqual({"from": "cache"}, compiled_yaml.load(yaml_path))
+
+    def test_load_ignores_invalid_cache(self):
+        yaml_path = write_yaml("foo: bar\n")
+        with open(compiled_yaml.get_cache_path(yaml_path), "w") as f:
+            f.write("not a cache")
+
+        self.assertEqual({"foo": "bar"}, compiled_yaml.load(yaml_path))
+
+    def test_load_does_not_decode_cached_data_if_the_yaml_file_changed(self):
+        yaml_path = write_yaml("foo: bar\n")
+        compiled_yaml.load(yaml_path)
+
+        with open(yaml_path, "w") as f:
+            f.write("foo: changed\n")
+
+        with mock.patch("marshal.loads", side_effect=AssertionError("cached data decoded")):
+            self.assertEqual({"foo": "changed"}, compiled_yaml.load(yaml_path))
+
+    def test_load_returns_documents_that_cannot_be_cached(self):
+        yaml_path = write_yaml("when: 2018-07-05 12:00:00\n")
+
+        self.assertEqual({"when": datetime.datetime(2018, 7, 5, 12)}, compiled_yaml.load(yaml_path))
+        self.assertFalse(os.path.exists(compiled_yaml.get_cache_path(yaml_path)))
+
+    def test_load_returns_cached_empty_documents(self):
+        yaml_path = write_yaml("")
+        compiled_yaml.load(yaml_path)
+
+        self.assertIsNone(compiled_yaml.load(yaml_path))
+
+    def test_load_raises_FileNotFoundError_if_yaml_file_does_not_exist(self):
+        with self.assertRaises(FileNotFoundError):
+            compiled_yaml.load(os.path.join(tempfile.mkdtemp(), "does-not-exist.yml"))
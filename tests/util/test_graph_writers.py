@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import io
+import json
+import xml.etree.ElementTree as ElementTree
+from unittest import TestCase
+
+from lor.util import graph_writers
+
+NODES = [
+    ("a", {"label": "A"}, ["b", "c"]),
+    ("b", {"label": "B \"quoted\""}, ["c"]),
+    ("c", {"label": "C & <D>"}, []),
+]
+
+
+def write_to_str(fmt, nodes=NODES):
+    out = io.StringIO()
+    graph_writers.write(iter(nodes), fmt, out)
+    return out.getvalue()
+
+
+class TestGraphWriters(TestCase):
+
+    def test_write_dot_quotes_ids_and_attributes(self):
+        ret = write_to_str("dot")
+
+        self.assertTrue(ret.startswith("strict digraph {\n"))
+        self.assertIn('"b" [label="B \\"quoted\\""];\n', ret)
+        self.assertIn('"a" -> "c";\n', ret)
+        self.assertTrue(ret.endswith("}\n"))
+
+    def test_write_json_writes_one_object_containing_all_nodes(self):
+        ret = json.loads(write_to_str("json"))
+
+        self.assertEqual({"id": "a", "label": "A", "requires": ["b", "c"]}, ret["nodes"][0])
+        self.assertEqual(3, len(ret["nodes"]))
+
+    def test_write_json_writes_empty_node_list_for_no_nodes(self):
+        self.assertEqual({"nodes": []}, json.loads(write_to_str("json", [])))
+
+    def test_write_jsonl_writes_one_line_per_node(self):
+        lines = write_to_str("jsonl").splitlines()
+
+        self.assertEqual([{"id": n, "label": l["label"], "requires": r} for n, l, r in NODES], [json.loads(line) for line in lines])
+
+    def test_write_graphml_writes_valid_xml_with_escaped_attributes(self):
+        root = ElementTree.fromstring(write_to_str("graphml"))
+
+        ns = {"g": "http://graphml.graphdrawing.org/xmlns"}
+        nodes = root.findall("g:graph/g:node", ns)
+        edges = root.findall("g:graph/g:edge", ns)
+        self.assertEqual(["a", "b", "c"], [n.get("id") for n in nodes])
+        self.assertEqual("C & <D>", nodes[2].find("g:data", ns).text)
+        self.assertEqual(3, len(edges))
+
+    def test_write_edgelist_writes_one_line_per_edge(self):
+        self.assertEqual("a b\na c\nb c\n", write_to_str("edgelist"))
+
+    def test_write_raises_ValueError_for_unsupported_format(self):
+        with self.assertRaises(ValueError):
+            write_to_str("png")
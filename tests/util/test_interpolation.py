@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from unittest import TestCase
+
+from lor.util import interpolation
+from lor.util.interpolation import Interpolator
+
+
+class TestInterpolation(TestCase):
+
+    def test_compile_template_returns_template_that_renders_references(self):
+        template = interpolation.compile_template("${a}/b/${c}")
+
+        self.assertEqual(["a", "c"], template.references)
+        self.assertEqual("1/b/3", template.render({"a": 1, "c": 3}.get))
+
+    def test_compile_template_is_memoized(self):
+        self.assertIs(interpolation.compile_template("${a}/b"), interpolation.compile_template("${a}/b"))
+
+    def test_render_returns_value_as_is_if_template_is_one_reference(self):
+        template = interpolation.compile_template("${a}")
+
+        self.assertEqual([1, 2], template.render({"a": [1, 2]}.get))
+
+    def test_render_treats_escaped_reference_as_literal(self):
+        template = interpolation.compile_template("$${a}/${b}")
+
+        self.assertEqual(["b"], template.references)
+        self.assertEqual("${a}/x", template.render({"b": "x"}.get))
+
+    def test_compile_template_leaves_unterminated_references_in_the_output(self):
+        template = interpolation.compile_template("sed s/${/x/ ${a}")
+
+        self.assertEqual(["a"], template.references)
+        self.assertEqual("sed s/${/x/ 1", template.render({"a": 1}.get))
+
+    def test_compile_template_leaves_empty_references_in_the_output(self):
+        template = interpolation.compile_template("${} and ${ }")
+
+        self.assertEqual([], template.references)
+        self.assertEqual("${} and ${ }", template.render({}.get))
+
+    def test_Interpolator_get_resolves_references_transitively(self):
+        raw = {"a": "${b}/a", "b": "${c}/b", "c": "c"}
+        interpolator = Interpolator(raw.__getitem__)
+
+        self.assertEqual("c/b/a", interpolator.get("a"))
+
+    def test_Interpolator_get_memoizes_resolved_values(self):
+        lookups = []
+
+        def lookup_raw(name):
+            lookups.append(name)
+            return {"a": "${b}", "b": "b"}[name]
+
+        interpolator = Interpolator(lookup_raw)
+        interpolator.get("a")
+        interpolator.get("a")
+        interpolator.get("b")
+
+        self.assertEqual(["a", "b"], lookups)
+
+    def test_Interpolator_get_raises_ValueError_for_cyclic_references(self):
+        raw = {"a": "${b}", "b": "x/${a}"}
+        interpolator = Interpolator(raw.__getitem__)
+
+        with self.assertRaises(ValueError):
+            interpolator.get("a")
+
+    def test_Interpolator_get_leaves_references_to_missing_names_verbatim(self):
+        interpolator = Interpolator({"a": "echo ${HOME} ${b}", "b": "x", "c": "${HOME}"}.__getitem__)
+
+        self.assertEqual("echo ${HOME} x", interpolator.get("a"))
+        self.assertEqual("${HOME}", interpolator.get("c"))
+
+    def test_Interpolator_get_leaves_references_to_missing_names_exactly_as_written(self):
+        interpolator = Interpolator({"a": "echo ${ HOME }", "b": "${{ secrets.X }}"}.__getitem__)
+
+        self.assertEqual("echo ${ HOME }", interpolator.get("a"))
+        self.assertEqual("${{ secrets.X }}", interpolator.get("b"))
+
+    def test_Interpolator_get_raises_KeyError_for_missing_name(self):
+        interpolator = Interpolator({"a": "x"}.__getitem__)
+
+        with self.assertRaises(KeyError):
+            interpolator.get("b")
+
+    def test_Interpolator_interpolate_interpolates_strings_in_nested_dicts_and_lists(self):
+        interpolator = Interpolator({"a": "x"}.__getitem__)
+
+        self.assertEqual({"k": ["x/1", {"j": "x"}], "n": 2}, interpolator.interpolate({"k": ["${a}/1", {"j": "${a}"}], "n": 2}))
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import os
+import tempfile
+from unittest import TestCase
+
+from lor.util import path_index
+
+
+def create_files(root, rel_paths):
+    for rel_path in rel_paths:
+        abs_path = os.path.join(root, rel_path)
+        os.makedirs(os.path.dirname(abs_path), exist_ok=True)
+        open(abs_path, "a").close()
+
+
+def build_and_load(roots, **kwargs):
+    index_path = os.path.join(tempfile.mkdtemp(), "path-index")
+    path_index.build(roots, index_path, **kwargs)
+    return path_index.try_load(index_path)
+
+
+class TestPathIndex(TestCase):
+
+    def test_lookup_returns_indices_of_roots_that_contain_path(self):
+        roots = [tempfile.mkdtemp(), tempfile.mkdtemp()]
+        create_files(roots[0], ["a/b/c", "only-in-first"])
+        create_files(roots[1], ["a/b/c", "a/d"])
+
+        index = build_and_load(roots)
+
+        self.assertEqual([0, 1], index.lookup("a/b/c"))
+        self.assertEqual([0], index.lookup("only-in-first"))
+        self.assertEqual([1], index.lookup("a/d"))
+        self.assertEqual([0, 1], index.lookup("a"))
+        self.assertEqual([], index.lookup("a/b/does-not-exist"))
+        self.assertEqual([], index.lookup("does-not-exist"))
+
+    def test_listdir_returns_sorted_union_of_entries_in_dir(self):
+        roots = [tempfile.mkdtemp(), tempfile.mkdtemp()]
+        create_files(roots[0], ["a/z", "a/b/c"])
+        create_files(roots[1], ["a/y", "a/z", "ab"])
+
+        index = build_and_load(roots)
+
+        self.assertEqual(["b", "y", "z"], index.listdir("a"))
+        self.assertEqual(["a", "ab"], index.listdir(""))
+        self.assertEqual([], index.listdir("does-not-exist"))
+
+    def test_build_does_not_index_excluded_paths(self):
+        root = tempfile.mkdtemp()
+        create_files(root, [".lor/something", "a"])
+
+        index = build_and_load([root], exclude=[".lor"])
+
+        self.assertEqual(["a"], index.listdir(""))
+
+    def test_is_fresh_returns_False_for_dirs_that_changed_after_the_index_was_built(self):
+        root = tempfile.mkdtemp()
+        create_files(root, ["a/b", "c/d"])
+        index_path = os.path.join(tempfile.mkdtemp(), "path-index")
+        path_index.build([root], index_path)
+
+        create_files(root, ["a/new-file"])
+        st = os.stat(os.path.join(root, "a"))
+        os.utime(os.path.join(root, "a"), ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+        index = path_index.try_load(index_path)
+
+        self.assertFalse(index.is_fresh("a"))
+        self.assertTrue(index.is_fresh("c"))
+        self.assertTrue(index.is_fresh(""))
+
+    def test_is_fresh_returns_False_for_dirs_that_were_created_after_the_index_was_built(self):
+        root = tempfile.mkdtemp()
+        index = build_and_load([root])
+
+        os.mkdir(os.path.join(root, "new-dir"))
+
+        self.assertFalse(index.is_fresh("new-dir"))
+
+    def test_is_fresh_distinguishes_dirs_that_are_in_some_roots_from_dirs_that_were_added_to_others(self):
+        roots = [tempfile.mkdtemp(), tempfile.mkdtemp()]
+        create_files(roots[0], ["only-in-first/a", "in-both/b"])
+        create_files(roots[1], ["in-both/c", "only-in-second/d"])
+        index_path = os.path.join(tempfile.mkdtemp(), "path-index")
+        path_index.build(roots, index_path)
+
+        os.mkdir(os.path.join(roots[1], "only-in-first"))
+        index = path_index.try_load(index_path)
+
+        self.assertFalse(index.is_fresh("only-in-first"))
+        self.assertTrue(index.is_fresh("in-both"))
+        self.assertTrue(index.is_fresh("only-in-second"))
+
+    def test_try_load_returns_None_if_index_does_not_exist(self):
+        self.assertIsNone(path_index.try_load(os.path.join(tempfile.mkdtemp(), "does-not-exist")))
+
+    def test_try_load_raises_RuntimeError_if_file_is_not_an_index(self):
+        _, not_an_index = tempfile.mkstemp()
+        with open(not_an_index, "w") as f:
+            f.write("not an index")
+
+        with self.assertRaises(RuntimeError):
+            path_index.try_load(not_an_index)
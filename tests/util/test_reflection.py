@@ -12,10 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
-from unittest import TestCase
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import TestCase, mock
 
+import lor
 import tests
 import tests.tst_helpers
+from lor import util
 from lor.util import reflection
 from tests import fixture_pkg
 from tests.fixture_pkg import reflectiont
@@ -25,8 +31,26 @@ from tests.fixture_pkg.reflectiont.nestedexample.another_mod_with_class import S
 from tests.fixture_pkg.reflectiont.nestedexample.dir2.mod_with_subclass import SomeSubclass
 
 
+def write_pkg(root, pkg_name, modules):
+    pkg_dir = os.path.join(root, pkg_name)
+    os.makedirs(pkg_dir, exist_ok=True)
+    open(os.path.join(pkg_dir, "__init__.py"), "w").close()
+
+    for module_name, content in modules.items():
+        with open(os.path.join(pkg_dir, module_name + ".py"), "w") as f:
+            f.write(content)
+
+
 class TestReflection(TestCase):
 
+    def setUp(self):
+        self.previous_index_path = reflection.get_index_path()
+        self.index_path = os.path.join(tempfile.mkdtemp(), "reflection-index.json")
+        reflection._set_index_path(self.index_path)
+
+    def tearDown(self):
+        reflection._set_index_path(self.previous_index_path)
+
     def test_classes_in_pkg_returns_expected_entries(self):
         # Converted into a string because reflection is dynamically loading the class whereas the expected classes are
         # loaded here: the loader is assigning them as "different"
@@ -40,10 +64,10 @@ class TestReflection(TestCase):
 
         self.assertEqual(expected_classes, ret)
 
-    def ignore_subclasses_in_pkg_returns_expected_entries(self):
-        # TODO: impl
+    def test_subclasses_in_pkg_returns_expected_entries(self):
         ret = set(map(str, reflection.subclasses_in_pkg(fixture_pkg, SomeClass)))
         expected_classes = {
+            str(SomeClass),
             str(SomeSubclass),
         }
 
@@ -93,3 +117,73 @@ class TestReflection(TestCase):
 
     def test_is_pkg_returns_False_for_module(self):
         self.assertFalse(reflection.is_pkg(tests.tst_helpers))
+
+    def test_subclasses_in_pkg_writes_index(self):
+        reflection.subclasses_in_pkg(fixture_pkg.reflectiont, SomeClass)
+
+        self.assertTrue(os.path.exists(self.index_path))
+
+    def test_subclasses_in_pkg_does_not_import_indexed_modules_without_subclasses(self):
+        reflection.subclasses_in_pkg(fixture_pkg.reflectiont, SomeClass)
+
+        unrelated_module_name = "tests.fixture_pkg.reflectiont.nestedexample.another_mod_with_class"
+        sys.modules.pop(unrelated_module_name, None)
+
+        ret = set(map(str, reflection.subclasses_in_pkg(fixture_pkg.reflectiont, SomeClass)))
+
+        self.assertEqual({str(SomeClass), str(SomeSubclass)}, ret)
+        self.assertNotIn(unrelated_module_name, sys.modules)
+
+    def test_subclasses_in_pkg_reimports_modules_that_changed_since_being_indexed(self):
+        root = tempfile.mkdtemp()
+        pkg_name = "reflectiont_" + util.base36_str()
+        write_pkg(root, pkg_name, {"mod": "class Base:\n    pass\n"})
+        sys.path.insert(0, root)
+        try:
+            pkg = __import__(pkg_name)
+            self.assertEqual([], [k.__name__ for k in reflection.subclasses_in_pkg(pkg, ValueError)])
+
+            write_pkg(root, pkg_name, {"mod": "class Base:\n    pass\n\n\nclass Error(ValueError):\n    pass\n"})
+            sys.modules.pop(pkg_name + ".mod")  # i.e. as if LoR was relaunched
+
+            self.assertEqual(["Error"], [k.__name__ for k in reflection.subclasses_in_pkg(pkg, ValueError)])
+        finally:
+            sys.path.remove(root)
+
+    def test_subclass_names_in_pkg_does_not_import_unchanged_modules_on_the_second_call(self):
+        root = tempfile.mkdtemp()
+        pkg_name = "reflectiont_" + util.base36_str()
+        write_pkg(root, pkg_name, {
+            "m1": "class Error(ValueError):\n    pass\n",
+            "m2": "class OtherError(ValueError):\n    pass\n",
+            "plain": "class NotAnError:\n    pass\n",
+        })
+        sys.path.insert(0, root)
+        try:
+            pkg = __import__(pkg_name)
+            expected = [pkg_name + ".m1.Error", pkg_name + ".m2.OtherError"]
+            self.assertEqual(expected, reflection.subclass_names_in_pkg(pkg, ValueError))
+
+            for module_name in ["m1", "m2", "plain"]:
+                sys.modules.pop(pkg_name + "." + module_name)  # i.e. as if LoR was relaunched
+
+            with mock.patch("importlib.import_module", side_effect=AssertionError("module imported")):
+                self.assertEqual(expected, reflection.subclass_names_in_pkg(pkg, ValueError))
+        finally:
+            sys.path.remove(root)
+
+    def test_index_path_can_be_set_with_an_env_var(self):
+        index_path = os.path.join(tempfile.mkdtemp(), "reflection-index.json")
+        env = dict(os.environ, LOR_REFLECTION_INDEX=index_path, PYTHONPATH=os.path.dirname(os.path.dirname(lor.__file__)))
+        script = "import lor.util.reflection; print(lor.util.reflection.get_index_path())"
+
+        stdout = subprocess.check_output([sys.executable, "-c", script], env=env)
+
+        self.assertEqual(index_path, stdout.decode("utf-8").strip())
+
+    def test_classes_in_pkg_works_without_an_index(self):
+        reflection._set_index_path(None)
+
+        ret = set(map(str, reflection.classes_in_pkg(fixture_pkg.reflectiont)))
+
+        self.assertIn(str(SomeClass), ret)
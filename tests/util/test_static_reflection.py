@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import os
+import tempfile
+from unittest import TestCase
+
+from lor import util
+from lor.util import static_reflection
+
+
+def write_sources(root, sources):
+    for rel_path, content in sources.items():
+        path = os.path.join(root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+
+
+class TestStaticReflection(TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.pkg = "staticpkg_" + util.base36_str()
+        write_sources(self.root, {
+            self.pkg + "/__init__.py": "",
+            self.pkg + "/base.py": (
+                "import luigi\n"
+                "\n"
+                "class DateParam(luigi.Parameter):\n"
+                "    pass\n"
+                "\n"
+                "class BaseTask(luigi.Task):\n"
+                "    date = DateParam()\n"
+            ),
+            self.pkg + "/sub/__init__.py": "from ..base import BaseTask\n",
+            self.pkg + "/sub/tasks.py": (
+                "from luigi import Parameter\n"
+                "from . import BaseTask\n"
+                "\n"
+                "raise RuntimeError('module-level code should never run')\n"
+                "\n"
+                "class ChildTask(BaseTask):\n"
+                "    name = Parameter()\n"
+                "    not_a_param = dict()\n"
+                "\n"
+                "class NotATask:\n"
+                "    pass\n"
+            ),
+            self.pkg + "/broken.py": "def (:\n",
+        })
+        self.search_path = [self.root]
+
+    def __index(self):
+        init_path, _ = static_reflection.find_source(self.pkg, self.search_path)
+        sources = static_reflection.find_sources_in_pkg(self.pkg, init_path)
+        parsed = static_reflection.parse_module_sources(sources)
+        return static_reflection.SourceIndex(parsed, self.search_path), parsed
+
+    def test_find_source_returns_None_for_non_existent_module(self):
+        self.assertIsNone(static_reflection.find_source(util.base36_str(), self.search_path))
+
+    def test_find_source_returns_init_for_package(self):
+        path, is_pkg = static_reflection.find_source(self.pkg + ".sub", self.search_path)
+
+        self.assertTrue(is_pkg)
+        self.assertEqual(os.path.join(self.root, self.pkg, "sub", "__init__.py"), path)
+
+    def test_find_sources_in_pkg_returns_all_modules_in_order(self):
+        init_path, _ = static_reflection.find_source(self.pkg, self.search_path)
+
+        names = [name for name, _, _ in static_reflection.find_sources_in_pkg(self.pkg, init_path)]
+
+        expected = [self.pkg + suffix for suffix in ["", ".base", ".broken", ".sub", ".sub.tasks"]]
+        self.assertEqual(expected, names)
+
+    def test_parse_module_source_returns_error_for_invalid_source(self):
+        _, parsed = self.__index()
+
+        self.assertIn("error", parsed[self.pkg + ".broken"])
+
+    def test_SourceIndex_resolves_task_inheritance_across_modules_and_reexports(self):
+        index, _ = self.__index()
+        child = self.pkg + ".sub.tasks.ChildTask"
+        not_a_task = self.pkg + ".sub.tasks.NotATask"
+
+        self.assertEqual([child, not_a_task], index.classes(self.pkg + ".sub.tasks"))
+        self.assertTrue(index.is_subclass(child, static_reflection.LUIGI_TASK_CLASS_NAMES))
+        self.assertFalse(index.is_subclass(not_a_task, static_reflection.LUIGI_TASK_CLASS_NAMES))
+
+    def test_SourceIndex_parameters_includes_inherited_and_custom_parameters(self):
+        index, _ = self.__index()
+
+        def is_param(type_name):
+            return index.is_subclass(type_name, set(), static_reflection.is_luigi_parameter_class_name)
+
+        params = index.parameters(self.pkg + ".sub.tasks.ChildTask", is_param)
+
+        self.assertEqual(["name", "date"], [name for name, _ in params])
@@ -12,10 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import importlib
+import subprocess as sys_subprocess
+import os
+import sys
 import tempfile
-from unittest import TestCase
+from unittest import TestCase, mock
 
-from lor import util
+import lor._snapshot
+from lor import util, path, props, workspace
+from lor.props import DictPropertyLoader
+from lor.test import TemporaryWorkspace, TemporaryEnv
 from lor.util import subprocess
 from tests import tst_helpers
 
@@ -117,3 +124,56 @@ class TestSubprocess(TestCase):
         file_content = util.read_file_to_string(tmp_output)
 
         self.assertEqual("Hello, world!\n", file_content)
+
+    def test_importing_lor_removes_snapshot_variable_from_environment(self):
+        with TemporaryEnv() as env:
+            env["PYTHONPATH"] = os.path.normpath(os.path.join(os.path.dirname(__file__), "../.."))
+            env["LOR_SNAPSHOT"] = "/nonexistent/snapshot.pickle"
+            out = sys_subprocess.check_output([sys.executable, "-c", "import os, lor; print(os.environ.get('LOR_SNAPSHOT', 'removed'))"])
+
+        self.assertEqual("removed", out.decode("utf-8").strip())
+
+    def test_run_luigi_task_passes_bootstrapped_workspace_overlays_and_properties_to_child(self):
+        with TemporaryWorkspace() as ws, TemporaryEnv() as env:
+            # The child `luigi` process needs to be able to import lor (CI might not have it installed)
+            env["PYTHONPATH"] = os.path.normpath(os.path.join(os.path.dirname(__file__), "../.."))
+            module_name = "snapshot_task_" + util.base36_str()
+            with open(os.path.join(ws, module_name + ".py"), "w") as f:
+                f.write("import os\n"
+                        "import luigi\n"
+                        "import lor.path\n"
+                        "import lor.props\n"
+                        "import lor.workspace\n"
+                        "class WritesStateTask(luigi.Task):\n"
+                        "    out = luigi.Parameter()\n"
+                        "    def run(self):\n"
+                        "        with open(self.out, 'w') as f:\n"
+                        "            f.write(lor.props.get('SOME_PROP') + ';' + lor.props.get('WORKSPACE_NAME') + ';')\n"
+                        "            f.write(lor.workspace.get_path() + ';' + ','.join(lor.path.get_overlay_paths()) + ';')\n"
+                        "            f.write(os.environ.get('LOR_SNAPSHOT', 'not-inherited'))\n"
+                        "    def output(self):\n"
+                        "        return luigi.LocalTarget(self.out)\n")
+
+            sys.path.insert(0, ws)
+            overlay = tempfile.mkdtemp()
+            out_path = os.path.join(tempfile.mkdtemp(), "out")
+            try:
+                task_module = importlib.import_module(module_name)
+                path._set_overlay_paths([overlay])
+                props._set_loaders(None)
+                props._set_loaders([DictPropertyLoader("cli-overrides", {"SOME_PROP": "overridden"})] + props.get_loaders())
+
+                snapshot_paths = []
+                write_snapshot = lor._snapshot.write
+                with mock.patch("lor._snapshot.write", side_effect=lambda *args: snapshot_paths.append(write_snapshot(*args)) or snapshot_paths[-1]):
+                    exit_code = subprocess.run_luigi_task(task_module.WritesStateTask, ["--out", out_path, "--local-scheduler"])
+
+                self.assertEqual(0, exit_code)
+                expected = "overridden;{name};{ws};{overlay};not-inherited".format(name=workspace.get_package_name(ws), ws=ws, overlay=overlay)
+                self.assertEqual(expected, util.read_file_to_string(out_path))
+                self.assertEqual(1, len(snapshot_paths))
+                self.assertFalse(os.path.exists(snapshot_paths[0]))
+            finally:
+                sys.path.remove(ws)
+                path._set_overlay_paths([])
+                props._set_loaders(None)